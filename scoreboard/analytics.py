@@ -0,0 +1,187 @@
+#!/bin/python3
+
+"""
+    Analytics module. Contains all information regarding with the statistics computed over a Scoreboard snapshot
+"""
+
+import numpy as np
+
+
+class ScoreboardSnapshot():
+    """
+        Columnar snapshot of a Scoreboard: the scores of all the clients are copied into a contiguous NumPy array,
+        sorted in ascending order, so every statistic is computed with vectorized operations (i.e., a single pass over
+        the array, or even a binary search, instead of iterating the clients).
+
+        The snapshot is built from the ranking index, one bucket at a time (i.e., all the tied clients at once). The ids
+        of the clients are only copied when requested, since they are not needed to compute statistics.
+    """
+    def __init__(self, scoreboard, with_ids=False):
+        num_clients = len(scoreboard.clients)
+        num_scores = len(scoreboard.sorted_clients)
+
+        bucket_scores = np.fromiter(scoreboard.sorted_clients.keys(), dtype=np.int64, count=num_scores)
+        bucket_sizes = np.fromiter((len(bucket) for bucket in scoreboard.sorted_clients.values()), dtype=np.int64,
+                                   count=num_scores)
+
+        # Scores of all the clients, sorted in ascending order
+        self.scores = np.repeat(bucket_scores, bucket_sizes)
+
+        # Ids of all the clients, aligned with scores (i.e., ties sorted by arrival). None unless requested.
+        if with_ids:
+            self.ids = np.fromiter((client.id for bucket in scoreboard.sorted_clients.values() for client in bucket),
+                                   dtype=np.int64, count=num_clients)
+        else:
+            self.ids = None
+
+    def __len__(self):
+        return len(self.scores)
+
+    def histogram(self, bins=10):
+        """
+            Returns the histogram of the scores.
+
+        :param bins: (int or list of int) Either the number of equal-width bins, or the bins edges (see numpy.histogram)
+        :return: (dict) As follows:
+
+                    {"counts": [<count_bin_1>, ... <count_bin_N>], "edges": [<edge_0>, ... <edge_N>]}
+        """
+        counts, edges = np.histogram(self.scores, bins=bins)
+        return {"counts": counts.tolist(), "edges": edges.tolist()}
+
+    def percentiles(self, percentiles):
+        """
+            Returns the scores at the specified percentiles.
+
+        :param percentiles: (list of float) Percentiles to compute, from 0 to 100.
+        :return: (list of float) The score at each percentile, in the same order. None if there are no scores.
+        """
+        if len(self.scores):
+            result = np.percentile(self.scores, percentiles).tolist()
+        else:
+            result = [None] * len(percentiles)
+
+        return result
+
+    def count_above(self, thresholds):
+        """
+            Returns how many clients have a score strictly above each threshold.
+
+            Since the scores are sorted, each count is a binary search (O(log N)).
+
+        :param thresholds: (list of int) The thresholds.
+        :return: (list of int) The number of clients above each threshold, in the same order.
+        """
+        return (len(self.scores) - np.searchsorted(self.scores, thresholds, side="right")).tolist()
+
+    def stats(self, bins=10, percentiles=(50, 90, 99), thresholds=()):
+        """
+            Returns the main statistics of the scores.
+
+        :param bins: (int or list of int) Either the number of equal-width bins, or the bins edges.
+        :param percentiles: (list of float) Percentiles to compute, from 0 to 100.
+        :param thresholds: (list of int) Thresholds to count the clients above.
+        :return: (dict) As follows:
+
+                    {"count": <num_clients>, "min": <min_score>, "max": <max_score>, "mean": <mean_score>,
+                     "median": <median_score>, "histogram": {"counts": [...], "edges": [...]},
+                     "percentiles": {"<percentile>": <score>, ...}, "above": {"<threshold>": <num_clients>, ...}}
+
+                Statistics of an empty Scoreboard are None.
+        """
+        result = {"count": len(self.scores), "min": None, "max": None, "mean": None, "median": None}
+
+        if len(self.scores):
+            result["min"] = int(self.scores[0])
+            result["max"] = int(self.scores[-1])
+            result["mean"] = float(self.scores.mean())
+            result["median"] = float(np.median(self.scores))
+
+        result["histogram"] = self.histogram(bins)
+        result["percentiles"] = {"{:g}".format(percentile): score
+                                 for percentile, score in zip(percentiles, self.percentiles(list(percentiles)))}
+        result["above"] = {str(threshold): count
+                           for threshold, count in zip(thresholds, self.count_above(list(thresholds)))}
+
+        return result
+
+    def summary(self, edges=None, thresholds=()):
+        """
+            Returns the statistics of the scores that add up among several Scoreboards (e.g., the shards of a
+                partitioned Scoreboard, see merged_stats), so they are merged without sending the scores themselves.
+
+        :param edges: (list of float) The bins edges of the histogram (see histogram_edges). None not to compute it.
+        :param thresholds: (list of int) Thresholds to count the clients above.
+        :return: (dict) As follows:
+
+                    {"count": <num_clients>, "sum": <sum_of_scores>, "min": <min_score>, "max": <max_score>,
+                     "histogram": [<count_bin_1>, ... <count_bin_N>], "above": [<num_clients>, ...]}
+
+                The min and max of an empty Scoreboard are None, and so is the histogram if not computed.
+        """
+        result = {"count": len(self.scores), "sum": float(self.scores.sum(dtype=np.float64)), "min": None,
+                  "max": None, "histogram": None, "above": self.count_above(list(thresholds))}
+
+        if len(self.scores):
+            result["min"] = int(self.scores[0])
+            result["max"] = int(self.scores[-1])
+
+        if edges is not None:
+            result["histogram"] = np.histogram(self.scores, bins=edges)[0].tolist()
+
+        return result
+
+    @staticmethod
+    def histogram_edges(bins, minimum, maximum):
+        """
+            Returns the edges of the specified number of equal-width bins between the specified scores, same as the
+                ones of numpy.histogram over scores from minimum to maximum (e.g., the merged ones of several shards).
+
+        :param bins: (int) Number of bins.
+        :param minimum: (int) The lowest score. None if there are no scores.
+        :param maximum: (int) The highest score. None if there are no scores.
+        :return: (list of float) The edges.
+        """
+        scores = [minimum, maximum] if minimum is not None else []
+
+        return np.histogram_bin_edges(np.array(scores, dtype=np.int64), bins=bins).tolist()
+
+    @staticmethod
+    def merged_stats(summaries, edges, percentiles, thresholds, score_index):
+        """
+            Returns the main statistics (see stats) of several Scoreboards, merged from their summaries (see summary)
+                and their merged score distribution (see ScoreIndex).
+
+            IMPLEMENTATION NOTE: Count, min, max, mean, histogram and above are exact. The median and the percentiles
+                are estimated from the score distribution, with the resolution of its buckets (see ScoreIndex.score_at),
+                within the min and max scores.
+
+        :param summaries: (list of dict) The summary of each Scoreboard, all of them with the histogram of the edges.
+        :param edges: (list of float) The bins edges of the histograms.
+        :param percentiles: (list of float) Percentiles to compute, from 0 to 100.
+        :param thresholds: (list of int) Thresholds of the counts of the clients above.
+        :param score_index: (ScoreIndex) The merged score distribution of the Scoreboards.
+        :return: (dict) The statistics, same as stats.
+        """
+        count = sum(summary["count"] for summary in summaries)
+        result = {"count": count, "min": None, "max": None, "mean": None, "median": None}
+
+        if count:
+            result["min"] = min(summary["min"] for summary in summaries if summary["count"])
+            result["max"] = max(summary["max"] for summary in summaries if summary["count"])
+            result["mean"] = sum(summary["sum"] for summary in summaries) / count
+
+        # The median, followed by the percentiles
+        scores = [score_index.score_at(percentile) if count else None for percentile in [50] + list(percentiles)]
+        scores = [float(min(max(score, result["min"]), result["max"])) if score is not None else None
+                  for score in scores]
+
+        result["median"] = scores[0]
+        result["histogram"] = {"counts": np.sum([summary["histogram"] for summary in summaries], axis=0).tolist(),
+                               "edges": list(edges)}
+        result["percentiles"] = {"{:g}".format(percentile): score for percentile, score in zip(percentiles, scores[1:])}
+        result["above"] = {str(threshold): count
+                           for threshold, count in zip(thresholds, np.sum([summary["above"] for summary in summaries],
+                                                                          axis=0, dtype=np.int64).tolist())}
+
+        return result
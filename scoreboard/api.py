@@ -5,7 +5,7 @@
 """
 
 # Add Flask app
-from flask import Flask, request
+from flask import Flask, Response, g, request
 app = Flask(__name__)
 
 # Add logger
@@ -19,7 +19,24 @@ os.path.dirname(os.path.realpath(__file__))
 path = os.path.dirname(os.path.realpath(__file__))
 os.environ['PATH'] += ':'+path
 
+from conf import RANKING_DEFAULT_LIMIT
 from constants import DEBUG
+from metrics import CONTENT_TYPE, Metrics, render_metrics
+from transport import TransportError
+
+
+# Count every request of a route, its latency and the ones in flight (see /metrics)
+@app.before_request
+def start_request_metrics():
+    if request.endpoint is not None:
+        g.metrics_start = app.api_metrics.start(request.endpoint)
+
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    start = g.pop("metrics_start", None)
+    if start is not None:
+        app.api_metrics.finish(request.endpoint, start)
 
 
 # Define API on Flask app
@@ -31,20 +48,164 @@ def score():
         return dumps(response)
 
 
+@app.route("/scores", methods=["PUT"])
+def scores():
+    if request.method == "PUT":
+        user_msg_list = loads(request.data.decode())
+        response = app.scoreboard.update_many(user_msg_list)
+        return dumps(response)
+
+
 @app.route("/top/<int:top_size>", methods=["GET"])
 def top(top_size):
     if request.method == "GET":
-        response = app.scoreboard.top(top_size)
-        return dumps(response)
+        # Encoded by the server, sent as is
+        return app.scoreboard.top(top_size, encoded=True)
 
 
 @app.route("/top/<int:ranking_position>/<int:scope_size>", methods=["GET"])
 def relative_top(ranking_position, scope_size):
     if request.method == "GET":
-        response = app.scoreboard.relative_top(ranking_position, scope_size)
+        # Encoded by the server, sent as is
+        return app.scoreboard.relative_top(ranking_position, scope_size, encoded=True)
+
+
+@app.route("/around/<int:user>/<int:scope>", methods=["GET"])
+def around(user, scope):
+    if request.method == "GET":
+        # Encoded by the server, sent as is
+        return app.scoreboard.around(user, scope, encoded=True)
+
+
+@app.route("/percentile/<int:user>", methods=["GET"])
+def percentile(user):
+    if request.method == "GET":
+        response = app.scoreboard.percentile(user)
+        return dumps(response)
+
+
+@app.route("/score_at/<percentile>", methods=["GET"])
+def score_at(percentile):
+    if request.method == "GET":
+        try:
+            percentile = float(percentile)
+
+        except ValueError:
+            response = {"error": "Invalid percentile"}
+
+        else:
+            response = app.scoreboard.score_at(percentile)
+
+        return dumps(response)
+
+
+@app.route("/ranking", methods=["GET"])
+def ranking():
+    if request.method == "GET":
+        try:
+            limit = parse_ranking_query(request.args)
+
+        except ValueError:
+            response = {"error": "Invalid after, limit values"}
+
+        else:
+            response = app.scoreboard.ranking(limit, request.args.get("after"))
+
+        return dumps(response)
+
+
+@app.route("/rank/<int:user>", methods=["GET"])
+def rank(user):
+    if request.method == "GET":
+        response = app.scoreboard.rank(user)
+        return dumps(response)
+
+
+@app.route("/windows", methods=["GET"])
+def windows_info():
+    if request.method == "GET":
+        response = app.scoreboard.windows_info()
+        return dumps(response)
+
+
+@app.route("/windows/<window>/top/<int:top_size>", methods=["GET"])
+def window_top(window, top_size):
+    if request.method == "GET":
+        response = app.scoreboard.window_top(window, top_size, parse_window_query(request.args))
+        return dumps(response)
+
+
+@app.route("/windows/<window>/rank/<int:user>", methods=["GET"])
+def window_rank(window, user):
+    if request.method == "GET":
+        response = app.scoreboard.window_rank(window, user, parse_window_query(request.args))
+        return dumps(response)
+
+
+@app.route("/boards", methods=["GET"])
+def boards_stats():
+    if request.method == "GET":
+        response = app.scoreboard.boards_stats()
         return dumps(response)
 
 
+@app.route("/boards/<board>/score", methods=["PUT"])
+def board_score(board):
+    if request.method == "PUT":
+        user_msg = loads(request.data.decode())
+        response = app.scoreboard.board_update(board, user_msg)
+        return dumps(response)
+
+
+@app.route("/boards/<board>/scores", methods=["PUT"])
+def board_scores(board):
+    if request.method == "PUT":
+        user_msg_list = loads(request.data.decode())
+        response = app.scoreboard.board_update_many(board, user_msg_list)
+        return dumps(response)
+
+
+@app.route("/boards/<board>/top/<int:top_size>", methods=["GET"])
+def board_top(board, top_size):
+    if request.method == "GET":
+        response = app.scoreboard.board_top(board, top_size)
+        return dumps(response)
+
+
+@app.route("/boards/<board>/rank/<int:user>", methods=["GET"])
+def board_rank(board, user):
+    if request.method == "GET":
+        response = app.scoreboard.board_rank(board, user)
+        return dumps(response)
+
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    if request.method == "GET":
+        try:
+            bins, percentiles, thresholds = parse_stats_query(request.args)
+
+        except ValueError:
+            response = {"error": "Invalid bins, percentiles, thresholds values"}
+
+        else:
+            response = app.scoreboard.stats(bins, percentiles, thresholds)
+
+        return dumps(response)
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    if request.method == "GET":
+        try:
+            server_metrics = app.scoreboard.metrics()
+
+        except TransportError:
+            server_metrics = None
+
+        return Response(render_metrics(app.api_metrics.snapshot(), server_metrics), content_type=CONTENT_TYPE)
+
+
 #
 # Just for DEBUG
 #
@@ -56,6 +217,50 @@ def reset():
     return ""
 
 
+def parse_stats_query(args):
+    """
+        Parses the query string of a statistics request, made of comma separated lists:
+
+                /stats?bins=20&percentiles=50,99.9&thresholds=100,1000
+
+    :param args: (dict) The query string arguments.
+    :return: (tuple) The bins (either a number of bins, or a list of edges), percentiles and thresholds.
+    :raises: (ValueError) If any of them is not a number.
+    """
+    bins = [int(edge) for edge in args.get("bins", "10").split(",")]
+    if len(bins) == 1:
+        bins = bins[0]
+    percentiles = [float(percentile) for percentile in args.get("percentiles", "50,90,99").split(",") if percentile]
+    thresholds = [int(threshold) for threshold in args.get("thresholds", "").split(",") if threshold]
+
+    return bins, percentiles, thresholds
+
+
+def parse_ranking_query(args):
+    """
+        Parses the limit of the query string of a ranking page request (the cursor is validated by the wrapper):
+
+                /ranking?after=250:123&limit=100
+
+    :param args: (dict) The query string arguments.
+    :return: (int) The limit (RANKING_DEFAULT_LIMIT if not specified).
+    :raises: (ValueError) If it is not a number.
+    """
+    return int(args.get("limit", RANKING_DEFAULT_LIMIT))
+
+
+def parse_window_query(args):
+    """
+        Parses the query string of a time window request:
+
+                /windows/daily/top/100?closed=1
+
+    :param args: (dict) The query string arguments.
+    :return: (bool) True for the last closed window, False for the current one.
+    """
+    return args.get("closed", "").lower() not in ("", "0", "false")
+
+
 def get_api(scoreboard_wrapper):
     """
         Returns an initialized HTTP RESTful API
@@ -65,4 +270,5 @@ def get_api(scoreboard_wrapper):
     """
     # Add a wrapper to get access to the scoreboard
     setattr(app, "scoreboard", scoreboard_wrapper)
+    setattr(app, "api_metrics", Metrics())
     return app
@@ -10,11 +10,13 @@ path = os.path.dirname(os.path.realpath(__file__))
 os.environ['PATH'] += ':'+path
 
 from api import get_api
+from async_api import get_async_api
 from scoreboard_wrapper import ScoreboardWrapper
+from conf import FRONT_END, NUM_SHARDS, WAL_DIR
 from constants import DEFAULT_IP, DEFAULT_PORT, CLIENT_MODE, SERVER_MODE
 
 
-def start_scoreboard_server(port=DEFAULT_PORT, ip=DEFAULT_IP, debug_mode=True):
+def start_scoreboard_server(port=DEFAULT_PORT, ip=DEFAULT_IP, debug_mode=True, wal_dir=WAL_DIR):
     """
         Starts an wrapped Scoreboard acting as a server.
 
@@ -23,9 +25,16 @@ def start_scoreboard_server(port=DEFAULT_PORT, ip=DEFAULT_IP, debug_mode=True):
     :param port: (int) The port to use to communicate with the clients.
     :param ip: (str) The IPv4 address to use to communicate with the clients.
     :param debug_mode: (bool) True if in debug mode. False otherwise.
+    :param wal_dir: (str) Directory of the write-ahead log and the snapshots of the server. None to disable both.
     :return: (None/ScoreboardWrapper) According to debug_mode.
     """
-    server = ScoreboardWrapper(port, ip)
+    if wal_dir is not None:
+        wal_path = os.path.join(wal_dir, "scoreboard-{}.wal".format(port))
+        snapshot_path = os.path.join(wal_dir, "scoreboard-{}.snapshot".format(port))
+    else:
+        wal_path = snapshot_path = None
+
+    server = ScoreboardWrapper(port, ip, wal_path=wal_path, snapshot_path=snapshot_path)
 
     if not debug_mode:
         server.start(SERVER_MODE)
@@ -34,7 +43,7 @@ def start_scoreboard_server(port=DEFAULT_PORT, ip=DEFAULT_IP, debug_mode=True):
 
 
 def start_scoreboard_client(api_port=DEFAULT_PORT, api_ip=DEFAULT_IP, server_port=DEFAULT_PORT+1,
-                            server_ip=DEFAULT_IP, debug_mode=True):
+                            server_ip=DEFAULT_IP, debug_mode=True, num_shards=NUM_SHARDS, front_end=FRONT_END):
     """
         Starts an wrapped Scoreboard acting as a client, connected with an HTTP API and with the server.
 
@@ -43,16 +52,21 @@ def start_scoreboard_client(api_port=DEFAULT_PORT, api_ip=DEFAULT_IP, server_por
 
     :param api_port: (int) The port to use to expose the HTTP REST API.
     :param api_ip: (str) The IPv4 address to expose the HTTP REST API.
-    :param server_port: (int) The port to use to communicate with the clients.
+    :param server_port: (int) The port to use to communicate with the clients (of the first shard, if sharded).
     :param server_ip: (str) The IPv4 address to use to communicate with the clients.
     :param debug_mode: (bool) True if in debug mode. False otherwise.
-    :return: (None/Flask) According to debug_mode.
+    :param num_shards: (int) Number of servers (shards), listening on consecutive ports from server_port.
+    :param front_end: (str) The HTTP server of the API: "flask" or "asyncio" (see AsyncApi).
+    :return: (None/Flask/AsyncApi) According to debug_mode and front_end.
 
     """
-    client = ScoreboardWrapper(server_port, server_ip)
+    client = ScoreboardWrapper(server_port, server_ip, num_shards=num_shards)
     client.start(CLIENT_MODE)
 
-    api = get_api(client)
+    if front_end == "asyncio":
+        api = get_async_api(client)
+    else:
+        api = get_api(client)
 
     if not debug_mode:
         print("Starting API in {}:{}".format(api_ip, api_port)) #DEBUGGING
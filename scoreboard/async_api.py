@@ -0,0 +1,310 @@
+#!/bin/python3
+
+"""
+    Asyncio HTTP RESTful API module. Serves the same routes than the Flask API (see api.py) from a single event loop.
+"""
+
+import asyncio
+import re
+from urllib.parse import parse_qsl
+
+# Add logger
+import logging
+logger = logging.getLogger(__name__)
+
+from json import dumps, loads
+
+import os
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from api import parse_ranking_query, parse_stats_query, parse_window_query
+from conf import ASYNC_API_BACKLOG
+from constants import DEBUG
+from metrics import CONTENT_TYPE, Metrics, render_metrics
+from transport import TransportError
+
+
+class AsyncApi():
+    """
+        HTTP/1.1 server of the RESTful API, running on an asyncio event loop: each connection is a coroutine (rather
+        than a thread, as in the Flask development server), kept alive between requests, and the queries are sent to
+        the servers through non-blocking sockets (see ScoreboardWrapper.top_async). Thousands of concurrent connections
+        only cost their buffers, and none of them blocks the rest while waiting for a server.
+
+        Every request of a route is counted, along with its latency and the ones in flight (see /metrics).
+
+        IMPLEMENTATION NOTE: It only implements what the API needs: requests with a Content-Length body (no chunked
+            bodies), and persistent connections (unless the client asks to close them, or uses HTTP/1.0).
+    """
+    MAX_BODY_SIZE = 16 * 1024 * 1024
+
+    # (<method>, <path regular expression>, <handler name>). Named groups are passed as str, the rest as int.
+    ROUTES = [
+        ("PUT", re.compile(r"/score"), "score"),
+        ("PUT", re.compile(r"/scores"), "scores"),
+        ("GET", re.compile(r"/top/(\d+)"), "top"),
+        ("GET", re.compile(r"/top/(\d+)/(\d+)"), "relative_top"),
+        ("GET", re.compile(r"/around/(\d+)/(\d+)"), "around"),
+        ("GET", re.compile(r"/percentile/(\d+)"), "percentile"),
+        ("GET", re.compile(r"/score_at/(?P<percentile>[^/]+)"), "score_at"),
+        ("GET", re.compile(r"/ranking"), "ranking"),
+        ("GET", re.compile(r"/rank/(\d+)"), "rank"),
+        ("GET", re.compile(r"/windows"), "windows_info"),
+        ("GET", re.compile(r"/windows/(?P<window>[^/]+)/top/(\d+)"), "window_top"),
+        ("GET", re.compile(r"/windows/(?P<window>[^/]+)/rank/(\d+)"), "window_rank"),
+        ("GET", re.compile(r"/boards"), "boards_stats"),
+        ("PUT", re.compile(r"/boards/(?P<board>[^/]+)/score"), "board_score"),
+        ("PUT", re.compile(r"/boards/(?P<board>[^/]+)/scores"), "board_scores"),
+        ("GET", re.compile(r"/boards/(?P<board>[^/]+)/top/(\d+)"), "board_top"),
+        ("GET", re.compile(r"/boards/(?P<board>[^/]+)/rank/(\d+)"), "board_rank"),
+        ("GET", re.compile(r"/stats"), "stats"),
+        ("GET", re.compile(r"/metrics"), "metrics"),
+        ("DELETE", re.compile(r"/reset"), "reset"),
+    ]
+
+    # <path>: <content type> of the responses that are not JSON
+    CONTENT_TYPES = {"/metrics": CONTENT_TYPE}
+
+    REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+               500: "Internal Server Error"}
+
+    def __init__(self, scoreboard_wrapper, backlog=ASYNC_API_BACKLOG):
+        self.scoreboard = scoreboard_wrapper
+        self.backlog = backlog
+        self.api_metrics = Metrics()
+
+    def run(self, host, port):
+        """
+            Serves the API forever.
+
+        :param host: (str) The IPv4 address to expose the API.
+        :param port: (int) The port to expose the API.
+        :return: None
+        """
+        asyncio.run(self.serve(host, port))
+
+    async def serve(self, host, port):
+        """
+            Serves the API forever, on the running event loop.
+
+        :param host: (str) The IPv4 address to expose the API.
+        :param port: (int) The port to expose the API.
+        :return: None
+        """
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=self.backlog)
+
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        """
+            Attends the requests of a connection, one after the other, until the client closes it.
+
+        :param reader: (asyncio.StreamReader) The incoming side of the connection.
+        :param writer: (asyncio.StreamWriter) The outgoing side of the connection.
+        :return: None
+        """
+        try:
+            keep_alive = True
+
+            while keep_alive:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+
+                    body_size = int(headers.get("content-length", 0))
+
+                except ValueError:
+                    status, response, keep_alive, target = 400, "", False, ""
+
+                else:
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection != "close" and (version != "HTTP/1.0" or connection == "keep-alive")
+
+                    if 0 <= body_size <= self.MAX_BODY_SIZE:
+                        body = await reader.readexactly(body_size)
+                        status, response = await self.handle(method, target, body)
+                    else:
+                        status, response, keep_alive = 413, "", False
+
+                if isinstance(response, str):
+                    response = response.encode()
+                content_type = self.CONTENT_TYPES.get(target.partition("?")[0], "application/json")
+                writer.write("HTTP/1.1 {} {}\r\nContent-Type: {}\r\nContent-Length: {}\r\n{}\r\n".format(
+                    status, self.REASONS[status], content_type, len(response),
+                    "" if keep_alive else "Connection: close\r\n").encode("latin-1") + response)
+                await writer.drain()
+
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+
+        finally:
+            writer.close()
+
+    async def handle(self, method, target, body):
+        """
+            Attends the specified request.
+
+        :param method: (str) The HTTP method.
+        :param target: (str) The path of the request, with the query string (if any).
+        :param body: (bytes) The body of the request.
+        :return: (tuple) The HTTP status and the JSON response (either stringified or encoded).
+        """
+        path, _, query = target.partition("?")
+        status, response = 404, ""
+
+        for route_method, route_path, name in self.ROUTES:
+            match = route_path.fullmatch(path)
+            if match is not None:
+                if route_method != method:
+                    status = 405
+                    continue
+
+                start = self.api_metrics.start(name)
+                try:
+                    named = set(route_path.groupindex.values())
+                    args = [group if index in named else int(group)
+                            for index, group in enumerate(match.groups(), 1)]
+                    response = await getattr(self, name)(*args, body=body, query=query)
+                    status = 200
+
+                except ValueError:
+                    status, response = 400, ""
+
+                except Exception:
+                    logger.exception("Failed request {} {}".format(method, target))
+                    status, response = 500, ""
+
+                finally:
+                    self.api_metrics.finish(name, start)
+
+                break
+
+        return status, response
+
+    async def score(self, body, query):
+        return dumps(await self.scoreboard.update_async(loads(body.decode())))
+
+    async def scores(self, body, query):
+        return dumps(await self.scoreboard.update_many_async(loads(body.decode())))
+
+    async def top(self, top_size, body, query):
+        # Encoded by the server, sent as is
+        return await self.scoreboard.top_async(top_size, encoded=True)
+
+    async def relative_top(self, ranking_position, scope_size, body, query):
+        return await self.scoreboard.relative_top_async(ranking_position, scope_size, encoded=True)
+
+    async def around(self, user, scope, body, query):
+        return await self.scoreboard.around_async(user, scope, encoded=True)
+
+    async def percentile(self, user, body, query):
+        return dumps(await self.scoreboard.percentile_async(user))
+
+    async def score_at(self, percentile, body, query):
+        try:
+            percentile = float(percentile)
+
+        except ValueError:
+            response = {"error": "Invalid percentile"}
+
+        else:
+            response = await self.scoreboard.score_at_async(percentile)
+
+        return dumps(response)
+
+    async def ranking(self, body, query):
+        args = dict(parse_qsl(query))
+
+        try:
+            limit = parse_ranking_query(args)
+
+        except ValueError:
+            response = {"error": "Invalid after, limit values"}
+
+        else:
+            response = await self.scoreboard.ranking_async(limit, args.get("after"))
+
+        return dumps(response)
+
+    async def rank(self, user, body, query):
+        return dumps(await self.scoreboard.rank_async(user))
+
+    async def windows_info(self, body, query):
+        return dumps(await self.scoreboard.windows_info_async())
+
+    async def window_top(self, window, top_size, body, query):
+        closed = parse_window_query(dict(parse_qsl(query)))
+        return dumps(await self.scoreboard.window_top_async(window, top_size, closed))
+
+    async def window_rank(self, window, user, body, query):
+        closed = parse_window_query(dict(parse_qsl(query)))
+        return dumps(await self.scoreboard.window_rank_async(window, user, closed))
+
+    async def boards_stats(self, body, query):
+        return dumps(await self.scoreboard.boards_stats_async())
+
+    async def board_score(self, board, body, query):
+        return dumps(await self.scoreboard.board_update_async(board, loads(body.decode())))
+
+    async def board_scores(self, board, body, query):
+        return dumps(await self.scoreboard.board_update_many_async(board, loads(body.decode())))
+
+    async def board_top(self, board, top_size, body, query):
+        return dumps(await self.scoreboard.board_top_async(board, top_size))
+
+    async def board_rank(self, board, user, body, query):
+        return dumps(await self.scoreboard.board_rank_async(board, user))
+
+    async def stats(self, body, query):
+        try:
+            bins, percentiles, thresholds = parse_stats_query(dict(parse_qsl(query)))
+
+        except ValueError:
+            response = {"error": "Invalid bins, percentiles, thresholds values"}
+
+        else:
+            response = await self.scoreboard.stats_async(bins, percentiles, thresholds)
+
+        return dumps(response)
+
+    async def metrics(self, body, query):
+        try:
+            server_metrics = await self.scoreboard.metrics_async()
+
+        except TransportError:
+            server_metrics = None
+
+        return render_metrics(self.api_metrics.snapshot(), server_metrics)
+
+    #
+    # Just for DEBUG
+    #
+    async def reset(self, body, query):
+        if DEBUG:
+            await self.scoreboard.reset_async()
+
+        return ""
+
+
+def get_async_api(scoreboard_wrapper):
+    """
+        Returns an initialized asyncio HTTP RESTful API
+
+    :param scoreboard_wrapper: (ScoreboardWrapper) Give access to the shared Scoreboard.
+    :return: (AsyncApi) API to communicate with clients.
+    """
+    return AsyncApi(scoreboard_wrapper)
@@ -0,0 +1,161 @@
+#!/bin/python3
+
+"""
+    Benchmark of the memory used per player by the Scoreboard.
+
+    Each measurement is run in its own process, that reports the growth of its resident set size (RSS) while building a
+    Scoreboard of the specified number of players, with each one of the following layouts:
+
+        baseline: the original Scoreboard, i.e., a Client with an instance __dict__ (id and score) per player, kept in
+                the list of its score in a bintrees FastAVLTree (bintrees is no longer a dependency: the layout is
+                skipped if it is not installed).
+        dict: the current Scoreboard, but with a Client with an instance __dict__ (i.e., the effect of the slots).
+        current: the current Scoreboard (a slotted Client, see Client).
+
+    From the scoreboard directory (where is located the scoreboard.py file) execute:
+
+        python3 -m benchmarks.bench_memory [--sizes 1000000 10000000] [--max-score 1000000]
+"""
+
+import argparse
+import random
+from multiprocessing import Process, Queue
+
+import os
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+import scoreboard as scoreboard_module
+from client import Client
+from scoreboard import Scoreboard
+
+
+class DictClient():
+    """
+        Former per player representation: same attributes than Client, but kept in an instance __dict__.
+    """
+    def __init__(self, id):
+        self.id = id
+        self.score = 0
+        self.prev = None
+        self.next = None
+
+    total = Client.total
+    relative = Client.relative
+
+
+class BaselineClient():
+    """
+        Per player representation of the original Scoreboard: only the id and the score, in an instance __dict__.
+    """
+    def __init__(self, id):
+        self.id = id
+        self.score = 0
+
+
+class BaselineScoreboard():
+    """
+        The original Scoreboard: a dict of clients, and a FastAVLTree in which each score is mapped to the list of its
+        clients. Only the updates are kept (see Scoreboard.update).
+    """
+    def __init__(self):
+        from bintrees import FastAVLTree
+
+        self.clients = {}
+        self.sorted_clients = FastAVLTree()
+
+    def update_many(self, client_info_list):
+        for client_info in client_info_list:
+            client_id = int(client_info["user"])
+
+            if client_id not in self.clients:
+                self.clients[client_id] = BaselineClient(client_id)
+            else:
+                prior_score = self.clients[client_id].score
+                if len(self.sorted_clients[prior_score]) > 1:
+                    self.sorted_clients[prior_score].remove(self.clients[client_id])
+                else:
+                    del self.sorted_clients[prior_score]
+
+            self.clients[client_id].score = int(client_info["total"])
+
+            new_score = self.clients[client_id].score
+            if new_score not in self.sorted_clients:
+                self.sorted_clients.insert(new_score, [])
+            self.sorted_clients[new_score].append(self.clients[client_id])
+
+
+LAYOUTS = ["baseline", "dict", "current"]
+
+BATCH_SIZE = 10000
+
+
+def get_rss():
+    """
+        Returns the current resident set size of this process.
+
+    :return: (int) Bytes.
+    """
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure(layout, num_clients, max_score, queue, seed=0):
+    """
+        Builds a Scoreboard of num_clients players, using the specified layout, and puts in the queue the growth of the
+            RSS per player.
+
+    :param layout: (str) Layout (see module description).
+    :param num_clients: (int) Number of players.
+    :param max_score: (int) Scores are uniformly distributed between 0 and max_score.
+    :param queue: (Queue) Where the result is put. None if the layout is not available.
+    :param seed: (int) Random seed, to get reproducible results.
+    :return: None
+    """
+    rnd = random.Random(seed)
+
+    if layout == "baseline":
+        try:
+            scoreboard = BaselineScoreboard()
+        except ImportError:
+            queue.put(None)
+            return
+    else:
+        scoreboard_module.Client = DictClient if layout == "dict" else Client
+        scoreboard = Scoreboard()
+
+    initial_rss = get_rss()
+
+    for first_client_id in range(0, num_clients, BATCH_SIZE):
+        last_client_id = min(first_client_id + BATCH_SIZE, num_clients)
+        scoreboard.update_many([{"user": client_id, "total": rnd.randint(0, max_score)}
+                                for client_id in range(first_client_id, last_client_id)])
+
+    queue.put((get_rss() - initial_rss) / num_clients)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoreboard memory per player benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000000, 10000000],
+                        help="Number of players of each run")
+    parser.add_argument("--max-score", type=int, default=1000000, help="Scores are uniformly distributed from 0")
+    args = parser.parse_args()
+
+    print("{:>12} {:>18} {:>18} {:>18}".format("players", *["{} (B/plyr)".format(layout) for layout in LAYOUTS]))
+    for num_clients in args.sizes:
+        bytes_per_client = []
+
+        for layout in LAYOUTS:
+            queue = Queue()
+            process = Process(target=measure, args=(layout, num_clients, args.max_score, queue))
+            process.start()
+            bytes_per_client.append(queue.get())
+            process.join()
+
+        print("{:>12} {:>18} {:>18} {:>18}".format(num_clients, *["-" if value is None else "{:.1f}".format(value)
+                                                                  for value in bytes_per_client]))
+
+
+if __name__ == '__main__':
+    main()
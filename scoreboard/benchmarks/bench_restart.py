@@ -0,0 +1,139 @@
+#!/bin/python3
+
+"""
+    Benchmark of the restart of the server: time from start to serving, restoring the Scoreboard from the newest
+    snapshot plus the tail of the write-ahead log (see ScoreboardWrapper.restore).
+
+    From the scoreboard directory (where is located the scoreboard.py file) execute:
+
+        python3 -m benchmarks.bench_restart [--sizes 1000000 10000000] [--tail 100000] [--full-replay]
+"""
+
+import argparse
+import gc
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+import os
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from scoreboard import Scoreboard
+from scoreboard_wrapper import ScoreboardWrapper
+from snapshot import Snapshot
+from wal import WriteAheadLog
+
+BATCH_SIZE = 10000
+
+
+def build_scoreboard(num_clients, max_score, seed=0):
+    """
+        Returns a Scoreboard of num_clients players, with uniformly distributed scores.
+
+    :param num_clients: (int) Number of players.
+    :param max_score: (int) Scores are uniformly distributed between 0 and max_score.
+    :param seed: (int) Random seed, to get reproducible results.
+    :return: (Scoreboard)
+    """
+    rnd = np.random.RandomState(seed)
+    scores = np.sort(rnd.randint(0, max_score + 1, num_clients))
+
+    scoreboard = Scoreboard()
+    scoreboard.load(rnd.permutation(num_clients).tolist(), scores.tolist())
+
+    return scoreboard
+
+
+def write_log(wal_path, num_clients, num_records, max_score, after_seq=0, seed=1):
+    """
+        Appends num_records random updates to the write-ahead log.
+
+    :param wal_path: (str) The write-ahead log.
+    :param num_clients: (int) Number of players.
+    :param num_records: (int) Number of records.
+    :param max_score: (int) Scores are uniformly distributed between 0 and max_score.
+    :param after_seq: (int) Sequence number of the last record already covered.
+    :param seed: (int) Random seed, to get reproducible results.
+    :return: None
+    """
+    rnd = np.random.RandomState(seed)
+
+    wal = WriteAheadLog(wal_path)
+    wal.last_seq = wal.synced_seq = after_seq
+    wal.open()
+
+    for first in range(0, num_records, BATCH_SIZE):
+        size = min(BATCH_SIZE, num_records - first)
+        wal.log([{"user": client_id, "total": total}
+                 for client_id, total in zip(rnd.randint(0, num_clients, size).tolist(),
+                                             rnd.randint(0, max_score + 1, size).tolist())])
+    wal.close()
+
+
+def restart(wal_path, snapshot_path):
+    """
+        Restores a server from the snapshot and the write-ahead log, as ScoreboardWrapper.start does.
+
+    :param wal_path: (str) The write-ahead log.
+    :param snapshot_path: (str) The snapshot. None to replay the whole write-ahead log.
+    :return: (tuple) The elapsed seconds and the restored ScoreboardWrapper.
+    """
+    start = time.perf_counter()
+
+    server = ScoreboardWrapper(wal_path=wal_path, snapshot_path=snapshot_path)
+    server.scoreboard = Scoreboard()
+    server.wal = WriteAheadLog(wal_path)
+    server.restore()
+
+    return time.perf_counter() - start, server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server restart (snapshot + write-ahead log tail) benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000000, 10000000],
+                        help="Number of players of each run")
+    parser.add_argument("--tail", type=int, default=100000, help="Write-ahead log records after the snapshot")
+    parser.add_argument("--max-score", type=int, default=1000000, help="Scores are uniformly distributed from 0")
+    parser.add_argument("--full-replay", action="store_true",
+                        help="Also measure a restart replaying one record per player (no snapshot)")
+    args = parser.parse_args()
+
+    print("{:>12} {:>10} {:>14} {:>14} {:>16}".format("players", "tail", "snapshot (s)", "restart (s)",
+                                                       "full replay (s)"))
+    for num_clients in args.sizes:
+        data_dir = tempfile.mkdtemp()
+        wal_path = os.path.join(data_dir, "bench.wal")
+        snapshot_path = os.path.join(data_dir, "bench.snapshot")
+
+        try:
+            scoreboard = build_scoreboard(num_clients, args.max_score)
+            start = time.perf_counter()
+            Snapshot(snapshot_path).write(scoreboard, num_clients)
+            snapshot_time = time.perf_counter() - start
+            del scoreboard
+            gc.collect()
+
+            write_log(wal_path, num_clients, args.tail, args.max_score, after_seq=num_clients)
+            restart_time, server = restart(wal_path, snapshot_path)
+            assert len(server.scoreboard.clients) == num_clients
+            del server
+            gc.collect()
+
+            full_replay = "-"
+            if args.full_replay:
+                full_wal_path = os.path.join(data_dir, "full.wal")
+                write_log(full_wal_path, num_clients, num_clients, args.max_score)
+                full_replay = "{:.2f}".format(restart(full_wal_path, None)[0])
+
+            print("{:>12} {:>10} {:>14.2f} {:>14.2f} {:>16}".format(num_clients, args.tail, snapshot_time,
+                                                                    restart_time, full_replay))
+        finally:
+            shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+#!/bin/python3
+
+"""
+    Benchmark suite of the Scoreboard operations (update, top, relative_top, and the JSON encoding of their responses
+    by the ScoreboardWrapper) at increasing board sizes, with realistic score distributions:
+
+        uniform: scores uniformly distributed from 0 to MAX_RANDOM_SCORE.
+        zipf: a few high scores and a long tail of low ones (Zipf distribution), as in most casual games.
+        ties: all the scores within a handful of values (e.g., launch day, or a level-based score).
+
+    Each (distribution, size) is run in its own process, that reports the operations per second and the p50 and p99
+    latencies of each operation, and the peak of the memory it allocates (traced by tracemalloc in a separate pass of
+    up to TRACED_OPS calls, so the tracing does not slow down the timed ones). The peak resident set size (RSS) of the
+    process is reported once per run, as its own row. Results are printed as a table, and also written as JSON if
+    requested (--output). The run fails (exit status 1) when any operation regresses past the tolerance, compared with
+    a baseline (--baseline, the JSON output of a former run, by default the committed benchmarks/baseline.json; an
+    empty value to skip the comparison).
+
+    From the scoreboard directory (where is located the scoreboard.py file) execute:
+
+        python3 -m benchmarks.bench_suite [--sizes 10000 100000 1000000] [--distributions uniform zipf ties]
+                                          [--ops 10000] [--output results.json] [--baseline baseline.json]
+                                          [--tolerance 0.25]
+"""
+
+import argparse
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from json import dump, load
+from multiprocessing import Process, Queue
+
+import numpy as np
+
+import os
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from scoreboard import Scoreboard
+from scoreboard_wrapper import ScoreboardWrapper
+
+MAX_RANDOM_SCORE = 1000000
+
+TOP_SIZE = 100
+SCOPE_SIZE = 10
+
+TRACED_OPS = 1000
+
+BASELINE_PATH = os.path.join(path, "baseline.json")
+
+
+def random_scores(distribution, num_clients, rnd):
+    """
+        Returns a random score for each client, following the specified distribution (see module description).
+
+    :param distribution: (str) Either "uniform", "zipf" or "ties".
+    :param num_clients: (int) Number of clients.
+    :param rnd: (numpy.random.RandomState) Random generator.
+    :return: (numpy.ndarray) The scores.
+    """
+    if distribution == "uniform":
+        result = rnd.randint(0, MAX_RANDOM_SCORE + 1, num_clients)
+    elif distribution == "zipf":
+        result = np.minimum(rnd.zipf(1.5, num_clients) - 1, MAX_RANDOM_SCORE)
+    elif distribution == "ties":
+        result = rnd.choice([0, 10, 20, 50, 100], num_clients, p=[0.8, 0.1, 0.05, 0.03, 0.02])
+    else:
+        raise ValueError("Unknown distribution: {}".format(distribution))
+
+    return result.astype(np.int64)
+
+
+def build_scoreboard(scores):
+    """
+        Returns a Scoreboard of clients 0 to N-1, with the specified scores (see Scoreboard.load).
+
+    :param scores: (numpy.ndarray) The score of each client.
+    :return: (Scoreboard)
+    """
+    client_ids = np.argsort(scores, kind="stable")
+
+    scoreboard = Scoreboard()
+    scoreboard.load(client_ids.tolist(), scores[client_ids].tolist())
+
+    return scoreboard
+
+
+def get_peak_rss():
+    """
+        Returns the peak resident set size of this process (i.e., since it started, it never goes down).
+
+    :return: (float) Megabytes.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Kilobytes on Linux
+
+
+def timed(operation, args_list, prepare=None):
+    """
+        Runs the specified operation once per arguments, measuring each call. Then, runs it again for up to TRACED_OPS
+            of the arguments, tracing the memory it allocates.
+
+    :param operation: (callable) The operation.
+    :param args_list: (list of tuple) The arguments of each call.
+    :param prepare: (callable) Receives the arguments, and returns the actual arguments of the call (not measured,
+                e.g., to build the response to encode). None to call the operation with the arguments as is.
+    :return: (dict) The operations per second, the p50 and p99 latencies (in microseconds), and the peak of the memory
+                allocated by a single call (in kilobytes, over the memory allocated before it).
+    """
+    latencies = np.empty(len(args_list))
+    clock = time.perf_counter
+
+    for ptr, args in enumerate(args_list):
+        if prepare is not None:
+            args = prepare(*args)
+        start = clock()
+        operation(*args)
+        latencies[ptr] = clock() - start
+
+    alloc_peak = 0
+    tracemalloc.start()
+    for args in args_list[:TRACED_OPS]:
+        if prepare is not None:
+            args = prepare(*args)
+        tracemalloc.reset_peak()
+        allocated = tracemalloc.get_traced_memory()[0]
+        operation(*args)
+        alloc_peak = max(alloc_peak, tracemalloc.get_traced_memory()[1] - allocated)
+    tracemalloc.stop()
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000000
+    return {"ops_per_sec": len(args_list) / latencies.sum(), "p50_us": p50, "p99_us": p99,
+            "alloc_peak_kb": alloc_peak / 1024}
+
+
+def measure(distribution, num_clients, num_ops, queue, seed=0):
+    """
+        Builds a Scoreboard of num_clients players, benchmarks each operation on it, and puts the results in the queue.
+
+    :param distribution: (str) Score distribution (see random_scores).
+    :param num_clients: (int) Number of players.
+    :param num_ops: (int) Number of measured calls of each operation.
+    :param queue: (Queue) Where the results (list of dict) are put.
+    :param seed: (int) Random seed, to get reproducible results.
+    :return: None
+    """
+    rnd = np.random.RandomState(seed)
+    scores = random_scores(distribution, num_clients, rnd)
+
+    start = time.perf_counter()
+    scoreboard = build_scoreboard(scores)
+    results = [{"operation": "build", "ops_per_sec": num_clients / (time.perf_counter() - start), "p50_us": None,
+                "p99_us": None, "alloc_peak_kb": None}]
+
+    client_ids = rnd.randint(0, num_clients, num_ops).tolist()
+    increments = rnd.randint(1, 100, num_ops).tolist()
+    positions = [(scoreboard.rank(client_id), SCOPE_SIZE) for client_id in client_ids]
+
+    # (<name>, <operation>, <arguments of each call>, <prepare>), see timed
+    operations = [
+        ("update", scoreboard.update, [({"user": client_id, "score": "+{}".format(increment)},)
+                                       for client_id, increment in zip(client_ids, increments)], None),
+        ("top", scoreboard.top, [(TOP_SIZE,)] * num_ops, None),
+        ("relative_top", scoreboard.relative_top, positions, None),
+        ("encode", ScoreboardWrapper._encode, positions, lambda *args: (scoreboard.relative_top(*args),)),
+    ]
+
+    for name, operation, args_list, prepare in operations:
+        result = timed(operation, args_list, prepare)
+        result["operation"] = name
+        results.append(result)
+
+    # The peak RSS of the whole run (it only grows, so it is not attributable to the last operation)
+    results.append({"operation": "run", "ops_per_sec": None, "p50_us": None, "p99_us": None, "alloc_peak_kb": None,
+                    "peak_rss_mb": get_peak_rss()})
+
+    for result in results:
+        result["distribution"] = distribution
+        result["size"] = num_clients
+    queue.put(results)
+
+
+def key_of(result):
+    return result["distribution"], result["size"], result["operation"]
+
+
+def find_regressions(results, baseline, tolerance):
+    """
+        Returns the operations of the results that regressed past the tolerance, compared with the baseline: fewer
+            operations per second, higher p99 latency, higher allocation peak, or higher peak RSS of the run.
+            Operations missing in the baseline are not compared.
+
+    :param results: (list of dict) The results of the run.
+    :param baseline: (list of dict) The results of the baseline run.
+    :param tolerance: (float) Allowed relative regression (e.g., 0.25 for 25%).
+    :return: (list of str) The description of each regression.
+    """
+    baseline = {key_of(result): result for result in baseline}
+    regressions = []
+
+    for result in results:
+        expected = baseline.get(key_of(result))
+
+        if expected is not None:
+            checks = [("ops_per_sec", -1), ("p99_us", 1), ("alloc_peak_kb", 1), ("peak_rss_mb", 1)]
+            for metric, sign in checks:
+                value, expected_value = result.get(metric), expected.get(metric)
+
+                if value is not None and expected_value and \
+                        sign * (value - expected_value) > tolerance * expected_value:
+                    regressions.append("{} {} {}: {} {:.1f} (baseline {:.1f})".format(*key_of(result), metric, value,
+                                                                                    expected_value))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoreboard benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000],
+                        help="Number of players of each run (e.g., up to 10000000)")
+    parser.add_argument("--distributions", nargs="+", default=["uniform", "zipf", "ties"],
+                        choices=["uniform", "zipf", "ties"], help="Score distributions")
+    parser.add_argument("--ops", type=int, default=10000, help="Number of measured calls of each operation")
+    parser.add_argument("--output", help="JSON file where the results are written")
+    parser.add_argument("--baseline", default=BASELINE_PATH,
+                        help="JSON file of a former run (see --output) to compare with. Empty not to compare")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    results = []
+
+    print("{:>8} {:>10} {:>14} {:>12} {:>10} {:>10} {:>12} {:>10}".format(
+        "distrib", "players", "operation", "ops/s", "p50 (us)", "p99 (us)", "alloc (KB)", "RSS (MB)"))
+    for distribution in args.distributions:
+        for num_clients in args.sizes:
+            # A process per run, so the peak RSS is its own
+            queue = Queue()
+            process = Process(target=measure, args=(distribution, num_clients, args.ops, queue))
+            process.start()
+            run_results = queue.get()
+            process.join()
+
+            for result in run_results:
+                metrics = ["-" if result.get(metric) is None else "{:.1f}".format(result[metric])
+                           for metric in ["ops_per_sec", "p50_us", "p99_us", "alloc_peak_kb", "peak_rss_mb"]]
+                print("{:>8} {:>10} {:>14} {:>12} {:>10} {:>10} {:>12} {:>10}".format(
+                    distribution, num_clients, result["operation"], *metrics))
+            results.extend(run_results)
+
+    if args.output is not None:
+        with open(args.output, "w") as output:
+            dump({"python": platform.python_version(), "machine": platform.machine(), "ops": args.ops,
+                  "results": results}, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = find_regressions(results, load(baseline)["results"], args.tolerance)
+
+        for regression in regressions:
+            print("REGRESSION {}".format(regression))
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
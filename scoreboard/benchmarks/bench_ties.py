@@ -0,0 +1,77 @@
+#!/bin/python3
+
+"""
+    Benchmark of Scoreboard.update on heavily tied boards (e.g., launch day, with all the players tied at 0).
+
+    From the scoreboard directory (where is located the scoreboard.py file) execute:
+
+        python3 -m benchmarks.bench_ties [--sizes 1000 10000 100000 500000] [--updates 10000]
+"""
+
+import argparse
+import random
+import time
+
+import os
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from scoreboard import Scoreboard
+
+
+def build_tied_scoreboard(num_clients, score=0):
+    """
+        Returns a Scoreboard in which all the clients are tied at the same score.
+
+    :param num_clients: (int) Number of clients.
+    :param score: (int) The score all the clients are tied at.
+    :return: (Scoreboard)
+    """
+    scoreboard = Scoreboard()
+
+    for client_id in range(num_clients):
+        scoreboard.update({"user": client_id, "total": score})
+
+    return scoreboard
+
+
+def bench_tied_updates(num_clients, num_updates, seed=0):
+    """
+        Measures the time per update of clients that leave the tied bucket (i.e., their first update after being tied).
+
+    :param num_clients: (int) Number of clients tied at 0.
+    :param num_updates: (int) Number of updates to measure. Capped to num_clients.
+    :param seed: (int) Random seed, to get reproducible results.
+    :return: (float) Microseconds per update.
+    """
+    rnd = random.Random(seed)
+    scoreboard = build_tied_scoreboard(num_clients)
+
+    num_updates = min(num_updates, num_clients)
+    client_info_list = [{"user": client_id, "score": "+{}".format(rnd.randint(1, 1000))}
+                        for client_id in rnd.sample(range(num_clients), num_updates)]
+
+    start = time.perf_counter()
+    for client_info in client_info_list:
+        scoreboard.update(client_info)
+    elapsed = time.perf_counter() - start
+
+    return elapsed * 1e6 / num_updates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoreboard.update benchmark on heavily tied boards")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 500000],
+                        help="Number of tied clients of each run")
+    parser.add_argument("--updates", type=int, default=10000, help="Number of measured updates of each run")
+    args = parser.parse_args()
+
+    print("{:>12} {:>12} {:>14}".format("tied", "updates", "us/update"))
+    for num_clients in args.sizes:
+        us_per_update = bench_tied_updates(num_clients, args.updates)
+        print("{:>12} {:>12} {:>14.2f}".format(num_clients, min(args.updates, num_clients), us_per_update))
+
+
+if __name__ == '__main__':
+    main()
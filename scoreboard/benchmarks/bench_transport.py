@@ -0,0 +1,196 @@
+#!/bin/python3
+
+"""
+    Benchmark of the transport between the clients and the server: round-trip latency and requests per second of the
+    pipelined DEALER/ROUTER transport (see TransportServer) compared with the former pizco Proxy/Server, with the same
+    server (ScoreboardWrapper) behind both of them.
+
+    The pizco transport is only measured if pizco is installed (it is no longer a requirement):
+
+        python3 -m pip install pizco
+
+    From the scoreboard directory (where is located the scoreboard.py file) execute:
+
+        python3 -m benchmarks.bench_transport [--players 100000] [--requests 10000] [--pipeline 1 16 64]
+"""
+
+import argparse
+import time
+from json import dumps
+from multiprocessing import get_context
+
+import numpy as np
+
+import os
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from scoreboard import Scoreboard
+from scoreboard_wrapper import ScoreboardWrapper
+from top_views import TopViews
+from transport import TransportClient
+from constants import DEFAULT_IP, SERVER_MODE
+
+NEW_PORT = 8700
+OLD_PORT = 8701
+
+
+def start_new_server(port):
+    """
+        Starts a server behind the DEALER/ROUTER transport (no write-ahead log, no replicas).
+
+    :param port: (int) The port to listen on.
+    :return: None
+    """
+    ScoreboardWrapper(port, replica_port_offset=None).start(SERVER_MODE)
+
+
+def start_old_server(port):
+    """
+        Starts a server behind a pizco Server, as ScoreboardWrapper.start used to do.
+
+    :param port: (int) The port to listen on.
+    :return: None
+    """
+    from pizco import Server
+
+    server = ScoreboardWrapper(port, replica_port_offset=None)
+    server.mode = SERVER_MODE
+    server.scoreboard = Scoreboard()
+    server.top_views = TopViews([])
+    Server(server, "tcp://{}:{}".format(DEFAULT_IP, port)).serve_forever()
+
+
+def populate(call, num_players, seed=0):
+    """
+        Reports a random score for each player, in batches.
+
+    :param call: (callable) Sends a request (command, *args) and returns its reply.
+    :param num_players: (int) Number of players.
+    :param seed: (int) Random seed, to get reproducible results.
+    :return: None
+    """
+    rnd = np.random.RandomState(seed)
+    scores = rnd.randint(0, 1000000, num_players).tolist()
+
+    for first in range(0, num_players, 10000):
+        call("update_many", dumps([{"user": client_id, "total": scores[client_id]}
+                                   for client_id in range(first, min(num_players, first + 10000))]))
+
+
+def requests(num_requests, num_players, seed=1):
+    """
+        Returns a mix of reads (Top100) and relative updates, one of each in turn.
+
+    :param num_requests: (int) Number of requests.
+    :param num_players: (int) Number of players.
+    :param seed: (int) Random seed, to get reproducible results.
+    :return: (list of tuple) The (<command>, <arg>) of each request.
+    """
+    rnd = np.random.RandomState(seed)
+    result = []
+
+    for ptr, client_id in enumerate(rnd.randint(0, num_players, num_requests).tolist()):
+        if ptr % 2:
+            result.append(("update", dumps({"user": client_id, "score": "+1"})))
+        else:
+            result.append(("top", "100"))
+
+    return result
+
+
+def bench_sequential(call, request_list):
+    """
+        Sends the requests one at a time (i.e., waits for each reply before sending the next one).
+
+    :param call: (callable) Sends a request (command, *args) and returns its reply.
+    :param request_list: (list of tuple) The requests.
+    :return: (tuple) The requests per second, and the p50 and p99 round-trip latencies (in microseconds).
+    """
+    latencies = []
+
+    start = time.perf_counter()
+    for command, arg in request_list:
+        request_start = time.perf_counter()
+        call(command, arg)
+        latencies.append(time.perf_counter() - request_start)
+    elapsed = time.perf_counter() - start
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000000
+    return len(request_list) / elapsed, p50, p99
+
+
+def bench_pipelined(client, request_list, depth):
+    """
+        Sends the requests keeping up to depth of them in flight (only supported by the DEALER/ROUTER transport).
+
+    :param client: (TransportClient) The connection.
+    :param request_list: (list of tuple) The requests.
+    :param depth: (int) Maximum number of requests in flight.
+    :return: (float) The requests per second.
+    """
+    start = time.perf_counter()
+    for first in range(0, len(request_list), depth):
+        request_ids = [client.send(command, arg) for command, arg in request_list[first:first + depth]]
+        for request_id in request_ids:
+            client.receive(request_id)
+
+    return len(request_list) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Client/server transport benchmark")
+    parser.add_argument("--players", type=int, default=100000, help="Number of players in the server")
+    parser.add_argument("--requests", type=int, default=10000, help="Number of requests of each run")
+    parser.add_argument("--pipeline", type=int, nargs="+", default=[1, 16, 64],
+                        help="Requests in flight of each pipelined run (DEALER/ROUTER only)")
+    args = parser.parse_args()
+
+    # Spawned, since ZMQ contexts must not be forked
+    context = get_context("spawn")
+    request_list = requests(args.requests, args.players)
+    servers = []
+
+    try:
+        print("{:>14} {:>10} {:>12} {:>14} {:>14}".format("transport", "in flight", "requests/s", "p50 (us)",
+                                                         "p99 (us)"))
+
+        server = context.Process(target=start_new_server, args=(NEW_PORT,))
+        server.start()
+        servers.append(server)
+
+        client = TransportClient("tcp://{}:{}".format(DEFAULT_IP, NEW_PORT), timeout=60.0)
+        populate(client.request, args.players)
+
+        rate, p50, p99 = bench_sequential(client.request, request_list)
+        print("{:>14} {:>10} {:>12.0f} {:>14.1f} {:>14.1f}".format("dealer/router", 1, rate, p50, p99))
+        for depth in args.pipeline:
+            if depth > 1:
+                rate = bench_pipelined(client, request_list, depth)
+                print("{:>14} {:>10} {:>12.0f} {:>14} {:>14}".format("dealer/router", depth, rate, "-", "-"))
+
+        try:
+            from pizco import Proxy
+        except ImportError:
+            print("{:>14} (not installed)".format("pizco"))
+            return
+
+        server = context.Process(target=start_old_server, args=(OLD_PORT,))
+        server.start()
+        servers.append(server)
+
+        proxy = Proxy("tcp://{}:{}".format(DEFAULT_IP, OLD_PORT))
+        populate(lambda command, *call_args: getattr(proxy, command)(*call_args), args.players)
+
+        rate, p50, p99 = bench_sequential(lambda command, *call_args: getattr(proxy, command)(*call_args),
+                                          request_list)
+        print("{:>14} {:>10} {:>12.0f} {:>14.1f} {:>14.1f}".format("pizco", 1, rate, p50, p99))
+
+    finally:
+        for server in servers:
+            server.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,447 @@
+#!/bin/python3
+
+"""
+    End-to-end load generator of the whole application, as launched by main.py: NUM_SHARDS servers and NUM_CLIENTS
+    clients, each one exposing the HTTP API on consecutive ports from DEFAULT_PORT (see conf.py and constants.py).
+
+    Several worker processes keep a number of persistent HTTP connections each (spread over the ports of all the
+    clients), and every connection sends requests one after the other (closed loop), drawn from a configurable mix of
+    reads and writes. The latency of each request is recorded per endpoint in an HDR-style histogram (see
+    LatencyHistogram). The load is run at increasing concurrency (total number of connections), and each step reports
+    its throughput, tail latencies and error rate, until the throughput stops growing (saturation).
+
+    Everything runs on the loopback interface. Either start the application first (python3 main.py) or let the load
+    generator launch it (--launch, with no write-ahead log, so every run starts from an empty scoreboard).
+
+    From the scoreboard directory (where is located the scoreboard.py file) execute:
+
+        python3 -m benchmarks.load_generator [--launch] [--clients 1] [--shards 1] [--users 100000]
+                                             [--mix score=20,top=30,rank=20,around=20,percentile=10]
+                                             [--concurrency 1 2 4 8 16 32 64 128] [--processes 4] [--duration 10]
+                                             [--output results.json]
+"""
+
+import argparse
+import http.client
+import logging
+import random
+import socket
+import threading
+import time
+from json import dump, dumps
+from multiprocessing import get_context
+
+import os
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from conf import NUM_CLIENTS, NUM_SHARDS
+from constants import DEFAULT_IP, DEFAULT_PORT
+
+# <endpoint>: (<method>, <path pattern>, <body pattern>), formatted with a random user, score and ranking position
+ENDPOINTS = {
+    "score": ("PUT", "/score", '{{"user": {user}, "score": "+{score}"}}'),
+    "top": ("GET", "/top/100", None),
+    "relative_top": ("GET", "/top/{position}/5", None),
+    "rank": ("GET", "/rank/{user}", None),
+    "around": ("GET", "/around/{user}/5", None),
+    "percentile": ("GET", "/percentile/{user}", None),
+}
+
+REQUEST_TIMEOUT = 10.0
+
+
+class LatencyHistogram():
+    """
+        HDR-style histogram of latencies, in microseconds: values below 2^SUB_BUCKET_BITS are counted exactly, and
+        higher ones in 2^(SUB_BUCKET_BITS - 1) linear sub-buckets per power of two, so every value is recorded within a
+        relative error below 2% (with 7 bits), with a fixed number of counters regardless of the range of values.
+        Histograms of different workers are merged by adding their counts.
+    """
+    SUB_BUCKET_BITS = 7
+    MAX_VALUE = 2**37 - 1  # Higher latencies (i.e., more than 38 hours) are counted as this one
+
+    def __init__(self, counts=None):
+        self.counts = counts if counts is not None else [0] * (self.index_of(self.MAX_VALUE) + 1)
+
+    @classmethod
+    def index_of(cls, value):
+        """
+            Returns the index of the counter of the specified value.
+
+        :param value: (int) The value, from 0 to MAX_VALUE.
+        :return: (int)
+        """
+        shift = value.bit_length() - cls.SUB_BUCKET_BITS
+
+        if shift <= 0:
+            return value
+
+        half = 1 << (cls.SUB_BUCKET_BITS - 1)
+        return (1 << cls.SUB_BUCKET_BITS) + (shift - 1) * half + (value >> shift) - half
+
+    @classmethod
+    def value_of(cls, index):
+        """
+            Returns the highest value counted by the specified counter (i.e., the reported value of its percentiles).
+
+        :param index: (int) The index of the counter.
+        :return: (int)
+        """
+        if index < 1 << cls.SUB_BUCKET_BITS:
+            return index
+
+        half = 1 << (cls.SUB_BUCKET_BITS - 1)
+        shift, sub_bucket = divmod(index - (1 << cls.SUB_BUCKET_BITS), half)
+
+        return ((half + sub_bucket + 1) << (shift + 1)) - 1
+
+    def record(self, seconds):
+        """
+            Counts the specified latency.
+
+        :param seconds: (float) The latency.
+        :return: None
+        """
+        self.counts[self.index_of(min(int(seconds * 1000000), self.MAX_VALUE))] += 1
+
+    def merge(self, other):
+        """
+            Adds the counts of the specified histogram to this one.
+
+        :param other: (LatencyHistogram) The histogram.
+        :return: None
+        """
+        self.counts = [count + other_count for count, other_count in zip(self.counts, other.counts)]
+
+    def total(self):
+        return sum(self.counts)
+
+    def percentiles(self, percentiles):
+        """
+            Returns the latencies at the specified percentiles.
+
+        :param percentiles: (list of float) The percentiles, from 0 to 100, in ascending order.
+        :return: (list of int) The latency at each percentile, in microseconds. None if there are no latencies.
+        """
+        total = self.total()
+        if not total:
+            return [None] * len(percentiles)
+
+        result = []
+        cumulative = 0
+        index = -1
+
+        for percentile in percentiles:
+            ordinal = max(1, -(-percentile * total // 100))
+            while cumulative < ordinal:
+                index += 1
+                cumulative += self.counts[index]
+            result.append(self.value_of(index))
+
+        return result
+
+
+def parse_mix(mix):
+    """
+        Returns the endpoints and weights of the specified mix of requests.
+
+    :param mix: (str) Comma-separated <endpoint>=<weight> (see ENDPOINTS), e.g., "score=20,top=80".
+    :return: (tuple) The list of endpoints, and the list of their weights.
+    """
+    endpoints, weights = [], []
+
+    for item in mix.split(","):
+        endpoint, _, weight = item.partition("=")
+        if endpoint not in ENDPOINTS:
+            raise argparse.ArgumentTypeError("Unknown endpoint: {}".format(endpoint))
+        endpoints.append(endpoint)
+        weights.append(float(weight))
+
+    return endpoints, weights
+
+
+def connection_loop(port, endpoints, weights, num_users, deadline, histograms, errors, seed):
+    """
+        Sends requests through a persistent connection to the specified port, one after the other, until the
+            deadline, recording the latency (or the error) of each one.
+
+    :param port: (int) The port of the HTTP API.
+    :param endpoints: (list of str) The endpoints of the mix (see ENDPOINTS).
+    :param weights: (list of float) Weight of each endpoint.
+    :param num_users: (int) Users are drawn uniformly from 0 to num_users - 1.
+    :param deadline: (float) Time (see time.perf_counter) to stop at.
+    :param histograms: (dict) The LatencyHistogram of each endpoint, where the latencies are recorded (own of the
+                connection, so no lock is needed).
+    :param errors: (dict) Number of failed requests of each endpoint (HTTP status other than 200, or no response).
+    :param seed: (int) Random seed, to get reproducible requests.
+    :return: None
+    """
+    rnd = random.Random(seed)
+    connection = http.client.HTTPConnection(DEFAULT_IP, port, timeout=REQUEST_TIMEOUT)
+    clock = time.perf_counter
+
+    while clock() < deadline:
+        endpoint = rnd.choices(endpoints, weights)[0]
+        method, path_pattern, body_pattern = ENDPOINTS[endpoint]
+        values = {"user": rnd.randrange(num_users), "score": rnd.randint(1, 100),
+                  "position": rnd.randint(1, num_users)}
+        body = body_pattern.format(**values) if body_pattern is not None else None
+
+        start = clock()
+        try:
+            connection.request(method, path_pattern.format(**values), body,
+                               {"Content-Type": "application/json"} if body is not None else {})
+            response = connection.getresponse()
+            response.read()
+            failed = response.status != 200
+
+        except (OSError, http.client.HTTPException):
+            failed = True
+            connection.close()  # Reconnects on the next request
+
+        if failed:
+            errors[endpoint] += 1
+        else:
+            histograms[endpoint].record(clock() - start)
+
+    connection.close()
+
+
+def worker(ports, num_connections, endpoints, weights, num_users, duration, queue, seed):
+    """
+        Runs the specified number of connections (a thread each) for the specified time, spread over the ports, and
+            puts in the queue the histograms and the errors of each endpoint.
+
+    :param ports: (list of int) The ports of the HTTP APIs of the clients.
+    :param num_connections: (int) Number of persistent connections of this worker.
+    :param endpoints: (list of str) The endpoints of the mix (see ENDPOINTS).
+    :param weights: (list of float) Weight of each endpoint.
+    :param num_users: (int) Number of users.
+    :param duration: (float) Seconds of load.
+    :param queue: (Queue) Where the results are put.
+    :param seed: (int) Random seed, to get reproducible requests.
+    :return: None
+    """
+    histograms = [{endpoint: LatencyHistogram() for endpoint in endpoints} for _ in range(num_connections)]
+    errors = [{endpoint: 0 for endpoint in endpoints} for _ in range(num_connections)]
+    deadline = time.perf_counter() + duration
+
+    threads = [threading.Thread(target=connection_loop, args=(ports[(seed + ptr) % len(ports)], endpoints, weights,
+                                                              num_users, deadline, histograms[ptr], errors[ptr],
+                                                              seed * 1000 + ptr))
+               for ptr in range(num_connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    result = {}
+    for endpoint in endpoints:
+        histogram = LatencyHistogram()
+        for connection_histograms in histograms:
+            histogram.merge(connection_histograms[endpoint])
+        result[endpoint] = (histogram.counts, sum(connection_errors[endpoint] for connection_errors in errors))
+    queue.put(result)
+
+
+def run_step(context, ports, concurrency, num_processes, endpoints, weights, num_users, duration):
+    """
+        Runs the load with the specified total number of connections, spread over the worker processes.
+
+    :return: (dict) The merged LatencyHistogram and the number of errors of each endpoint, as (<histogram>, <errors>).
+    """
+    num_processes = min(num_processes, concurrency)
+    queue = context.Queue()
+
+    processes = [context.Process(target=worker, args=(ports, concurrency // num_processes +
+                                                      (1 if ptr < concurrency % num_processes else 0),
+                                                      endpoints, weights, num_users, duration, queue, ptr))
+                 for ptr in range(num_processes)]
+    for process in processes:
+        process.start()
+
+    result = {endpoint: (LatencyHistogram(), 0) for endpoint in endpoints}
+    for _ in processes:
+        for endpoint, (counts, errors) in queue.get().items():
+            histogram, total_errors = result[endpoint]
+            histogram.merge(LatencyHistogram(counts))
+            result[endpoint] = (histogram, total_errors + errors)
+
+    for process in processes:
+        process.join()
+
+    return result
+
+
+def summarize(step, duration):
+    """
+        Returns the throughput, tail latencies and error rate of each endpoint of a step, and of all of them.
+
+    :param step: (dict) The histogram and the errors of each endpoint (see run_step).
+    :param duration: (float) Seconds of load.
+    :return: (dict) As follows (latencies in microseconds, error rate from 0 to 1):
+
+                {"<endpoint>": {"requests_per_sec": <rate>, "p50_us": <p50>, "p99_us": <p99>, "p999_us": <p999>,
+                                "error_rate": <error_rate>}, ..., "all": {...}}
+    """
+    overall = (LatencyHistogram(), 0)
+    for histogram, errors in step.values():
+        overall[0].merge(histogram)
+        overall = (overall[0], overall[1] + errors)
+
+    result = {}
+    for endpoint, (histogram, errors) in list(step.items()) + [("all", overall)]:
+        total = histogram.total()
+        p50, p99, p999 = histogram.percentiles([50, 99, 99.9])
+        result[endpoint] = {"requests_per_sec": total / duration, "p50_us": p50, "p99_us": p99, "p999_us": p999,
+                            "error_rate": errors / (total + errors) if total + errors else 0.0}
+
+    return result
+
+
+def launch(num_clients, num_shards, port):
+    """
+        Launches the application as main.py does (but with no write-ahead log), and waits for its HTTP APIs.
+
+    :param num_clients: (int) Number of clients.
+    :param num_shards: (int) Number of servers.
+    :param port: (int) Port of the HTTP API of the first client.
+    :return: (list of Process) The processes of the application.
+    """
+    from app import start_scoreboard_server
+
+    # Spawned, since ZMQ contexts must not be forked
+    context = get_context("spawn")
+    server_port = port + num_clients
+    result = [context.Process(target=start_scoreboard_server, args=(server_port + shard, DEFAULT_IP, False, None))
+              for shard in range(num_shards)]
+    result += [context.Process(target=start_quiet_client, args=(port + client, server_port, num_shards))
+               for client in range(num_clients)]
+    for process in result:
+        process.start()
+
+    for client in range(num_clients):
+        wait_for_port(port + client)
+
+    return result
+
+
+def start_quiet_client(api_port, server_port, num_shards):
+    """
+        Starts a client (see start_scoreboard_client), without logging every HTTP request (so the report is readable).
+
+    :param api_port: (int) The port to expose the HTTP REST API.
+    :param server_port: (int) The port of the server of the first shard.
+    :param num_shards: (int) Number of servers (shards).
+    :return: None
+    """
+    from app import start_scoreboard_client
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    start_scoreboard_client(api_port, DEFAULT_IP, server_port, DEFAULT_IP, False, num_shards)
+
+
+def wait_for_port(port, timeout=30.0):
+    """
+        Waits until the specified port accepts connections.
+
+    :param port: (int) The port.
+    :param timeout: (float) Seconds to wait for.
+    :return: None
+    """
+    deadline = time.time() + timeout
+
+    while True:
+        try:
+            socket.create_connection((DEFAULT_IP, port), timeout=1.0).close()
+            break
+
+        except OSError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def populate(port, num_users, seed=0):
+    """
+        Reports a random score for each user, in batches (so the reads find them).
+
+    :param port: (int) The port of an HTTP API.
+    :param num_users: (int) Number of users.
+    :param seed: (int) Random seed, to get reproducible scores.
+    :return: None
+    """
+    rnd = random.Random(seed)
+    connection = http.client.HTTPConnection(DEFAULT_IP, port, timeout=60.0)
+
+    for first in range(0, num_users, 10000):
+        connection.request("PUT", "/scores", dumps([{"user": user, "total": rnd.randint(0, 1000000)}
+                                                    for user in range(first, min(first + 10000, num_users))]),
+                           {"Content-Type": "application/json"})
+        connection.getresponse().read()
+
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end load generator of the whole application")
+    parser.add_argument("--launch", action="store_true", help="Launch the application (otherwise, already running)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port of the HTTP API of the first client")
+    parser.add_argument("--clients", type=int, default=NUM_CLIENTS, help="Number of clients (consecutive ports)")
+    parser.add_argument("--shards", type=int, default=NUM_SHARDS, help="Number of servers (only with --launch)")
+    parser.add_argument("--users", type=int, default=100000, help="Number of users, populated before the load")
+    parser.add_argument("--mix", type=parse_mix, default="score=20,top=30,rank=20,around=20,percentile=10",
+                        help="Requests mix, as <endpoint>=<weight>,... Endpoints: {}".format(", ".join(ENDPOINTS)))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64, 128],
+                        help="Total number of connections of each step")
+    parser.add_argument("--processes", type=int, default=4, help="Number of worker processes")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of each step")
+    parser.add_argument("--saturation", type=float, default=0.05,
+                        help="Stops once a step improves the best throughput by less than this ratio")
+    parser.add_argument("--output", help="JSON file where the results are written")
+    args = parser.parse_args()
+
+    endpoints, weights = args.mix
+    ports = [args.port + client for client in range(args.clients)]
+    processes = launch(args.clients, args.shards, args.port) if args.launch else []
+    steps = []
+
+    try:
+        populate(ports[0], args.users)
+
+        context = get_context("spawn")
+        best_rate = 0.0
+
+        print("{:>12} {:>14} {:>12} {:>10} {:>10} {:>10} {:>8}".format("connections", "endpoint", "requests/s",
+                                                                       "p50 (us)", "p99 (us)", "p99.9 (us)", "errors"))
+        for concurrency in args.concurrency:
+            summary = summarize(run_step(context, ports, concurrency, args.processes, endpoints, weights, args.users,
+                                         args.duration), args.duration)
+            steps.append({"connections": concurrency, "endpoints": summary})
+
+            for endpoint, result in summary.items():
+                print("{:>12} {:>14} {:>12.1f} {:>10} {:>10} {:>10} {:>7.2f}%".format(
+                    concurrency, endpoint, result["requests_per_sec"], *[
+                        "-" if result[metric] is None else result[metric] for metric in ["p50_us", "p99_us", "p999_us"]
+                    ], result["error_rate"] * 100))
+
+            rate = summary["all"]["requests_per_sec"]
+            if rate < best_rate * (1 + args.saturation):
+                print("Saturated at {} connections ({:.1f} requests/s at most)".format(concurrency, best_rate))
+                break
+            best_rate = rate
+
+    finally:
+        for process in processes:
+            process.terminate()
+
+    if args.output is not None:
+        with open(args.output, "w") as output:
+            dump({"clients": args.clients, "users": args.users, "mix": dict(zip(endpoints, weights)),
+                  "duration": args.duration, "steps": steps}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/bin/python3
+
+"""
+    Bucket module. Contains all information regarding with the clients tied at the same score
+"""
+
+
+class Bucket():
+    """
+        Keeps all the clients with the same score, sorted by arrival (i.e., the first client that reached the score is
+        the first one in the bucket).
+
+        It is implemented as an intrusive doubly linked list: each Client keeps a reference to the previous and to the
+        next client in its bucket, so both appending and removing a client take constant time (O(1)), regardless of
+        the number of tied clients. Clients are always identified by reference (never compared by score).
+    """
+    __slots__ = ("head", "tail", "size")
+
+    def __init__(self):
+        self.head = None  # First client to reach the score
+        self.tail = None  # Last client to reach the score
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        client = self.head
+        while client is not None:
+            yield client
+            client = client.next
+
+    def __repr__(self):
+        return "[{}]".format(", ".join(repr(client) for client in self))
+
+    def append(self, client):
+        """
+            Adds the specified client at the end of the bucket.
+
+        :param client: (Client) The client to be added. Must not belong to any bucket.
+        :return: None
+        """
+        client.prev = self.tail
+        client.next = None
+
+        if self.tail is not None:
+            self.tail.next = client
+        else:
+            self.head = client
+
+        self.tail = client
+        self.size += 1
+
+    def remove(self, client):
+        """
+            Removes the specified client from the bucket.
+
+        :param client: (Client) The client to be removed. Must belong to this bucket.
+        :return: None
+        """
+        if client.prev is not None:
+            client.prev.next = client.next
+        else:
+            self.head = client.next
+
+        if client.next is not None:
+            client.next.prev = client.prev
+        else:
+            self.tail = client.prev
+
+        client.prev = None
+        client.next = None
+        self.size -= 1
+
+    @classmethod
+    def group(cls, clients):
+        """
+            Groups the specified clients into buckets at once (e.g., to bulk build a ranking). Clients are linked
+                inline, instead of appending them one by one.
+
+        :param clients: (list of Client) The clients, sorted by score. Must not belong to any bucket.
+        :return: (list of tuple) The (<score>, <bucket>) of each different score, in the same order.
+        """
+        result = []
+
+        bucket = None
+        prev = None
+        for client in clients:
+            if prev is not None and client.score == prev.score:
+                # Tied with the previous client
+                client.prev = prev
+                prev.next = client
+                bucket.size += 1
+            else:
+                # First client with that score
+                if bucket is not None:
+                    bucket.tail = prev
+                bucket = cls()
+                bucket.head = client
+                bucket.size = 1
+                result.append((client.score, bucket))
+            prev = client
+
+        if bucket is not None:
+            bucket.tail = prev
+
+        return result
@@ -5,16 +5,38 @@
 """
 
 from functools import total_ordering
+from json import dumps
+
+import os
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from constants import MIN_SCORE, MAX_SCORE
 
 
 @total_ordering
 class Client():
     """
         Client
+
+        It is the per player representation of the Scoreboard, so it is kept as compact as possible: attributes are
+        stored in slots (i.e., no instance __dict__).
+
+        The client keeps its own encoded JSON (see encoded) once requested, until its score is modified. Therefore,
+        encoding a ranking is a join of the fragments of its clients, and only the clients that appear in some
+        response pay the memory of their fragment.
     """
+    __slots__ = ("id", "score", "prev", "next", "fragment")
+
     def __init__(self, id):
         self.id = id
         self.score = 0
+        self.fragment = None  # Encoded JSON (see encoded). None until requested, or once the score is modified.
+
+        # Neighbours in the bucket of clients with the same score (see Bucket)
+        self.prev = None
+        self.next = None
 
     def __repr__(self):
         return "(id: {}, score: {})".format(self.id, self.score)
@@ -22,20 +44,36 @@ class Client():
     def to_json(self):
         return {"user": self.id, "total": self.score}
 
+    def encoded(self):
+        """
+            Returns the encoded JSON of the client (same as to_json), built once per score.
+
+        :return: (bytes) The UTF-8 JSON.
+        """
+        if self.fragment is None:
+            self.fragment = dumps(self.to_json()).encode()
+
+        return self.fragment
+
     def total(self, score):
         """
             Modifies the client total score
 
-        :param score: (int) New total score.
+        :param score: (int) New total score. Must be within MIN_SCORE and MAX_SCORE.
         :return: (bool) True if the modification was successfully applied. False otherwise.
         """
-        result = True
+        result = False
 
         try:
-            self.score = int(score)
+            score = int(score)
+
+            if MIN_SCORE <= score <= MAX_SCORE:
+                self.score = score
+                self.fragment = None
+                result = True
 
         except ValueError:
-            result = False
+            pass
 
         return result
 
@@ -53,7 +91,8 @@ class Client():
                                 is used the score modification is not applied.
 
                         <value> : (str) Decimal value to be modified the score with. If does not represent a valid
-                            base 10 value the score modification is not applied.
+                            base 10 value, or the resulting score is not within MIN_SCORE and MAX_SCORE, the score
+                            modification is not applied.
 
         :return: (bool) True if the modification was successfully applied. False otherwise.
         """
@@ -64,13 +103,19 @@ class Client():
 
             if operator == '+':
                 # INCREASE
-                self.score += value
+                score = self.score + value
 
             elif operator == '-':
                 # DECREASE
-                self.score -= value
+                score = self.score - value
             else:
                 # UNKNOWN OPERATION
+                score = None
+
+            if score is not None and MIN_SCORE <= score <= MAX_SCORE:
+                self.score = score
+                self.fragment = None
+            else:
                 result = False
 
         except (IndexError, ValueError):
@@ -1 +1,78 @@
-NUM_CLIENTS = 1
\ No newline at end of file
+NUM_CLIENTS = 1
+
+# HTTP front end of each client: "flask" (the Flask development server, a thread per request) or "asyncio" (an event
+# loop with persistent connections and non-blocking server requests, see AsyncApi). ASYNC_API_BACKLOG is the number of
+# pending connections the asyncio front end accepts at once.
+FRONT_END = "flask"
+ASYNC_API_BACKLOG = 4096
+
+# Maximum number of connections to the servers of each client, shared by its HTTP request threads (see
+# ConnectionPool). Requests beyond it wait for a connection to be returned, up to CLIENT_POOL_TIMEOUT seconds.
+CLIENT_POOL_SIZE = 8
+CLIENT_POOL_TIMEOUT = 5.0
+
+# Read responses cached by each client (see ResponseCache): at most RESPONSE_CACHE_SIZE of them, answered for up to
+# RESPONSE_CACHE_MAX_STALENESS_MS milliseconds while the client learns no newer version of the Scoreboard (None to
+# disable the cache).
+RESPONSE_CACHE_SIZE = 1000
+RESPONSE_CACHE_MAX_STALENESS_MS = 5
+
+# Number of servers (shards) the Scoreboard is partitioned among, each one owning the users whose id hashes to it (see
+# Shards). They listen on consecutive ports, right after the ones of the clients.
+NUM_SHARDS = 1
+
+# Micro-batches of each server (see TransportServer): once a request arrives, the server waits up to
+# SERVER_BATCH_WINDOW seconds for more (0 to only take the ones already received) before attending them, up to
+# SERVER_MAX_BATCH requests per batch. Consecutive updates of a batch are applied at once (see update_batch).
+SERVER_BATCH_WINDOW = 0.0
+SERVER_MAX_BATCH = 1000
+
+# Read replicas. Each server publishes its stream of updates on its port + REPLICA_PORT_OFFSET (None to disable it),
+# with a heartbeat every REPLICA_HEARTBEAT seconds. Each client keeps a replica of every server, and answers the reads
+# from them as long as they are at most REPLICA_MAX_STALENESS seconds behind (None to disable the replicas).
+REPLICA_PORT_OFFSET = 1000
+REPLICA_MAX_STALENESS = 0.5
+REPLICA_HEARTBEAT = 0.1
+
+# Distribution of the scores kept by each Scoreboard (see ScoreIndex): SCORE_INDEX_BUCKETS buckets of equal width from
+# SCORE_INDEX_MIN to SCORE_INDEX_MAX (lower and higher scores are counted in the first and the last bucket). Percentile
+# queries have the resolution of a bucket (see /percentile and /score_at).
+SCORE_INDEX_MIN = 0
+SCORE_INDEX_MAX = 2**20
+SCORE_INDEX_BUCKETS = 4096
+
+# Sizes of the Top-N whose responses are kept pre-serialized by the server (see TopViews)
+TOP_VIEW_SIZES = [100, 200, 500]
+
+# Time-windowed Scoreboards kept by each server along with the all-time one (see WindowedScoreboard), as
+# <name>: (<period>, <offset>), in seconds. Weeks start on Monday (the epoch was a Thursday).
+WINDOWS = {"daily": (24 * 3600, 0), "weekly": (7 * 24 * 3600, 4 * 24 * 3600)}
+
+# Named Scoreboards (e.g., one per game mode) hosted by each server along with the main one, created by their first
+# score (see /boards). At most MAX_BOARDS of them, with names made of up to 64 letters, digits, "_" or "-".
+MAX_BOARDS = 1000
+
+# Upper bounds (in seconds) of the buckets of the latency histograms exported by each client and server (see /metrics)
+METRICS_LATENCY_BUCKETS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+
+# Default and maximum number of clients of a page of the full ranking (see /ranking)
+RANKING_DEFAULT_LIMIT = 100
+RANKING_MAX_LIMIT = 1000
+
+# Maximum number of histogram bins, and of percentiles and thresholds, of a single statistics query (see /stats)
+STATS_MAX_BINS = 1000
+STATS_MAX_VALUES = 100
+
+# Directory of the write-ahead log and the snapshots of the server (see WriteAheadLog and Snapshot). None to disable
+# both of them.
+WAL_DIR = "wal"
+
+# Seconds that a record may wait for other records to share its fsync (group commit). Only records appended by
+# concurrent threads share it. The server already commits at once the records of all the requests it drains in a batch
+# (see TransportServer), and it is single threaded: no other record can be appended while waiting, so any value above 0
+# only adds latency. Keep it to 0.
+WAL_COMMIT_WINDOW = 0.0
+
+# Number of write-ahead log records between two consecutive snapshots of the server (taken in background). None to
+# disable them.
+SNAPSHOT_EVERY = 1000000
@@ -17,3 +17,10 @@ DEFAULT_PORT = 8000
 
 CLIENT_MODE = 0
 SERVER_MODE = 1
+
+#
+# SCOREBOARD LIMITS
+#
+# Scores are kept as 64 bits integers by the columnar snapshots (see ScoreboardSnapshot and Snapshot)
+MIN_SCORE = -2**63
+MAX_SCORE = 2**63 - 1
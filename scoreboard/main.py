@@ -9,7 +9,7 @@ os.path.dirname(os.path.realpath(__file__))
 path = os.path.dirname(os.path.realpath(__file__))
 os.environ['PATH'] += ':'+path
 
-from conf import NUM_CLIENTS
+from conf import NUM_CLIENTS, NUM_SHARDS
 from app import start_scoreboard_client, start_scoreboard_server
 from constants import DEFAULT_IP, DEFAULT_PORT, CLIENT_MODE, SERVER_MODE, DEBUG
 
@@ -39,22 +39,25 @@ def main():
 
     initial_port = server_port = DEFAULT_PORT + NUM_CLIENTS
 
-    print("Starting SCOREBOARD with {} clients, starting at {}:{} ...".format(NUM_CLIENTS, DEFAULT_IP, DEFAULT_PORT))
-    server_app = Process(target=start_scoreboard_server, args=(server_port, DEFAULT_IP, DEBUG))
-    server_app.start()
-    process_list.append(server_app)
+    print("Starting SCOREBOARD with {} clients and {} shards, starting at {}:{} ...".format(NUM_CLIENTS, NUM_SHARDS,
+                                                                                         DEFAULT_IP, DEFAULT_PORT))
+    # One server per shard, on consecutive ports
+    for shard in range(NUM_SHARDS):
+        server_app = Process(target=start_scoreboard_server, args=(server_port + shard, DEFAULT_IP, DEBUG))
+        server_app.start()
+        process_list.append(server_app)
 
     for _ in range(NUM_CLIENTS-1):
         initial_port -= 1
         new_client_app = Process(target=start_scoreboard_client, args=(initial_port, DEFAULT_IP, server_port,
-                                                                       DEFAULT_IP, DEBUG))
+                                                                       DEFAULT_IP, DEBUG, NUM_SHARDS))
         new_client_app.start()
         process_list.append(new_client_app)
 
     # LAUNCH LAST CLIENT IN THIS PROCESS
     initial_port -= 1
 
-    start_scoreboard_client(initial_port, "192.168.99.1", server_port, DEFAULT_IP, DEBUG)
+    start_scoreboard_client(initial_port, "192.168.99.1", server_port, DEFAULT_IP, DEBUG, NUM_SHARDS)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,366 @@
+#!/bin/python3
+
+"""
+    Replication module. Contains all information regarding with the read replicas of a Scoreboard kept by the clients
+"""
+
+import os
+import struct
+import threading
+import time
+from json import loads
+
+import numpy as np
+import zmq
+
+from analytics import ScoreboardSnapshot
+from scoreboard import Scoreboard
+
+
+class UpdatePublisher():
+    """
+        Publishes the updates applied by the server to its replicas, as an ordered stream through a ZMQ PUB socket.
+        Each message is a multipart message as follows:
+
+                [<epoch>, <seq>, <records>]
+
+        where:
+
+                <epoch> (bytes) : Random id of the stream, renewed each time the server starts (i.e., sequence
+                        numbers of different epochs are not comparable).
+                <seq> (bytes) : ASCII sequence number of the message, without gaps within the epoch. It starts
+                        from the start time of the server (in microseconds), so it never goes back across restarts.
+                <records> (bytes) : JSON list of records, same as the ones of the write-ahead log (see WriteAheadLog):
+
+                        [{"user": 123, "total": 250}, {"reset": true}, {"board": "ctf", "user": 7, "total": 5}, ...]
+
+        A heartbeat (i.e., the current sequence number without records) is published every heartbeat seconds, so
+        replicas can tell an idle server from a lost one, and detect lost messages even if there are no new updates.
+    """
+    def __init__(self, address, heartbeat=0.1):
+        self.address = address
+        self.heartbeat = heartbeat
+        self.epoch = os.urandom(8)
+        self.seq = int(time.time() * 1000000)  # Last reserved message
+        self.published_seq = self.seq  # Last published message
+        self.lock = threading.Lock()  # ZMQ sockets are not thread-safe (see heartbeat thread)
+        self.socket = None
+        self.running = False
+
+    def open(self):
+        """
+            Binds the socket, and starts publishing heartbeats in background.
+
+        :return: None
+        """
+        self.socket = zmq.Context.instance().socket(zmq.PUB)
+        self.socket.bind(self.address)
+        self.running = True
+        threading.Thread(target=self._beat, daemon=True).start()
+
+    def close(self):
+        """
+            Stops publishing.
+
+        :return: None
+        """
+        with self.lock:
+            self.running = False
+            self.socket.close(linger=0)
+
+    def reserve(self):
+        """
+            Reserves the sequence number of a new message, to be published later (e.g., once its records are durable).
+                Messages must be published in the same order.
+
+        :return: (int) The sequence number of the message.
+        """
+        with self.lock:
+            self.seq += 1
+
+            return self.seq
+
+    def publish(self, seq, records):
+        """
+            Publishes the specified records as the specified message.
+
+        :param seq: (int) The sequence number of the message (see reserve).
+        :param records: (str) The stringified JSON list of records.
+        :return: None
+        """
+        with self.lock:
+            self.socket.send_multipart([self.epoch, str(seq).encode(), records.encode()])
+            self.published_seq = seq
+
+    def _beat(self):
+        """
+            Publishes a heartbeat every heartbeat seconds, until closed.
+
+        :return: None
+        """
+        while True:
+            time.sleep(self.heartbeat)
+
+            with self.lock:
+                if not self.running:
+                    break
+                self.socket.send_multipart([self.epoch, str(self.published_seq).encode(), b""])
+
+    def snapshot(self, scoreboard, boards=None):
+        """
+            Returns a snapshot of the specified Scoreboard and named Scoreboards, to let a replica catch up with the
+                stream. It must be taken between two publications (i.e., by the same thread that publishes the updates).
+
+            The snapshot is the epoch and the sequence number of the last reserved message (i.e., the last one applied
+            to the Scoreboard), followed by the ids and scores columns of the Scoreboard (same as the ones of Snapshot),
+            and then the name and the columns of each named Scoreboard:
+
+                    <epoch (8 bytes)><seq (uint64)><num_clients (uint64)><ids (int64 * N)><scores (int64 * N)>
+                    [<name_size (uint64)><num_clients (uint64)><name (UTF-8)><ids (int64 * N)><scores (int64 * N)>...]
+
+        :param scoreboard: (Scoreboard) The Scoreboard.
+        :param boards: (dict) <name>: <Scoreboard> of each named Scoreboard. None if there are none.
+        :return: (bytes) The snapshot.
+        """
+        columns = ScoreboardSnapshot(scoreboard, with_ids=True)
+        result = [Replica.HEADER.pack(self.epoch, self.seq, len(columns)),
+                  columns.ids.astype(Replica.DTYPE, copy=False).tobytes(),
+                  columns.scores.astype(Replica.DTYPE, copy=False).tobytes()]
+
+        for name, board in (boards or {}).items():
+            name = name.encode()
+            columns = ScoreboardSnapshot(board, with_ids=True)
+            result.extend([Replica.BOARD_HEADER.pack(len(name), len(columns)), name,
+                           columns.ids.astype(Replica.DTYPE, copy=False).tobytes(),
+                           columns.scores.astype(Replica.DTYPE, copy=False).tobytes()])
+
+        return b"".join(result)
+
+
+class Replica():
+    """
+        Local read replica of the Scoreboard of a server, kept up to date in background from its stream of updates (see
+        UpdatePublisher).
+
+        The replica starts (and restarts, whenever a message is lost or the server restarts) from a snapshot of the
+        server Scoreboard, and then applies the messages that follow it, in order. It only answers a read while it is
+        fresh, i.e., it received a message (or a heartbeat) in the last max_staleness seconds. Besides, a read may
+        require a minimum sequence number (e.g., the one of the last update sent by the same process, so it reads its
+        own writes), that the read waits for up to max_staleness seconds. Otherwise, the read must go to the server.
+
+        Reads only hold the condition to wait for their message and to take the Scoreboard, and run their queries
+        outside of it, so they neither serialize with each other nor block the stream while running. A message is only
+        applied once the reads in progress are over (new reads wait for it meanwhile), and a snapshot is loaded into a
+        new Scoreboard that replaces the former one.
+    """
+    HEADER = struct.Struct("<8sQQ")
+    BOARD_HEADER = struct.Struct("<QQ")
+    DTYPE = np.dtype("<i8")
+
+    def __init__(self, address, fetch_snapshot, max_staleness=0.5, poll_timeout=0.1):
+        self.address = address
+        self.fetch_snapshot = fetch_snapshot  # Callable that returns a snapshot (see UpdatePublisher.snapshot)
+        self.max_staleness = max_staleness
+        self.poll_timeout = poll_timeout
+        self.scoreboard = Scoreboard()
+        self.boards = {}  # <name>: <Scoreboard> of each named Scoreboard
+
+        self.condition = threading.Condition()
+        self.epoch = None
+        self.seq = 0  # Last applied message
+        self.synced = False  # True once started from a snapshot, and while no message is lost
+        self.last_message_time = None
+        self.num_readers = 0  # Reads running their query (see read)
+        self.applying = False  # True while a message waits for the reads in progress to be applied
+
+        # Statistics
+        self.num_resyncs = 0
+        self.num_local_reads = 0
+        self.num_stale_reads = 0
+
+    def start(self):
+        """
+            Starts following the stream of updates in background.
+
+        :return: None
+        """
+        threading.Thread(target=self._follow, daemon=True).start()
+
+    def _follow(self):
+        """
+            Follows the stream of updates.
+
+        :return: None
+        """
+        socket = zmq.Context.instance().socket(zmq.SUB)
+        socket.setsockopt(zmq.SUBSCRIBE, b"")
+        socket.connect(self.address)
+
+        while True:
+            if socket.poll(self.poll_timeout * 1000):
+                epoch, seq, records = socket.recv_multipart()
+                self.receive(epoch, int(seq), loads(records.decode()) if records else None)
+
+            if not self.synced:
+                self.resync()
+
+    def resync(self):
+        """
+            Restarts the replica from a snapshot of the server Scoreboard.
+
+        :return: None
+        """
+        try:
+            snapshot = self.fetch_snapshot()
+        except Exception:
+            # The server is not available. Retried with the next message.
+            return
+
+        epoch, seq, num_clients = self.HEADER.unpack_from(snapshot)
+        ids, scores, offset = self._columns(snapshot, num_clients, self.HEADER.size)
+
+        scoreboard = Scoreboard()
+        scoreboard.load(ids.tolist(), scores.tolist())
+
+        boards = {}
+        while offset < len(snapshot):
+            name_size, num_board_clients = self.BOARD_HEADER.unpack_from(snapshot, offset)
+            offset += self.BOARD_HEADER.size
+            name = snapshot[offset:offset + name_size].decode()
+            board_ids, board_scores, offset = self._columns(snapshot, num_board_clients, offset + name_size)
+            boards[name] = Scoreboard()
+            boards[name].load(board_ids.tolist(), board_scores.tolist())
+
+        with self.condition:
+            self.scoreboard = scoreboard
+            self.boards = boards
+            self.epoch = epoch
+            self.seq = seq
+            self.synced = True
+            self.last_message_time = time.monotonic()
+            self.num_resyncs += 1
+            self.condition.notify_all()
+
+    def _columns(self, snapshot, num_clients, offset):
+        """
+            Returns the ids and scores columns of a Scoreboard within the specified snapshot (see resync).
+
+        :param snapshot: (bytes) The snapshot.
+        :param num_clients: (int) Number of clients of the Scoreboard.
+        :param offset: (int) Offset of the ids column.
+        :return: (tuple) The ids and scores (numpy.ndarray), and the offset right after them.
+        """
+        size = num_clients * self.DTYPE.itemsize
+        ids = np.frombuffer(snapshot, dtype=self.DTYPE, count=num_clients, offset=offset)
+        scores = np.frombuffer(snapshot, dtype=self.DTYPE, count=num_clients, offset=offset + size)
+
+        return ids, scores, offset + 2 * size
+
+    def receive(self, epoch, seq, records):
+        """
+            Applies the specified message of the stream, if it is the next one. Any gap (or a new epoch) makes the
+                replica stale until it is restarted from a new snapshot.
+
+        :param epoch: (bytes) The epoch of the message.
+        :param seq: (int) The sequence number of the message.
+        :param records: (list of dict) The records of the message. None for a heartbeat.
+        :return: None
+        """
+        with self.condition:
+            if not self.synced:
+                return
+
+            if epoch != self.epoch or seq > self.seq + (records is not None):
+                # Lost messages (or a restarted server)
+                self.synced = False
+
+            elif seq == self.seq + 1 and records is not None:
+                # Not while the reads in progress run their queries on the Scoreboard
+                self.applying = True
+                while self.num_readers:
+                    self.condition.wait()
+                self.applying = False
+
+                batch = []
+                board_batches = {}
+                for record in records:
+                    if record.get("reset"):
+                        batch, board_batches = [], {}
+                        self.scoreboard.reset()
+                        self.boards = {}
+                    elif "board" in record:
+                        board_batches.setdefault(record["board"], []).append(record)
+                    else:
+                        batch.append(record)
+                self.scoreboard.update_many(batch)
+                for name, board_batch in board_batches.items():
+                    self.boards.setdefault(name, Scoreboard()).update_many(board_batch)
+                self.seq = seq
+
+            # Older messages are already covered by the snapshot
+            self.last_message_time = time.monotonic()
+            self.condition.notify_all()
+
+    def is_fresh(self):
+        """
+            True if the replica can answer reads. Must be called holding the condition.
+
+        :return: (bool)
+        """
+        return self.synced and time.monotonic() - self.last_message_time <= self.max_staleness
+
+    def read(self, query, min_seq=0, wait=True, board=""):
+        """
+            Runs the specified query on the replica, if it is fresh and it has applied the specified message.
+
+        :param query: (callable) Receives the replica Scoreboard, and returns the result of the read.
+        :param min_seq: (int) Sequence number of the oldest message the read must include.
+        :param wait: (bool) True to wait for that message (up to max_staleness seconds). False to send the read to the
+                    server right away if it is not applied yet (e.g., not to block an event loop).
+        :param board: (str) The name of a named Scoreboard, that the query receives instead (an empty Scoreboard if
+                    not created yet).
+        :return: The result of the query. None if the read must go to the server.
+        """
+        result = scoreboard = None
+
+        with self.condition:
+            deadline = time.monotonic() + (self.max_staleness if wait else 0)
+            while True:
+                if self.applying:
+                    # A message is about to be applied (right after the reads in progress)
+                    self.condition.wait()
+                elif self.synced and self.seq < min_seq and time.monotonic() < deadline:
+                    self.condition.wait(deadline - time.monotonic())
+                else:
+                    break
+
+            if self.is_fresh() and self.seq >= min_seq:
+                scoreboard = (self.boards.get(board) or Scoreboard()) if board else self.scoreboard
+                self.num_readers += 1
+                self.num_local_reads += 1
+            else:
+                self.num_stale_reads += 1
+
+        if scoreboard is not None:
+            try:
+                result = query(scoreboard)
+            finally:
+                with self.condition:
+                    self.num_readers -= 1
+                    if not self.num_readers:
+                        self.condition.notify_all()
+
+        return result
+
+    def stats(self):
+        """
+            Returns the statistics of the replica.
+
+        :return: (dict) As follows:
+
+                    {"seq": <last_applied_seq>, "synced": <synced>, "resyncs": <num_resyncs>,
+                     "local_reads": <num_reads_answered>, "stale_reads": <num_reads_sent_to_the_server>}
+        """
+        with self.condition:
+            return {"seq": self.seq, "synced": self.synced, "resyncs": self.num_resyncs,
+                    "local_reads": self.num_local_reads, "stale_reads": self.num_stale_reads}
@@ -0,0 +1,89 @@
+#!/bin/python3
+
+"""
+    Response cache module. Contains all information regarding with the cached read responses of a client
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache():
+    """
+        LRU cache of the responses of the read queries of a client, shared by all its threads.
+
+        Each response is keyed by its query and by the versions of the Scoreboard (of every shard) known by the client
+        when it was answered (see TransportServer). Any newer version the client learns (e.g., the acknowledgement of
+        its own update) changes the key, so the cached responses never hide the updates of the same client. The updates
+        of other clients are hidden for max_staleness seconds at most, since older responses are not answered.
+
+        The responses are shared by all the hits, so they must not be modified.
+    """
+    def __init__(self, max_size=1000, max_staleness=0.005):
+        self.max_size = max_size
+        self.max_staleness = max_staleness
+        self.lock = threading.Lock()
+
+        # Cached responses, the least recently used first
+        #   <key> :<value> -> (<query>, <versions>) : (<time>, <response>)
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0  # Responses dropped to make room for new ones
+        self.expirations = 0  # Responses dropped since older than max_staleness
+
+    def get(self, key):
+        """
+            Returns the cached response of the specified key, if not older than max_staleness.
+
+        :param key: (tuple) The query and the known versions of the Scoreboard.
+        :return: The response. None if not cached.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None and time.monotonic() - entry[0] <= self.max_staleness:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self.entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+            return None
+
+    def put(self, key, response):
+        """
+            Caches the specified response, dropping the least recently used ones beyond max_size.
+
+        :param key: (tuple) The query and the known versions of the Scoreboard.
+        :param response: The response.
+        :return: None
+        """
+        with self.lock:
+            self.entries[key] = (time.monotonic(), response)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        """
+            Returns the statistics of the cache.
+
+        :return: (dict) As follows:
+
+                    {"size": <num_cached_responses>, "hits": <hits>, "misses": <misses>, "hit_rate": <hits_ratio>,
+                     "evictions": <evictions>, "expirations": <expirations>}
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+
+            return {"size": len(self.entries), "hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0, "evictions": self.evictions,
+                    "expirations": self.expirations}
@@ -0,0 +1,170 @@
+#!/bin/python3
+
+"""
+    Score index module. Contains all information regarding with the distribution of the scores of a Scoreboard
+"""
+
+import numpy as np
+
+
+class ScoreIndex():
+    """
+        Keeps the number of clients of each score bucket in a Fenwick (binary indexed) tree, so the number of clients at
+        or above a score, and the score at a given percentile, are answered in O(log B) (with B buckets), regardless of
+        the number of clients. Moving a client from one score to another also takes O(log B).
+
+        Buckets split the range [low, high) in equal-width ranges of scores. Lower (higher) scores are counted in the
+        first (last) bucket.
+
+        IMPLEMENTATION NOTE: Counts have the resolution of a bucket, i.e., all the clients of the bucket of a score are
+            counted as if they were at that score (at most width - 1 points away from it).
+    """
+    def __init__(self, low, high, num_buckets):
+        self.low = low
+        self.num_buckets = num_buckets
+        self.width = max(1, -(-(high - low) // num_buckets))  # Rounded up, to cover the whole range
+        self.tree = [0] * (num_buckets + 1)  # 1-based Fenwick tree of the number of clients of each bucket
+        self.count = 0
+
+    def bucket_of(self, score):
+        """
+            Returns the bucket of the specified score.
+
+        :param score: (int) The score.
+        :return: (int) The bucket, from 0 to num_buckets - 1.
+        """
+        return min(max((score - self.low) // self.width, 0), self.num_buckets - 1)
+
+    def add(self, score, delta=1):
+        """
+            Adds the specified number of clients to the bucket of the specified score.
+
+        :param score: (int) The score.
+        :param delta: (int) Number of clients (negative to remove them).
+        :return: None
+        """
+        self.count += delta
+
+        position = self.bucket_of(score) + 1
+        while position <= self.num_buckets:
+            self.tree[position] += delta
+            position += position & -position
+
+    def move(self, prior_score, score):
+        """
+            Moves a client from the specified prior score to the specified one.
+
+        :param prior_score: (int) The prior score. None for a new client.
+        :param score: (int) The new score.
+        :return: None
+        """
+        if prior_score is None:
+            self.add(score)
+
+        elif self.bucket_of(prior_score) != self.bucket_of(score):
+            self.add(prior_score, -1)
+            self.add(score)
+
+    def load(self, scores):
+        """
+            Replaces all the counts with the ones of the specified scores (see load_counts).
+
+        :param scores: (list of int) The score of each client.
+        :return: None
+        """
+        # Clipped first, so the offsets do not overflow
+        scores = np.clip(np.asarray(scores, dtype=np.int64), self.low, self.low + self.num_buckets * self.width - 1)
+        buckets = (scores - self.low) // self.width
+
+        self.load_counts(np.bincount(buckets, minlength=self.num_buckets))
+
+    def load_counts(self, counts):
+        """
+            Replaces all the counts with the specified ones (e.g., the merged counts of several Scoreboards, see
+                counts), bulk building the tree in O(B).
+
+        :param counts: (numpy.ndarray) The number of clients of each bucket.
+        :return: None
+        """
+        self.tree = [0] + counts.tolist()
+        self.count = sum(self.tree)
+
+        for position in range(1, self.num_buckets + 1):
+            parent = position + (position & -position)
+            if parent <= self.num_buckets:
+                self.tree[parent] += self.tree[position]
+
+    def count_below(self, score):
+        """
+            Returns the number of clients in the buckets below the one of the specified score.
+
+        :param score: (int) The score.
+        :return: (int)
+        """
+        result = 0
+
+        position = self.bucket_of(score)
+        while position > 0:
+            result += self.tree[position]
+            position -= position & -position
+
+        return result
+
+    def count_at_or_above(self, score):
+        """
+            Returns the number of clients at or above the specified score (i.e., in its bucket or above).
+
+        :param score: (int) The score.
+        :return: (int)
+        """
+        return self.count - self.count_below(score)
+
+    def percentile_of(self, score):
+        """
+            Returns the percentile of the specified score, i.e., the share of clients below its bucket.
+
+        :param score: (int) The score.
+        :return: (float) The percentile, from 0 to 100. None if there are no clients.
+        """
+        return 100 * self.count_below(score) / self.count if self.count else None
+
+    def score_at(self, percentile):
+        """
+            Returns the score at the specified percentile, i.e., the lowest score of the bucket that holds the client
+                whose share of clients at or below it is the percentile.
+
+        :param percentile: (float) The percentile, from 0 to 100.
+        :return: (int) The lowest score of the bucket. None if there are no clients.
+        """
+        if not self.count:
+            return None
+
+        # Ordinal (1-based, from the lowest score) of the client at the percentile
+        ordinal = min(max(int(np.ceil(percentile / 100 * self.count)), 1), self.count)
+
+        # Binary lifting: the last position whose prefix count is below the ordinal
+        position = 0
+        step = 1 << (self.num_buckets.bit_length() - 1)
+        while step:
+            if position + step <= self.num_buckets and self.tree[position + step] < ordinal:
+                position += step
+                ordinal -= self.tree[position]
+            step >>= 1
+
+        return self.low + position * self.width
+
+    def counts(self):
+        """
+            Returns the number of clients of each bucket (e.g., to merge the distributions of several Scoreboards).
+
+        :return: (numpy.ndarray) The counts, as int64.
+        """
+        tree = list(self.tree)
+
+        # Undo the partial sums, from the top down
+        for position in range(self.num_buckets, 0, -1):
+            parent = position + (position & -position)
+            if parent <= self.num_buckets:
+                tree[parent] -= tree[position]
+
+        return np.array(tree[1:], dtype=np.int64)
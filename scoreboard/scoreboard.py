@@ -4,14 +4,21 @@
     Scoreboard module. Contains all information regarding with a scoreboard that keeps the ranking of all clients
 """
 
-from bintrees import FastAVLTree
+from sortedcontainers import SortedDict
+
+import gc
+import sys
+from itertools import islice
 
 import os
 os.path.dirname(os.path.realpath(__file__))
 path = os.path.dirname(os.path.realpath(__file__))
 os.environ['PATH'] += ':'+path
 
+from bucket import Bucket
 from client import Client
+from score_index import ScoreIndex
+from conf import SCORE_INDEX_MIN, SCORE_INDEX_MAX, SCORE_INDEX_BUCKETS
 
 
 class Scoreboard():
@@ -20,7 +27,9 @@ class Scoreboard():
 
         On the one hand, keeps a hash table (dict) to the updated information of each client.
         On the other hand, keeps a lookup accelerator that allows to retrieve client score sorting with logaritmic
-         complexity (O(log N)).
+         complexity (O(log N)). The accelerator is also a ranking index: it is able to jump to the Nth ranking
+         position in O(log N), so relative queries only walk the ranking positions they return.
+        Besides, it keeps the distribution of the scores (see ScoreIndex), to answer percentile queries in O(log B).
     """
     def __init__(self):
         # Clients that have reported score
@@ -33,9 +42,13 @@ class Scoreboard():
         #
         self.clients = {}
 
-        # AVL tree in which each node is a list of Client instances (i.e., all the clients with the same score)
-        # Allows to access sorted info in O(log(N))
-        self.sorted_clients = FastAVLTree()
+        # Sorted dict in which each score is mapped to a Bucket of Client instances (i.e., all the clients with the
+        # same score, sorted by arrival). It is backed by a balanced structure that keeps the size of each subtree, so
+        # it allows to access sorted info in O(log(N)) both by score and by ranking position.
+        self.sorted_clients = SortedDict()
+
+        # Number of clients of each score bucket (see ScoreIndex)
+        self.score_index = ScoreIndex(SCORE_INDEX_MIN, SCORE_INDEX_MAX, SCORE_INDEX_BUCKETS)
 
     def reset(self):
         """
@@ -44,7 +57,50 @@ class Scoreboard():
         :return: None
         """
         self.clients = {}
-        self.sorted_clients = FastAVLTree()
+        self.sorted_clients = SortedDict()
+        self.score_index = ScoreIndex(SCORE_INDEX_MIN, SCORE_INDEX_MAX, SCORE_INDEX_BUCKETS)
+
+    def load(self, client_ids, scores):
+        """
+            Replaces all info with the specified clients, bulk building the ranking index at once (instead of
+                updating it once per client).
+
+        :param client_ids: (list of int) Ids of the clients, aligned with scores.
+        :param scores: (list of int) Scores of the clients, sorted in ascending order. Tied clients keep their order
+                    in the bucket (i.e., their arrival order).
+        :return: None
+        """
+        # Plenty of objects are going to be created at once: pause the garbage collector meanwhile
+        gc_enabled = gc.isenabled()
+        gc.disable()
+
+        try:
+            client_list = list(map(Client, client_ids))
+            for client, score in zip(client_list, scores):
+                client.score = score
+
+            self.clients = dict(zip(client_ids, client_list))
+            self.sorted_clients = SortedDict(Bucket.group(client_list))
+            self.score_index.load(scores)
+
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def memory_usage(self):
+        """
+            Returns an estimate of the memory kept by the Scoreboard, in constant time (i.e., without walking it): its
+                clients (with their ids and scores), its buckets, and its indexes. The encoded JSON fragments of the
+                clients (see Client.encoded) are not included.
+
+        :return: (int) The estimate, in bytes.
+        """
+        client_size = sys.getsizeof(Client(0)) + 2 * sys.getsizeof(sys.maxsize)  # With its id and score
+        bucket_size = sys.getsizeof(Bucket()) + sys.getsizeof(sys.maxsize) + 8  # With its score, and its sorted key
+
+        return (sys.getsizeof(self.clients) + len(self.clients) * client_size +
+                sys.getsizeof(self.sorted_clients) + len(self.sorted_clients) * bucket_size +
+                sys.getsizeof(self.score_index.tree))
 
     def get(self, client_id):
         """
@@ -60,6 +116,38 @@ class Scoreboard():
 
         return result
 
+    def rank(self, client_id):
+        """
+            Returns the ranking position of the specified client, according to the absolute ranking.
+
+            The ranking position is computed from the number of higher scores kept by the ranking index (O(log N)),
+            never by iterating the ranking.
+
+            IMPLEMENTATION NOTE: If more than one clients are tied in a given position they share the same ranking
+                position (same as with top and relative_top).
+
+        :param client_id: (int) The id of the client.
+        :return: (int) The ranking position, from 1 to N. None if not found.
+        """
+        client = self.get(client_id)
+
+        if client is not None:
+            result = self.count_higher(client.score) + 1
+        else:
+            result = None
+
+        return result
+
+    def count_higher(self, score):
+        """
+            Returns the number of different scores higher than the specified one (i.e., the number of ranking positions
+                above it), from the ranking index (O(log N)).
+
+        :param score: (int) The score.
+        :return: (int)
+        """
+        return len(self.sorted_clients) - self.sorted_clients.bisect_right(score)
+
     def update(self, client_info):
         """
             Modifies the client total score.
@@ -75,50 +163,171 @@ class Scoreboard():
         :return: (bool) True if successfully updated; False otherwise.
         """
         try:
-            #
-            # Handle first report/old sorting order
-            #
             client_id = int(client_info["user"])
+        except (KeyError, ValueError, TypeError):
+            # Invalid client_info
+            return False
 
-            if client_id not in self.clients:
-                # First client report
-                self.clients[client_id] = Client(client_id)
+        client = self.clients.get(client_id)
 
-            else:
-                # Remove client prior score, since it is going to be modified
-                prior_score = self.clients[client_id].score
-                if len(self.sorted_clients[prior_score]) > 1:
-                    # There are other clients with that score
-                    self.sorted_clients[prior_score].remove(self.clients[client_id])
-                else:
-                    # The only one with that score
-                    del self.sorted_clients[prior_score]
+        if client is None:
+            # First client report. The client is only kept if it is accepted
+            client = Client(client_id)
+
+            result = self._compute(client, client_info)
+
+            if result:
+                self.clients[client_id] = client
+                self._attach(client)
+                self.score_index.move(None, client.score)
+
+        else:
+            prior_score = client.score
 
             #
             # Compute/Update new score
             #
-            try:
-                result = self.clients[client_id].total(client_info["total"])
-            except KeyError:
-                # Try with relative update
-                result = self.clients[client_id].relative(client_info["score"])
+            result = self._compute(client, client_info)
 
             #
-            # Update/restore client sorting order
+            # Update client sorting order, only if the update was accepted (i.e., a rejected update does not move the
+            # client to the end of its bucket)
             #
-            new_score = self.clients[client_id].score
-            if new_score not in self.sorted_clients:
-                # First client with that score. Initialize an empty list to hold all users with that same score.
-                self.sorted_clients.insert(new_score, [])
+            if result:
+                self._detach(client, score=prior_score)
+                self._attach(client)
+                self.score_index.move(prior_score, client.score)
+
+        return result
+
+    def update_many(self, client_info_list):
+        """
+            Modifies the total score of several clients at once (e.g., all the scores reported at the end of a round).
+
+            The client infos are applied in order, but each touched client is moved in the ranking only once, after
+            applying all of them. Therefore, the ranking index is fixed up once per touched score, instead of once per
+            client info. Clients are restored in the order of their last accepted modification, so ties end up sorted
+            by arrival exactly as if the client infos were applied one by one (see update).
+
+        :param client_info_list: (list of dict) JSONs submitted by the clients (see update).
+        :return: (list of int) The total score of the client right after applying each client info, in the same order.
+                    None for each invalid client info (it does not prevent applying the rest of them).
+        """
+        result = []
+
+        # Clients to be moved in the ranking, sorted by their last accepted modification
+        moved_clients = {}
+
+        # Score of the bucket that holds each touched client before applying the client infos (None if new)
+        prior_scores = {}
+
+        for client_info in client_info_list:
+            try:
+                client_id = int(client_info["user"])
+            except (KeyError, ValueError, TypeError):
+                # Invalid client_info
+                result.append(None)
+                continue
+
+            client = self.clients.get(client_id)
+
+            if client is None:
+                # First client report. The client is only kept if it is accepted (same as in update)
+                client = Client(client_id)
+                prior_scores[client_id] = None
+
+            elif client_id not in prior_scores:
+                prior_scores[client_id] = client.score
+
+            if self._compute(client, client_info):
+                result.append(client.score)
+                self.clients[client_id] = client
+
+                # Move it to the end of the ordered dict (i.e., the last modified one)
+                moved_clients.pop(client_id, None)
+                moved_clients[client_id] = client
+            else:
+                result.append(None)
+
+        #
+        # Update clients sorting order. Prior buckets are kept until the end (other clients may be restored into them)
+        #
+        touched_scores = set()
+
+        for client_id, client in moved_clients.items():
+            prior_score = prior_scores[client_id]
+            if prior_score is not None:
+                touched_scores.add(prior_score)
+                self._detach(client, prune=False, score=prior_score)
+            self._attach(client)
+            self.score_index.move(prior_score, client.score)
+
+        for score in touched_scores:
+            bucket = self.sorted_clients.get(score)
+            if bucket is not None and not bucket:
+                del self.sorted_clients[score]
 
-            self.sorted_clients[new_score].append(self.clients[client_id])
+        return result
+
+    def _compute(self, client, client_info):
+        """
+            Computes/Updates the score of the specified client, according to the specified client info.
+
+        :param client: (Client) The client to be modified.
+        :param client_info: (dict) A JSON submitted by the client (see update).
+        :return: (bool) True if successfully updated; False otherwise.
+        """
+        try:
+            try:
+                result = client.total(client_info["total"])
+            except KeyError:
+                # Try with relative update
+                result = client.relative(client_info["score"])
 
-        except (KeyError, ValueError):
+        except (KeyError, TypeError):
             # Invalid client_info
             result = False
 
         return result
 
+    def _detach(self, client, prune=True, score=None):
+        """
+            Removes the specified client from the bucket of its current score (O(1) within the bucket). If it was the
+                only one with that score the bucket is removed from the ranking (unless prune is False).
+
+        :param client: (Client) The client to be removed from the ranking.
+        :param prune: (bool) True to remove the bucket if it gets empty. False to keep it.
+        :param score: (int) The score of the bucket that holds the client, if it is not its current score (i.e., the
+                    client score was already modified). None to use the current one.
+        :return: None
+        """
+        if score is None:
+            score = client.score
+
+        bucket = self.sorted_clients[score]
+        bucket.remove(client)
+
+        if prune and not bucket:
+            # The only one with that score
+            del self.sorted_clients[score]
+
+    def _attach(self, client):
+        """
+            Adds the specified client at the end of the bucket of its current score (i.e., after the clients that
+                reached that score before).
+
+        :param client: (Client) The client to be added to the ranking.
+        :return: None
+        """
+        bucket = self.sorted_clients.get(client.score)
+
+        if bucket is None:
+            # First client with that score. Initialize an empty bucket to hold all users with that same score.
+            bucket = Bucket()
+            self.sorted_clients[client.score] = bucket
+
+        bucket.append(client)
+
     def top(self, top_size):
         """
             Returns the clients that occupy the specified number of top ranking positions (i.e., those with the higher
@@ -141,9 +350,8 @@ class Scoreboard():
         """
         result = []
         try:
-            top_positions = self.sorted_clients.nlargest(top_size)
-            for position in top_positions:
-                result.extend(position[1])
+            if top_size >= 1:
+                result = self._positions(1, top_size)
         except TypeError:
             pass
 
@@ -184,52 +392,121 @@ class Scoreboard():
         """
         result = []
 
-        if ranking_position >= 1 and scope_size >= 0:
+        try:
+            if ranking_position >= 1 and scope_size >= 0:
+                # The range is truncated on the left (not enough high scores) and/or on the right (not enough low
+                # scores) if needed
+                result = self._positions(max(1, ranking_position - scope_size), ranking_position + scope_size)
+        except TypeError:
+            pass
 
-            try:
-                top_positions = self.sorted_clients.nlargest(len(self.sorted_clients))
-
-                if (ranking_position - scope_size > 1) and (ranking_position - scope_size < len(self.sorted_clients)):
-                    #
-                    # Not truncated on the left (high scores)
-                    #
-                    if ranking_position + scope_size <= len(self.sorted_clients):
-                        #
-                        #  Full range exists
-                        #
-
-                        top_positions = top_positions[ranking_position - scope_size - 1: ranking_position + scope_size]
-
-                    else:
-                        #
-                        # Range truncated on the right (not enough low scores)
-                        #
-
-                        top_positions = top_positions[ranking_position - scope_size - 1: len(top_positions)]
-
-                elif ranking_position - scope_size < 1:
-                    #
-                    # Range truncated on the left (not enough high scores)
-                    #
-                    if ranking_position + scope_size <= len(self.sorted_clients):
-                        #
-                        #  Only truncated on the left (enough low scores)
-                        #
-
-                        top_positions = top_positions[0: ranking_position + scope_size]
-
-                    else:
-                        #
-                        # Range truncated both on the left and on the right (not enough neither low nor high scores)
-                        #
-                        # That is, all the positions.
-                        #
-                        pass
-
-                for position in top_positions:
-                    result.extend(position[1])
-
-            except TypeError:
-                pass
+        return result
+
+    def around(self, client_id, scope):
+        """
+            Returns the clients in the specified scope around the specified client (e.g., the client and its rivals),
+                same as relative_top of its ranking position, but without computing it: the bucket of the client is
+                located in O(log N), and the scope ranking positions above and below it are walked from there.
+
+            IMPLEMENTATION NOTE: Tied clients share the same ranking position (same as with relative_top).
+
+        :param client_id: (int) The id of the client.
+        :param scope: (int) Number of ranking positions above and below the one of the client. Must be positive.
+        :return: (list of Client) The clients that occupy those ranking positions. None if the client is not found.
+        """
+        client = self.get(client_id)
+
+        return self.around_score(client.score, scope) if client is not None else None
+
+    def around_score(self, score, scope):
+        """
+            Returns the clients with the specified score, and the ones with the scope nearest higher and lower scores
+                (see around).
+
+        :param score: (int) The score.
+        :param scope: (int) Number of different higher and lower scores. Must be positive.
+        :return: (list of Client) The clients, sorted by score (higher first).
+        """
+        result = []
+
+        if scope >= 0:
+            higher_scores = list(islice(self.sorted_clients.irange(minimum=score, inclusive=(False, False)), scope))
+            lower_scores = islice(self.sorted_clients.irange(maximum=score, inclusive=(False, False), reverse=True),
+                                  scope)
+
+            for higher_score in reversed(higher_scores):
+                result.extend(self.sorted_clients[higher_score])
+            result.extend(self.sorted_clients.get(score, ()))
+            for lower_score in lower_scores:
+                result.extend(self.sorted_clients[lower_score])
+
+        return result
+
+    def ranking(self, limit, after_score=None, after_client_id=None):
+        """
+            Returns a page of the full ranking (keyset pagination): the limit clients that follow the specified cursor,
+                sorted by score (higher first), and tied clients by arrival (same as in top).
+
+            The cursor is the score and the id of the last client of the prior page. The bucket of its score is located
+            in O(log N), and the client itself within the bucket in O(1) (through the clients dict), so the cost of a
+            page does not depend on its depth in the ranking.
+
+            IMPLEMENTATION NOTE: If the last client of the prior page moved to another score meanwhile, its position in
+                the bucket is lost, and the page starts from the first client of the bucket (i.e., it may repeat some
+                tied clients, but it never skips any of them).
+
+        :param limit: (int) Maximum number of clients to retrieve.
+        :param after_score: (int) Score of the cursor. None to start from the highest score.
+        :param after_client_id: (int) Id of the cursor client. None to start from the next lower score (i.e., after
+                    all the clients with the score of the cursor).
+        :return: (list of Client) The clients that follow the cursor.
+        """
+        result = []
+
+        if after_score is None:
+            scores = reversed(self.sorted_clients.keys())
+        else:
+            # Walked lazily from the cursor score down (only the buckets of the page are touched)
+            scores = self.sorted_clients.irange(maximum=after_score, inclusive=(True, after_client_id is not None),
+                                                reverse=True)
+
+        for score in scores:
+            if len(result) >= limit:
+                break
+
+            client = self.sorted_clients[score].head
+            if score == after_score:
+                cursor = self.clients.get(after_client_id)
+                if cursor is not None and cursor.score == score:
+                    client = cursor.next
+
+            while client is not None and len(result) < limit:
+                result.append(client)
+                client = client.next
+
+        return result
+
+    def _positions(self, first_position, last_position):
+        """
+            Returns the clients that occupy the specified range of ranking positions, both included.
+
+            Ranking positions are 1-based (i.e., the 1st ranking position is the one with the higher score). Each
+            ranking position is located in O(log N) using the ranking index, so only the requested positions are
+            walked. Positions beyond the lowest score are silently ignored.
+
+        :param first_position: (int) Highest ranking position to retrieve. Must be a positive value.
+        :param last_position: (int) Lowest ranking position to retrieve.
+        :return: (list of Client) The clients that occupies the specified ranking positions.
+        """
+        result = []
+
+        num_positions = len(self.sorted_clients)
+        first_index = num_positions - min(last_position, num_positions)
+        last_index = num_positions - first_position + 1
+
+        if first_index < last_index:
+            # Scores are kept in ascending order, so the range is walked backwards (from higher to lower scores)
+            for score in reversed(self.sorted_clients.keys()[first_index:last_index]):
+                result.extend(self.sorted_clients[score])
 
         return result
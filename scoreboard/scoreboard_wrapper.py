@@ -4,23 +4,49 @@
     Wrapper to give access to the shared Scoreboard.
 """
 
+import asyncio
+import gc
+import heapq
+import os
+import re
+import threading
+import time
+from functools import partial
+from itertools import groupby, islice
 from json import dumps, loads
-from pizco import Proxy, Server
+
+import numpy as np
 
 # Add logger
 import logging
 logger = logging.getLogger(__name__)
 
 from scoreboard import Scoreboard
-from constants import DEFAULT_IP, DEFAULT_PORT, CLIENT_MODE, SERVER_MODE
+from analytics import ScoreboardSnapshot
+from replication import Replica, UpdatePublisher
+from score_index import ScoreIndex
+from response_cache import ResponseCache
+from shards import Shards
+from transport import AsyncTransportClient, ConnectionPool, TransportClient, TransportError, TransportServer
+from top_views import TopViews
+from snapshot import Snapshot
+from wal import WriteAheadLog
+from windows import WindowedScoreboard, retire
+from conf import NUM_SHARDS, CLIENT_POOL_SIZE, CLIENT_POOL_TIMEOUT, TOP_VIEW_SIZES, WAL_COMMIT_WINDOW, SNAPSHOT_EVERY, STATS_MAX_BINS, STATS_MAX_VALUES, \
+    REPLICA_PORT_OFFSET, REPLICA_MAX_STALENESS, REPLICA_HEARTBEAT, RESPONSE_CACHE_SIZE, \
+    RESPONSE_CACHE_MAX_STALENESS_MS, SERVER_BATCH_WINDOW, SERVER_MAX_BATCH, RANKING_MAX_LIMIT, WINDOWS, MAX_BOARDS, \
+    SCORE_INDEX_MIN, SCORE_INDEX_MAX, SCORE_INDEX_BUCKETS
+from constants import DEFAULT_IP, DEFAULT_PORT, CLIENT_MODE, SERVER_MODE, MIN_SCORE, MAX_SCORE
 
 
 class ScoreboardWrapper():
     """
         Wraps the Scoreboard into two types of remotely accessible components:
 
-            * Server: wraps a real in-memory instance of the Scoreboard and exposes it via a ZMQ socket.
-            * Client: connects to a server, redirects attribute request to it, and collect the response.
+            * Server: wraps a real in-memory instance of the Scoreboard and exposes it via a ZMQ socket (see
+                TransportServer). Only the commands in COMMANDS are exposed.
+            * Client: connects to a server, redirects attribute request to it, and collect the response. It may be
+                shared by several threads, each request using a connection of a bounded pool (see ConnectionPool).
 
         Using this kind of wrapper we can easily implement a multiprocess scoreboardwrapper in which multiple clients,
         each one in a different process, listen to a the HTTP RESTful API that the clients will use to access the
@@ -44,10 +70,21 @@ class ScoreboardWrapper():
         must be assured that no other thread is within the critical section (unless we follow a policy that does not
         need to report 100% accurate scores on each read).
 
-        The next step towards increasing the scalability of our architecture, that is to reduce the latency, would need
-        some kind of partition of the single server to allow accessing it in less time. That kind of vertical
-        scalability solution would require adding some kind of scheduling mechanism to properly orchestrate all the
-        server partitions to keep SDC yielding better performance, in terms of lower latencies.
+        The next step towards increasing the scalability of our architecture, that is to reduce the latency, is a
+        partition of the single server to allow accessing it in less time. The Scoreboard can be partitioned among
+        several servers (shards, see Shards), each one owning the clients whose id hashes to it, and listening on
+        consecutive ports (from port to port + num_shards - 1). Each client keeps a connection to every shard: updates
+        are sent to the shard that owns the client only, while ranking queries are sent to every shard and their
+        partial rankings are merged by the client. SDC is kept since each client score is kept by a single shard.
+
+        Reads outnumber writes by far, so each client keeps a read replica of the Scoreboard of every server (see
+        Replica), fed by the stream of updates the server publishes (see UpdatePublisher) on port + replica_port_offset.
+        Reads are answered by the replicas as long as they are fresh (i.e., at most replica_max_staleness seconds
+        behind the server). Each update acknowledged by the server carries the sequence number of its message in the
+        stream, so the client reads its own writes. Writes still go to the server.
+
+        The client side of each query is written once (see _run), and can be run either blocking (e.g., top, for the
+        Flask API) or on an asyncio event loop, with non-blocking connections (e.g., top_async, for AsyncApi).
 
         In order not to end up with a overdesign situation, the steps towards the scalability of our architecture should
         be guided by a performance analysis, measuring the latency of one step before taking the decision to go for the
@@ -56,13 +93,71 @@ class ScoreboardWrapper():
 
     """
 
-    def __init__(self, port=DEFAULT_PORT, ip=DEFAULT_IP, elogger=logger):
+    # Commands that the server attends (see TransportServer)
+    COMMANDS = ("reset", "update", "update_many", "top", "relative_top", "around", "around_score", "ranking", "rank",
+                "percentile", "score_at", "score_counts", "stats", "top_views_stats",
+                "wal_stats", "transport_stats", "metrics", "window_top", "window_rank", "windows_info", "board_update",
+                "board_update_many", "board_top", "board_rank", "boards_stats", "count_higher", "stats_summary",
+                "replica_snapshot")
+
+    # Valid names of the named Scoreboards (see board_update)
+    BOARD_NAME = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+    # Commands whose consecutive requests of a batch are attended at once (see TransportServer)
+    COALESCED = {"update": "update_batch"}
+
+    def __init__(self, port=DEFAULT_PORT, ip=DEFAULT_IP, elogger=logger, top_view_sizes=TOP_VIEW_SIZES,
+                 wal_path=None, wal_commit_window=WAL_COMMIT_WINDOW, snapshot_path=None,
+                 snapshot_every=SNAPSHOT_EVERY, num_shards=NUM_SHARDS, replica_port_offset=REPLICA_PORT_OFFSET,
+                 replica_max_staleness=REPLICA_MAX_STALENESS, replica_heartbeat=REPLICA_HEARTBEAT,
+                 pool_size=CLIENT_POOL_SIZE, pool_timeout=CLIENT_POOL_TIMEOUT, cache_size=RESPONSE_CACHE_SIZE,
+                 cache_max_staleness_ms=RESPONSE_CACHE_MAX_STALENESS_MS, batch_window=SERVER_BATCH_WINDOW,
+                 max_batch=SERVER_MAX_BATCH, windows=WINDOWS, max_boards=MAX_BOARDS):
         self.ip = ip
-        self.port = port
+        self.port = port  # Port of the server (of the first shard, if sharded)
         self.logger = elogger
         self.mode = None
-        self.instance = None  # Server or Proxy, according to mode
+        self.instance = None  # TransportServer (only in the server)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.shards = Shards(num_shards)  # Only used by the client
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        self.pool = None  # Pool of connections, each one to every shard (only in the client, see _connect)
+        self.async_connections = []  # Non-blocking connection to each shard (only in the client, see _run_async)
         self.scoreboard = None  # The in-memory scoreboard (only in the server)
+        self.top_view_sizes = top_view_sizes
+        self.top_views = None  # The pre-serialized hot Top-N responses (only in the server)
+        self.window_periods = windows  # <name> : (<period>, <offset>) of each time window
+        self.windows = {}  # The time-windowed Scoreboards (only in the server, see WindowedScoreboard)
+        self.windows_seqs = {}  # <name> : Last write-ahead log record covered by the restored snapshot of each window
+        self.max_boards = max_boards
+        self.boards = {}  # <name> : <Scoreboard> of each named Scoreboard (only in the server, see board_update)
+        self.board_requests = {}  # <name> : {<command>: <num_requests>} of each named Scoreboard (only in the server)
+        self.wal_path = wal_path
+        self.wal_commit_window = wal_commit_window
+        self.wal = None  # The write-ahead log (only in the server, if wal_path is set)
+        self.snapshot_path = snapshot_path  # Only used along with the write-ahead log
+        self.snapshot_every = snapshot_every
+        self.snapshot_seq = 0  # Last write-ahead log record covered by the last written snapshot
+        self.snapshot_attempt_seq = 0  # Last write-ahead log record covered by the last started snapshot
+        self.snapshot_pid = None  # Process writing a snapshot in background
+        self.pending_snapshot_seq = None  # Last write-ahead log record covered by the snapshot in progress
+        self.replica_port_offset = replica_port_offset
+        self.replica_max_staleness = replica_max_staleness
+        self.replica_heartbeat = replica_heartbeat
+        self.publisher = None  # The stream of updates (only in the server, if replica_port_offset is set)
+        self.replicas = []  # The read replica of each shard (only in the client, if replica_max_staleness is set)
+        self.written_seqs = []  # Sequence number of the last update acknowledged by each shard (only in the client)
+        self.written_lock = threading.Lock()  # The written_seqs are shared by all the threads of the client
+        self.version = 0  # Version of the Scoreboard, increased by each accepted change (only in the server)
+        self.known_versions = ()  # Highest version of each shard among its replies (only in the client)
+        self.cache_size = cache_size
+        self.cache_max_staleness_ms = cache_max_staleness_ms
+        self.cache = None  # The cached read responses (only in the client, if cache_max_staleness_ms is set)
+        self.defer_commits = False  # True to commit the records at the end of each batch of requests (see flush)
+        self.pending_records = []  # Records not committed yet (only in the server, see flush)
+        self.pending_messages = []  # Messages not published yet (only in the server, see flush)
 
     def is_valid_info(self, client_info):
         """
@@ -74,7 +169,7 @@ class ScoreboardWrapper():
 
                 where:
                         <client_id> : (int) Id of the client.
-                        <total_score>: (int) Absolute score of the client.
+                        <total_score>: (int) Absolute score of the client, within MIN_SCORE and MAX_SCORE.
                         <relative_score>: (int) Relative score of the client.
 
                 Examples:
@@ -89,7 +184,7 @@ class ScoreboardWrapper():
         try:
             if isinstance(client_info, dict) and len(client_info) == 2 and isinstance(client_info["user"], int):
                 try:
-                    if isinstance(client_info["total"], int):
+                    if isinstance(client_info["total"], int) and MIN_SCORE <= client_info["total"] <= MAX_SCORE:
                         result = True
 
                 except KeyError:
@@ -98,7 +193,7 @@ class ScoreboardWrapper():
                     if isinstance(client_info["score"], str) and (client_info["score"][0] == '+' or
                                                                   client_info["score"][0] == '-'):
                         value = int(client_info["score"][1:])
-                        if value >= 0:
+                        if 0 <= value <= MAX_SCORE - MIN_SCORE:
                             result = True
 
         except (TypeError, KeyError, ValueError):
@@ -106,15 +201,25 @@ class ScoreboardWrapper():
 
         return result
 
+    def is_valid_board(self, board):
+        """
+            True if the specified name of a named Scoreboard is valid (see BOARD_NAME).
+
+        :param board: (str) The name.
+        :return: (bool)
+        """
+        return isinstance(board, str) and self.BOARD_NAME.fullmatch(board) is not None
+
     def start(self, mode):
         """
             In CLIENT_MODE:
 
-                Establish a connection with the server before sending a new message.
+                Establish a connection with the server (with every shard, if sharded) before sending a new message.
 
             In SERVER_MODE:
 
-                Start listening to the incoming messages from the clients.
+                Restores the Scoreboard (if there is a write-ahead log), starts publishing the stream of updates (if
+                enabled), and start listening to the incoming messages from the clients.
 
         :param mode: (int) Either CLIENT_MODE or SERVER_MODE.
         :return: None
@@ -123,30 +228,572 @@ class ScoreboardWrapper():
 
         if mode == CLIENT_MODE:
             self.mode = mode
-            self.logger.info("Starting Scoreboard Client listening on {}:{} ...".format(self.ip, self.port))
-            self.instance = Proxy(address)
+            self.logger.info("Starting Scoreboard Client listening on {}:{} ({} shards) ...".format(
+                self.ip, self.port, len(self.shards)))
+            self.pool = ConnectionPool(self._connect, self.pool_size, self.pool_timeout)
+            self.written_seqs = [0] * len(self.shards)
+            self.known_versions = (0,) * len(self.shards)
+            if self.cache_max_staleness_ms:
+                self.cache = ResponseCache(self.cache_size, self.cache_max_staleness_ms / 1000)
+
+            if self.replica_port_offset is not None and self.replica_max_staleness is not None:
+                for shard in range(len(self.shards)):
+                    # A connection of its own, since it is used by the replica thread
+                    snapshot_connection = TransportClient('tcp://{}:{}'.format(self.ip, self.port + shard))
+                    replica = Replica('tcp://{}:{}'.format(self.ip, self.port + shard + self.replica_port_offset),
+                                      partial(snapshot_connection.request, "replica_snapshot"),
+                                      self.replica_max_staleness)
+                    replica.start()
+                    self.replicas.append(replica)
 
         elif mode == SERVER_MODE:
             self.mode = mode
             self.scoreboard = Scoreboard()
-            server = Server(self, address)
+            self.top_views = TopViews(self.top_view_sizes)
+            self.windows = {name: WindowedScoreboard(period, offset)
+                            for name, (period, offset) in self.window_periods.items()}
+            self.version = int(time.time() * 1000000)  # Never goes back across restarts (same as UpdatePublisher)
+            if self.wal_path is not None:
+                self.wal = WriteAheadLog(self.wal_path, self.wal_commit_window)
+                self.restore()
+                self.wal.open()
+            if self.replica_port_offset is not None:
+                self.publisher = UpdatePublisher('tcp://{}:{}'.format(self.ip, self.port + self.replica_port_offset),
+                                                 self.replica_heartbeat)
+                self.publisher.open()
+            self.instance = TransportServer(self, address, self.COMMANDS, self.max_batch, self.batch_window,
+                                            self.COALESCED)
+            self.instance.open()
+            self.defer_commits = True  # Until the end of each batch of requests (see flush)
             self.logger.info("Starting Scoreboard Server listening on {}:{} ...".format(self.ip, self.port))
-            server.serve_forever()
+            self.instance.serve_forever()
+
+    def restore(self):
+        """
+            Restores the Scoreboard from the newest snapshot (if any), and then replays the tail of the write-ahead log
+                (i.e., the records not covered by the snapshot). Only in SERVER_MODE, before starting to listen.
+
+        :return: None
+        """
+        if self.snapshot_path is not None and Snapshot(self.snapshot_path).exists():
+            self.snapshot_seq = self.snapshot_attempt_seq = Snapshot(self.snapshot_path).load(self.scoreboard)
+            self.logger.info("Server Scoreboard restored from {} ({} clients)".format(self.snapshot_path,
+                                                                                   len(self.scoreboard.clients)))
+
+        if self.snapshot_path is not None:
+            self.windows_seqs = {name: windowed.load(self._window_snapshot_path(name))
+                                 for name, windowed in self.windows.items()}
+            for name, board_path in self._board_snapshots().items():
+                Snapshot(board_path).load(self._created(name, Scoreboard()))
+
+        self.replay_wal(after_seq=self.snapshot_seq)
+
+        # The restored clients are long-lived: keep them out of the garbage collector scans from now on
+        gc.freeze()
+
+    def replay_wal(self, batch_size=10000, after_seq=0):
+        """
+            Restores the Scoreboard from the write-ahead log. Only in SERVER_MODE, before starting to listen.
+
+        :param batch_size: (int) Number of records applied at once (see Scoreboard.update_many).
+        :param after_seq: (int) Only the records with a higher sequence number are applied.
+        :return: None
+        """
+        num_records = 0
+        batch = []
+
+        for record in self.wal.replay(after_seq):
+            num_records += 1
+
+            if record.get("reset"):
+                batch = []
+                self.scoreboard.reset()
+                for name, windowed in self.windows.items():
+                    if record["seq"] > self.windows_seqs.get(name, 0):
+                        windowed.reset()
+                self._reset_boards()
+            else:
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    self._replay(batch)
+                    batch = []
+
+        self._replay(batch)
+        self.logger.info("Server Scoreboard restored from {} ({} records)".format(self.wal_path, num_records))
+
+    def _replay(self, records):
+        """
+            Applies the specified write-ahead log records to the Scoreboard, and their changes of the total scores to
+                the time windows of their times. Only the records after the restored snapshot of each window count in
+                it (see restore). The records of the named Scoreboards are applied to them instead.
+
+        :param records: (list of dict) The records.
+        :return: None
+        """
+        board_records = {}
+        for record in records:
+            if "board" in record:
+                board_records.setdefault(record["board"], []).append(record)
+        for name, client_info_list in board_records.items():
+            self._created(name, Scoreboard()).update_many(client_info_list)
+
+        if board_records:
+            records = [record for record in records if "board" not in record]
+
+        prior_scores = self._prior_scores(records)
+        totals = self.scoreboard.update_many(records)
+
+        if self.windows:
+            window_info_list = self._window_info_list(records, totals, prior_scores)
+
+            for name, windowed in self.windows.items():
+                timed_info_list = [(record["time"], window_info)
+                                   for record, window_info in zip(records, window_info_list)
+                                   if window_info is not None and "time" in record and
+                                   record["seq"] > self.windows_seqs.get(name, 0)]
+
+                for _, items in groupby(timed_info_list, key=lambda item: windowed.window_of(item[0])):
+                    items = list(items)
+                    windowed.update_many([window_info for _, window_info in items], items[0][0])
+
+    def _prior_scores(self, client_info_list):
+        """
+            Returns the total score of each client of the specified client infos, before applying them.
+
+        :param client_info_list: (list of dict) The client infos (see update).
+        :return: (dict) <client_id>: <total_score> of each client (None if new). Invalid client infos are skipped.
+        """
+        result = {}
+
+        for client_info in client_info_list:
+            try:
+                client_id = int(client_info["user"])
+            except (KeyError, ValueError, TypeError):
+                continue
+            if client_id not in result:
+                prior_client = self.scoreboard.get(client_id)
+                result[client_id] = prior_client.score if prior_client is not None else None
+
+        return result
+
+    @staticmethod
+    def _window_info_list(client_info_list, totals, prior_scores):
+        """
+            Returns the client infos that add to the time windows the change of the total score made by each one of the
+                specified client infos (e.g., an absolute score adds its difference with the former total), so the
+                score of a client in a window is the one earned within it.
+
+        :param client_info_list: (list of dict) The client infos (see update).
+        :param totals: (list of int) The total score right after applying each client info. None if it was rejected
+                    (see Scoreboard.update_many).
+        :param prior_scores: (dict) The total score of each client before applying them (see _prior_scores).
+        :return: (list of dict) The relative client info of each client info, in the same order. None if rejected.
+        """
+        result = []
+        scores = dict(prior_scores)
+
+        for client_info, total in zip(client_info_list, totals):
+            if total is not None:
+                client_id = int(client_info["user"])
+                result.append({"user": client_id, "score": "{:+d}".format(total - (scores[client_id] or 0))})
+                scores[client_id] = total
+            else:
+                result.append(None)
+
+        return result
+
+    def _board_snapshots(self):
+        """
+            Returns the snapshots of the named Scoreboards, written along with the snapshot of the Scoreboard (as
+                <snapshot_path>.board.<name> files, see snapshot).
+
+        :return: (dict) <name>: <path> of each snapshot.
+        """
+        directory = os.path.dirname(self.snapshot_path) or "."
+        prefix = os.path.basename(self.snapshot_path) + ".board."
+
+        return {filename[len(prefix):]: os.path.join(directory, filename) for filename in os.listdir(directory)
+                if filename.startswith(prefix) and self.is_valid_board(filename[len(prefix):])} \
+            if os.path.isdir(directory) else {}
+
+    def _window_snapshot_path(self, name):
+        """
+            Returns the path prefix of the snapshots of the specified time window (see WindowedScoreboard.write).
+
+        :param name: (str) The name of the time window.
+        :return: (str)
+        """
+        return "{}.{}".format(self.snapshot_path, name)
+
+    def _log(self, records):
+        """
+            Makes durable the specified records, if the write-ahead log is enabled (see WriteAheadLog.log), and then
+                publishes them to the replicas, if enabled (see UpdatePublisher.publish).
+
+            While serving, both of them are deferred until the end of the batch of requests (see flush), so the records
+            of all the requests of a batch share a single fsync (group commit). The replies are sent after that.
+
+            Every logged change makes a new version of the Scoreboard (see TransportServer).
+
+        :param records: (list of dict) The records, without sequence number.
+        :return: (int) The sequence number of the message that publishes the records. None if not published.
+        """
+        result = None
+        self.version += 1
+
+        if self.wal is not None:
+            self.pending_records.extend(records)
+
+        if self.publisher is not None:
+            # Serialized right now (the log adds its own sequence number to the records)
+            result = self.publisher.reserve()
+            self.pending_messages.append((result, dumps(records)))
+
+        if not self.defer_commits:
+            self.flush()
+
+        return result
+
+    def flush(self):
+        """
+            Makes durable the pending records (a single commit), and then publishes the pending messages. Only in
+                SERVER_MODE (called at the end of each batch of requests, before replying them).
+
+        :return: None
+        """
+        if self.pending_records:
+            records, self.pending_records = self.pending_records, []
+            self.wal.log(records)
+            self._check_snapshot()
+
+        if self.pending_messages:
+            messages, self.pending_messages = self.pending_messages, []
+            for seq, message in messages:
+                self.publisher.publish(seq, message)
+
+    def replica_snapshot(self):
+        """
+            Returns a snapshot of the Scoreboard and the named Scoreboards to let a replica catch up with the stream of
+                updates (see UpdatePublisher.snapshot). Only in SERVER_MODE.
+
+        :return: (bytes) The snapshot.
+        """
+        return self.publisher.snapshot(self.scoreboard, self.boards)
+
+    def _written(self, shard, result):
+        """
+            Keeps the sequence number of an update acknowledged by the specified shard (so later reads include it),
+                and removes it from the response.
+
+        :param shard: (int) The shard.
+        :param result: (dict) The response of the shard.
+        :return: (dict) The response, without sequence number.
+        """
+        seq = result.pop("seq", None)
+
+        if seq is not None:
+            with self.written_lock:
+                if seq > self.written_seqs[shard]:
+                    self.written_seqs[shard] = seq
+
+        return result
+
+    def _read_replicas(self, query, shards=None, wait=True, board=""):
+        """
+            Runs the specified query on the read replicas of the specified shards, if all of them are fresh and include
+                the updates acknowledged to this client (see Replica.read).
+
+        :param query: (callable) Receives the replica Scoreboard of a shard, and returns the result of the read.
+        :param shards: (list of int) The shards to read. None to read all of them.
+        :param wait: (bool) True to wait for the replicas to apply those updates. False to go to the servers instead.
+        :param board: (str) The name of a named Scoreboard, to read it instead.
+        :return: (list) The result of the query in each shard, in the same order. None if the read must go to the
+                    servers.
+        """
+        result = None
+
+        if self.replicas:
+            result = []
+
+            for shard in (shards if shards is not None else range(len(self.shards))):
+                shard_result = self.replicas[shard].read(query, self.written_seqs[shard], wait, board)
+                if shard_result is None:
+                    result = None
+                    break
+                result.append(shard_result)
+
+        return result
+
+    def _connect(self):
+        """
+            Opens a new connection to every shard (i.e., a pooled connection, see ConnectionPool).
+
+        :return: (list of TransportClient) The connection to each shard.
+        """
+        return [TransportClient('tcp://{}:{}'.format(self.ip, self.port + shard)) for shard in range(len(self.shards))]
+
+    def _to_all(self, command, *args):
+        """
+            Returns the same request to every shard, as yielded by a client plan (see _run).
+
+        :param command: (str) The command (see COMMANDS).
+        :param args: (str) The arguments of the command.
+        :return: (list of tuple) The request to each shard.
+        """
+        return [(shard, command, args) for shard in range(len(self.shards))]
+
+    def _run(self, plan):
+        """
+            Runs the specified client plan through a connection checked out from the pool of the client (for the whole
+                plan), and returns its result.
+
+            The client side of each query is written once, as a plan: a generator that yields the requests it needs
+            next (a list of (<shard>, <command>, <args>), all of them sent at once), receives the payloads of their
+            replies (in the same order), and finally returns the result of the query. Plans are run either by this
+            method (blocking) or by _run_async (non-blocking, on an asyncio event loop).
+
+        :param plan: (generator) The plan (e.g., _client_top).
+        :return: The result of the plan.
+        """
+        with self.pool.connection() as connections:
+            try:
+                requests = next(plan)
+                while True:
+                    request_ids = [connections[shard].send(command, *args) for shard, command, args in requests]
+                    try:
+                        payloads = [connections[shard].receive(request_id)
+                                    for (shard, _, _), request_id in zip(requests, request_ids)]
+                    except TransportError:
+                        # The rest of the requests are abandoned too (i.e., their late replies are discarded)
+                        for (shard, _, _), request_id in zip(requests, request_ids):
+                            connections[shard].abandon(request_id)
+                        raise
+                    self._seen(connections)
+                    requests = plan.send(payloads)
+
+            except StopIteration as stop:
+                return stop.value
+
+    async def _run_async(self, plan):
+        """
+            Runs the specified client plan (see _run) through the non-blocking connections of the client, and returns
+                its result. The connections are opened by the first call (i.e., on the event loop that runs them).
+
+        :param plan: (generator) The plan (e.g., _client_top).
+        :return: The result of the plan.
+        """
+        if not self.async_connections:
+            self.async_connections = [AsyncTransportClient('tcp://{}:{}'.format(self.ip, self.port + shard))
+                                      for shard in range(len(self.shards))]
+        connections = self.async_connections
+
+        try:
+            requests = next(plan)
+            while True:
+                request_ids = [await connections[shard].send(command, *args) for shard, command, args in requests]
+                try:
+                    payloads = [await connections[shard].receive(request_id)
+                                for (shard, _, _), request_id in zip(requests, request_ids)]
+                except (TransportError, asyncio.CancelledError):
+                    # The rest of the requests are abandoned too (see _run)
+                    for (shard, _, _), request_id in zip(requests, request_ids):
+                        connections[shard].abandon(request_id)
+                    raise
+                self._seen(connections)
+                requests = plan.send(payloads)
+
+        except StopIteration as stop:
+            return stop.value
+
+    def _request_all(self, command, *args):
+        """
+            Sends the same request to every shard (all of them in flight at once), and waits for their replies.
+
+        :param command: (str) The command (see COMMANDS).
+        :param args: (str) The arguments of the command.
+        :return: (list of bytes) The payload of the reply of each shard.
+        """
+        with self.pool.connection() as connections:
+            request_ids = [connection.send(command, *args) for connection in connections]
+            try:
+                result = [connection.receive(request_id) for connection, request_id in zip(connections, request_ids)]
+            except TransportError:
+                # The rest of the requests are abandoned too (see _run)
+                for connection, request_id in zip(connections, request_ids):
+                    connection.abandon(request_id)
+                raise
+            self._seen(connections)
+
+            return result
+
+    def _seen(self, connections):
+        """
+            Keeps the highest version of each shard among the replies received by the specified connections.
+
+        :param connections: (list of TransportClient or AsyncTransportClient) The connection to each shard.
+        :return: None
+        """
+        with self.written_lock:
+            self.known_versions = tuple(max(version, connection.version)
+                                        for version, connection in zip(self.known_versions, connections))
+
+    def _cached(self, query, plan):
+        """
+            Client plan that answers the specified read plan from the response cache, if cached for the known versions
+                of the Scoreboard (see ResponseCache), or runs it and caches its result otherwise.
+
+        :param query: (tuple) Hashable description of the query (e.g., ("top", 100)).
+        :param plan: (generator) The read plan (e.g., _client_top).
+        :return: The result of the plan.
+        """
+        result = None
+        cacheable = self.cache is not None and all(isinstance(arg, (int, str)) for arg in query)
+
+        if cacheable:
+            result = self.cache.get((query, self.known_versions))
+
+        if result is None:
+            result = yield from plan
+
+            if cacheable:
+                # The versions known once answered (i.e., including any newer one learnt by the query itself)
+                self.cache.put((query, self.known_versions), result)
+
+        return result
+
+    def pool_stats(self):
+        """
+            Returns the statistics of the pool of connections of the client (see ConnectionPool.stats), e.g. the time
+                the requests waited for a connection. Only in CLIENT_MODE.
+
+        :return: (dict) The statistics.
+        """
+        return self.pool.stats()
+
+    def cache_stats(self):
+        """
+            Returns the statistics of the response cache of the client (see ResponseCache.stats), e.g. its hit rate.
+                Only in CLIENT_MODE.
+
+        :return: (dict) The statistics. Empty if the cache is disabled.
+        """
+        return self.cache.stats() if self.cache is not None else {}
+
+    def replica_stats(self):
+        """
+            Returns the statistics of the read replicas of the client (see Replica.stats). Only in CLIENT_MODE.
+
+        :return: (dict) The statistics. Empty if the replicas are disabled. If sharded, (list of dict) the statistics
+                    of each shard.
+        """
+        result = [replica.stats() for replica in self.replicas]
+
+        if len(result) <= 1:
+            result = result[0] if result else {}
+
+        return result
+
+    def snapshot(self):
+        """
+            Takes a snapshot of the Scoreboard in background (see Snapshot). Only in SERVER_MODE, along with the
+                write-ahead log.
+
+            The snapshot is written by a forked child process, from its copy-on-write view of the Scoreboard, so the
+            server keeps serving meanwhile. The write-ahead log is rotated right before forking, so its segments
+            covered by the snapshot are discarded once the snapshot is written.
+
+        :return: (bool) True if the snapshot was started. False otherwise (e.g., another one is in progress).
+        """
+        result = False
+
+        if self.wal is not None and self.snapshot_path is not None and self.snapshot_pid is None:
+            seq = self.wal.rotate()
+            pid = os.fork()
+
+            if pid == 0:
+                # Child process: write and exit, without running any cleanup of the parent process
+                status = 1
+                try:
+                    # The windows first, so the snapshot of the Scoreboard never covers records missing in them
+                    for name, windowed in self.windows.items():
+                        windowed.write(self._window_snapshot_path(name), seq)
+                    for name, board_path in self._board_snapshots().items():
+                        if name not in self.boards:
+                            os.remove(board_path)
+                    for name, scoreboard in self.boards.items():
+                        Snapshot("{}.board.{}".format(self.snapshot_path, name)).write(scoreboard, seq)
+                    Snapshot(self.snapshot_path).write(self.scoreboard, seq)
+                    status = 0
+                finally:
+                    os._exit(status)
+
+            self.snapshot_pid = pid
+            self.pending_snapshot_seq = self.snapshot_attempt_seq = seq
+            self.logger.info("Server Scoreboard snapshot started (up to record {})".format(seq))
+            result = True
+
+        return result
+
+    def _check_snapshot(self):
+        """
+            Checks whether the snapshot in progress (if any) finished, and starts a new one if enough records were
+                appended to the write-ahead log since the last one was started. Therefore, a failed snapshot is retried
+                only after another snapshot_every records (instead of rotating the log and forking on every update).
+
+        :return: None
+        """
+        if self.snapshot_pid is not None:
+            pid, status = os.waitpid(self.snapshot_pid, os.WNOHANG)
+
+            if pid != 0:
+                self.snapshot_pid = None
+
+                if status == 0:
+                    self.snapshot_seq = self.pending_snapshot_seq
+                    self.wal.discard(self.snapshot_seq)
+                    self.logger.info("Server Scoreboard snapshot written (up to record {})".format(self.snapshot_seq))
+                else:
+                    self.logger.error("Server Scoreboard snapshot failed (status {})".format(status))
+
+        if self.snapshot_every is not None and self.wal.last_seq - self.snapshot_attempt_seq >= self.snapshot_every:
+            self.snapshot()
 
     def reset(self):
         """
 
             Resets the info in the server.
 
-        :return: None
+        :return: None (in SERVER_MODE, the stringified JSON sequence number of the reset in the stream of updates)
         """
         if self.mode == SERVER_MODE:
             self.scoreboard.reset()
+            gc.unfreeze()  # The restored clients (see restore) can be collected now
+            self.top_views.reset()
+            for windowed in self.windows.values():
+                windowed.reset()
+            self._reset_boards()
+            seq = self._log([{"reset": True}])
             self.logger.debug("Server Scoreboard reset")
+            return dumps({"seq": seq} if seq is not None else {})
 
         elif self.mode == CLIENT_MODE:
-            self.instance.reset()
-            self.logger.debug("Client Scoreboard reset (sent to server)")
+            self._run(self._client_reset())
+
+    async def reset_async(self):
+        """
+            Asyncio counterpart of reset (see reset). Only in CLIENT_MODE.
+
+        :return: None
+        """
+        await self._run_async(self._client_reset())
+
+    def _client_reset(self):
+        """
+            Client plan of reset (see _run).
+        """
+        for shard, payload in enumerate((yield self._to_all("reset"))):
+            self._written(shard, loads(payload))
+        self.logger.debug("Client Scoreboard reset (sent to server)")
 
     def update(self, client_info):
         """
@@ -166,84 +813,1643 @@ class ScoreboardWrapper():
                             {"user": 456, "score": "+10"}
                             {"user": 789, "score": "-20"}
 
-        :return: (dict) The updated client score.
+        :return: (dict) The updated client score. In SERVER_MODE, it also carries the sequence number of the update
+                    in the stream of updates (if published).
         """
         if self.mode == SERVER_MODE:
             if isinstance(client_info, str):
                 client_info = loads(client_info)
-            self.scoreboard.update(client_info)
-            client = self.scoreboard.get(client_info["user"])
-            result = {"user": client.id, "total": client.score}
-            self.logger.debug("Server Scoreboard updated : {}".format(result))
+            prior_client = self.scoreboard.get(client_info["user"])
+            prior_score = prior_client.score if prior_client is not None else None
+
+            if self.scoreboard.update(client_info):
+                client = self.scoreboard.get(client_info["user"])
+                self.top_views.invalidate(prior_score, client.score)
+                result = {"user": client.id, "total": client.score}
+                record = dict(result)
+                if self.windows:
+                    # The change of the total score counts in the windows (see _window_info_list)
+                    record["time"] = time.time()
+                    window_info = {"user": client.id, "score": "{:+d}".format(client.score - (prior_score or 0))}
+                    for windowed in self.windows.values():
+                        windowed.update(window_info, record["time"])
+                seq = self._log([record])
+                self.logger.debug("Server Scoreboard updated : {}".format(result))
+                if seq is not None:
+                    result["seq"] = seq
+            else:
+                # Rejected (e.g., the resulting score does not fit): neither applied nor logged
+                result = {"error": "Invalid client info"}
+                self.logger.debug("Server Scoreboard rejected update : {}".format(client_info))
             result = dumps(result)
 
-        elif self.mode == CLIENT_MODE and self.is_valid_info(client_info):
-            result = self.instance.update(dumps(client_info))
-            self.logger.debug("Client Scoreboard obtained update response from server : {}".format(result))
-            result = loads(result)
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._client_update(client_info))
 
         else:
             result = {"error": "Invalid client info"}
 
         return result
 
-    def top(self, top_size):
+    async def update_async(self, client_info):
         """
-            Asks the shared Scoreboard for the clients that occupy the specified number of top ranking positions
-            (i.e., those with the higher score values), according to the absolute ranking.
+            Asyncio counterpart of update (see update). Only in CLIENT_MODE.
 
-        :param top_size: (int) Number of higher ranking positions to retrieve.
-        :return: (list of dict) The clients that occupies the specified ranking positions.
+        :param client_info: (dict) A JSON submitted by the client.
+        :return: (dict) The updated client score.
         """
-        if self.mode == SERVER_MODE:
-            result = self.scoreboard.top(int(top_size))
+        return await self._run_async(self._client_update(client_info))
 
-            # Serialize to stringified JSON to be sent to the client
-            # From list of tuples to list of dicts
-            serial_result = []
-            for client in result:
-                serial_result.append(client.to_json())
-            self.logger.debug("Server Scoreboard top ({}) : {}".format(top_size, result))
-            result = dumps(serial_result)
+    def _client_update(self, client_info, board=None):
+        """
+            Client plan of update (see _run). Also of board_update, if a named Scoreboard is specified.
+        """
+        if board is not None and not self.is_valid_board(board):
+            result = {"error": "Invalid board"}
 
-        elif self.mode == CLIENT_MODE and isinstance(top_size, int):
-            result = self.instance.top(str(top_size))
-            self.logger.debug("Client Scoreboard top ({}) : {}".format(top_size, result))
-            result = loads(result)
+        elif self.is_valid_info(client_info):
+            shard = self.shards.of(client_info["user"])
+            if board is None:
+                payload, = yield [(shard, "update", (dumps(client_info),))]
+            else:
+                payload, = yield [(shard, "board_update", (board, dumps(client_info)))]
+            result = self._written(shard, loads(payload))
+            self.logger.debug("Client Scoreboard obtained update response from server : {}".format(result))
 
         else:
-            result = {"error": "Invalid top size"}
+            result = {"error": "Invalid client info"}
 
         return result
 
-    def relative_top(self, ranking_position, scope_size):
+    def update_many(self, client_info_list):
         """
-            Asks the shared Scoreboard for the relative top (see Scoreboard.relative_top)
+            In CLIENT_MODE:
 
-        :param ranking_position: (int) Ranking position to retrieve scope around. Must be a positive value, from 1 to N.
-        :param scope_size: (int) Scope size (see explanation above). Must be a positive value.
-        :return: (list of dict) The clients that occupies the specified ranking positions.
+                Sends several updated client scores to the shared Scoreboard, all of them in a single request.
+
+            In SERVER_MODE:
+
+                Updates the clients scores (see Scoreboard.update_many) and sends back the updated clients scores.
+
+        :param client_info_list: (list of dict) JSONs submitted by the clients (see update).
+        :return: (list of dict) The updated client score of each client info, in the same order. Invalid client infos
+                    get an error instead, that does not prevent applying the rest of them.
         """
         if self.mode == SERVER_MODE:
-            result = self.scoreboard.relative_top(int(ranking_position), int(scope_size))
+            if isinstance(client_info_list, str):
+                client_info_list = loads(client_info_list)
+            result = dumps(self._update_many(client_info_list))
 
-            # Serialize to stringified JSON to be sent to the client
-            # From list of tuples to list of dicts
-            serial_result = []
-            for client in result:
-                serial_result.append(client.to_json())
-            self.logger.debug("Server Scoreboard relative top ({}, {}) : {}".format(ranking_position, scope_size,
-                                                                                    result))
-            result = dumps(serial_result)
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._client_update_many(client_info_list))
 
-        elif self.mode == CLIENT_MODE and isinstance(ranking_position, int) and isinstance(scope_size, int):
-            result = self.instance.relative_top(str(ranking_position), str(scope_size))
-            self.logger.debug("Client Scoreboard relative top ({}, {}) : {}".format(ranking_position, scope_size,
-                                                                                    result))
-            result = loads(result)
+        else:
+            result = {"error": "Invalid client info list"}
+
+        return result
+
+    def _update_many(self, client_info_list):
+        """
+            Updates the clients scores (see Scoreboard.update_many), and logs them as a single message. Only in
+                SERVER_MODE.
+
+        :param client_info_list: (list of dict) JSONs submitted by the clients (see update).
+        :return: (list of dict) The updated client score of each client info (with the sequence number of the message,
+                    if published), in the same order. Invalid client infos get an error instead.
+        """
+        # Prior score of each touched client (the intermediate ones do not modify the views)
+        prior_scores = self._prior_scores(client_info_list)
+
+        totals = self.scoreboard.update_many(client_info_list)
+        timestamp = time.time()
+
+        # Only the changes of the accepted client infos count in the time windows
+        if self.windows:
+            window_info_list = [window_info for window_info in
+                                self._window_info_list(client_info_list, totals, prior_scores)
+                                if window_info is not None]
+            for windowed in self.windows.values():
+                windowed.update_many(window_info_list, timestamp)
+
+        # A record per modified client, sorted by its last accepted modification (i.e., replaying them restores
+        # the same ties order, see Scoreboard.update_many)
+        modified_ids = {}
+
+        result = []
+        for client_info, total in zip(client_info_list, totals):
+            if total is not None:
+                client_id = int(client_info["user"])
+                modified_ids.pop(client_id, None)
+                modified_ids[client_id] = None
+                result.append({"user": client_id, "total": total})
+            else:
+                result.append({"error": "Invalid client info"})
+
+        records = []
+        for client_id in modified_ids:
+            client = self.scoreboard.get(client_id)
+            self.top_views.invalidate(prior_scores[client_id], client.score)
+            records.append({"user": client.id, "total": client.score})
+            if self.windows:
+                records[-1]["time"] = timestamp
+        seq = self._log(records)
+
+        if seq is not None:
+            for item in result:
+                if "error" not in item:
+                    item["seq"] = seq
+
+        self.logger.debug("Server Scoreboard updated ({} client infos)".format(len(result)))
+
+        return result
+
+    def update_batch(self, args_list):
+        """
+            Attends a run of consecutive update requests of a batch at once (see TransportServer.coalesced). Only in
+                SERVER_MODE.
+
+            Under bursts, many updates (e.g., relative ones to the same hot client) arrive together. All of them are
+            applied by a single update_many: the client infos of the same client fold together (an absolute one
+            overrides the prior ones, relative ones add up) and the client is moved in the ranking once, instead of
+            once per update. Each update still gets the total score right after applying it, same as one by one.
+
+        :param args_list: (list of list of str) The arguments of each update request (i.e., its client info).
+        :return: (list) The stringified JSON response of each update request (see update), in the same order. A
+                    request whose client info is not a JSON gets the exception instead.
+        """
+        client_info_list, result = [], []
+
+        for args in args_list:
+            try:
+                client_info_list.append(loads(*args))
+                result.append(None)
+            except Exception as exc:
+                result.append(exc)
+
+        items = iter(self._update_many(client_info_list))
+
+        return [dumps(next(items)) if item is None else item for item in result]
+
+    async def update_many_async(self, client_info_list):
+        """
+            Asyncio counterpart of update_many (see update_many). Only in CLIENT_MODE.
+
+        :param client_info_list: (list of dict) JSONs submitted by the clients.
+        :return: (list of dict) The updated client score of each client info, in the same order.
+        """
+        return await self._run_async(self._client_update_many(client_info_list))
+
+    def _client_update_many(self, client_info_list, board=None):
+        """
+            Client plan of update_many (see _run). Also of board_update_many, if a named Scoreboard is specified.
+        """
+        if board is not None and not self.is_valid_board(board):
+            result = {"error": "Invalid board"}
+
+        elif isinstance(client_info_list, list):
+            # Only the valid client infos are sent to the server
+            is_valid_list = [self.is_valid_info(client_info) for client_info in client_info_list]
+            valid_info_list = [client_info for client_info, is_valid in zip(client_info_list, is_valid_list)
+                               if is_valid]
+
+            # Each shard gets its own client infos (in a single request, all of them in flight at once), and the
+            # results are restored in order
+            valid_result = [None] * len(valid_info_list)
+            requests = [(shard, indexes) for shard, indexes in enumerate(self.shards.split(valid_info_list)) if indexes]
+            command, board_args = ("update_many", ()) if board is None else ("board_update_many", (board,))
+            payloads = (yield [(shard, command, board_args + (dumps([valid_info_list[index] for index in indexes]),))
+                               for shard, indexes in requests]) if requests else []
+
+            for (shard, indexes), payload in zip(requests, payloads):
+                for index, item in zip(indexes, loads(payload)):
+                    valid_result[index] = self._written(shard, item)
+            self.logger.debug("Client Scoreboard obtained update response from server ({} client infos)".format(
+                len(valid_result)))
+
+            # Restore the order of the client infos
+            valid_result = iter(valid_result)
+            result = []
+            for is_valid in is_valid_list:
+                if is_valid:
+                    result.append(next(valid_result))
+                else:
+                    result.append({"error": "Invalid client info"})
 
         else:
-            result = {"error": "Invalid ranking_position, scope_size values"}
+            result = {"error": "Invalid client info list"}
 
         return result
 
+    @staticmethod
+    def _encode(clients):
+        """
+            Returns the encoded JSON list of the specified clients (same as dumps of their to_json), joining their
+                own encoded JSON (see Client.encoded).
+
+        :param clients: (list of Client) The clients.
+        :return: (bytes) The UTF-8 JSON.
+        """
+        return b"[" + b", ".join([client.encoded() for client in clients]) + b"]"
+
+    def top(self, top_size, encoded=False):
+        """
+            Asks the shared Scoreboard for the clients that occupy the specified number of top ranking positions
+            (i.e., those with the higher score values), according to the absolute ranking.
+
+        :param top_size: (int) Number of higher ranking positions to retrieve.
+        :param encoded: (bool) True to get the encoded JSON response, as sent by the server if not sharded (e.g., to be
+                    sent as is in an HTTP response). False to get it decoded. Only in CLIENT_MODE.
+        :return: (list of dict) The clients that occupies the specified ranking positions. (bytes) If encoded (always
+                    in SERVER_MODE).
+        """
+        if self.mode == SERVER_MODE:
+            top_size = int(top_size)
+            result = self.top_views.get(top_size)
+
+            if result is None:
+                clients = self.scoreboard.top(top_size)
+                result = self._encode(clients)
+                self.logger.debug("Server Scoreboard top ({}) : {}".format(top_size, clients))
+
+                if self.top_views.is_hot(top_size):
+                    # The lowest score in the view, unless there are not enough ranking positions to fill it
+                    if clients and len(self.scoreboard.sorted_clients) >= top_size:
+                        cutoff = clients[-1].score
+                    else:
+                        cutoff = None
+                    self.top_views.store(top_size, result, cutoff)
+            else:
+                self.logger.debug("Server Scoreboard top ({}) : pre-serialized view".format(top_size))
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._cached(("top", top_size, encoded), self._client_top(top_size, encoded)))
+
+        else:
+            result = {"error": "Invalid top size"}
+
+        return result
+
+    async def top_async(self, top_size, encoded=False):
+        """
+            Asyncio counterpart of top (see top). Only in CLIENT_MODE.
+
+        :param top_size: (int) Number of higher ranking positions to retrieve.
+        :param encoded: (bool) True to get the encoded JSON response.
+        :return: (list of dict) The clients that occupies the specified ranking positions. (bytes) If encoded.
+        """
+        return await self._run_async(self._cached(("top", top_size, encoded),
+                                                  self._client_top(top_size, encoded, wait=False)))
+
+    def _client_top(self, top_size, encoded, wait=True):
+        """
+            Client plan of top (see _run). Only waits for the replicas if wait (see _read_replicas).
+        """
+        if isinstance(top_size, int):
+            # The top_size higher ranking positions of every shard, from the replicas (if fresh) or the servers
+            rankings = self._read_replicas(lambda scoreboard: self._encode(scoreboard.top(top_size)), wait=wait)
+            if rankings is None:
+                rankings = yield self._to_all("top", str(top_size))
+
+            if len(self.shards) == 1:
+                result = rankings[0]
+            else:
+                result = self.shards.merge([loads(ranking) for ranking in rankings], 1, top_size)
+            self.logger.debug("Client Scoreboard top ({}) : {}".format(top_size, result))
+
+        else:
+            result = {"error": "Invalid top size"}
+
+        # Only the response of a single server is already encoded
+        if isinstance(result, bytes) != encoded:
+            result = dumps(result).encode() if encoded else loads(result)
+
+        return result
+
+    def relative_top(self, ranking_position, scope_size, encoded=False):
+        """
+            Asks the shared Scoreboard for the relative top (see Scoreboard.relative_top)
+
+            IMPLEMENTATION NOTE: If sharded, the highest score below the ranking positions above the scope is first
+                searched by counting the higher scores of every shard (see _threshold_score), and then every shard
+                only sends its scores from it on, as many as the ranking positions of the scope. So the cost grows with
+                the scope size, not with the ranking position.
+
+        :param ranking_position: (int) Ranking position to retrieve scope around. Must be a positive value, from 1 to N.
+        :param scope_size: (int) Scope size (see explanation above). Must be a positive value.
+        :param encoded: (bool) True to get the encoded JSON response (see top). Only in CLIENT_MODE.
+        :return: (list of dict) The clients that occupies the specified ranking positions. (bytes) If encoded (always
+                    in SERVER_MODE).
+        """
+        if self.mode == SERVER_MODE:
+            clients = self.scoreboard.relative_top(int(ranking_position), int(scope_size))
+            result = self._encode(clients)
+            self.logger.debug("Server Scoreboard relative top ({}, {}) : {}".format(ranking_position, scope_size,
+                                                                                    clients))
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._cached(("relative_top", ranking_position, scope_size, encoded),
+                                            self._client_relative_top(ranking_position, scope_size, encoded)))
+
+        else:
+            result = {"error": "Invalid ranking_position, scope_size values"}
+
+        return result
+
+    async def relative_top_async(self, ranking_position, scope_size, encoded=False):
+        """
+            Asyncio counterpart of relative_top (see relative_top). Only in CLIENT_MODE.
+
+        :param ranking_position: (int) Ranking position to retrieve scope around.
+        :param scope_size: (int) Scope size.
+        :param encoded: (bool) True to get the encoded JSON response.
+        :return: (list of dict) The clients that occupies the specified ranking positions. (bytes) If encoded.
+        """
+        return await self._run_async(self._cached(("relative_top", ranking_position, scope_size, encoded),
+                                                  self._client_relative_top(ranking_position, scope_size, encoded,
+                                                                            wait=False)))
+
+    def _client_relative_top(self, ranking_position, scope_size, encoded, wait=True):
+        """
+            Client plan of relative_top (see _run). Only waits for the replicas if wait (see _read_replicas).
+        """
+        if isinstance(ranking_position, int) and isinstance(scope_size, int):
+            if len(self.shards) == 1:
+                result = self._read_replicas(lambda scoreboard: self._encode(
+                    scoreboard.relative_top(ranking_position, scope_size)), wait=wait)
+                if result is None:
+                    result = yield [(0, "relative_top", (str(ranking_position), str(scope_size)))]
+                result = result[0]
+
+            elif ranking_position >= 1 and scope_size >= 0:
+                first_position, last_position = max(1, ranking_position - scope_size), ranking_position + scope_size
+
+                if first_position == 1:
+                    # The ranking positions of a shard are not the merged ones, so every shard sends all its ranking
+                    # positions up to the last requested one (see Shards.merge)
+                    rankings = self._read_replicas(lambda scoreboard: self._encode(scoreboard.top(last_position)),
+                                                   wait=wait)
+                    if rankings is None:
+                        rankings = yield self._to_all("top", str(last_position))
+                    result = self.shards.merge([loads(ranking) for ranking in rankings], 1, last_position)
+
+                else:
+                    # Only the scores below the ranking positions above the first one are merged: the highest one, and
+                    # the next ones of every shard, as many as the requested ranking positions (see Shards.merge)
+                    threshold = yield from self._threshold_score(first_position - 1, wait)
+                    result = []
+
+                    if threshold is not None:
+                        score, num_higher_scores = threshold
+                        num_scores = last_position - first_position + 1
+                        rankings = self._read_replicas(lambda scoreboard: self._encode(
+                            scoreboard.around_score(score, num_scores)), wait=wait)
+                        if rankings is None:
+                            rankings = yield self._to_all("around_score", str(score), str(num_scores))
+                        rankings = [[row for row in loads(ranking) if row["total"] <= score] for ranking in rankings]
+                        result = self.shards.merge(rankings, max(1, first_position - num_higher_scores),
+                                                   last_position - num_higher_scores)
+
+            else:
+                result = []
+            self.logger.debug("Client Scoreboard relative top ({}, {}) : {}".format(ranking_position, scope_size,
+                                                                                    result))
+
+        else:
+            result = {"error": "Invalid ranking_position, scope_size values"}
+
+        # Only the response of a single server is already encoded
+        if isinstance(result, bytes) != encoded:
+            result = dumps(result).encode() if encoded else loads(result)
+
+        return result
+
+
+    def around(self, client_id, scope, encoded=False):
+        """
+            Asks the shared Scoreboard for the clients in the specified scope around the specified client (see
+                Scoreboard.around), i.e., the client and its rivals.
+
+            IMPLEMENTATION NOTE: If sharded, every shard sends the clients with the score of the client and its scope
+                nearest higher and lower scores (see around_score), so the cost does not grow with the ranking position.
+
+        :param client_id: (int) The id of the client.
+        :param scope: (int) Number of ranking positions above and below the one of the client.
+        :param encoded: (bool) True to get the encoded JSON response (see top). Only in CLIENT_MODE.
+        :return: (list of dict) The clients that occupy those ranking positions, or {"error": "Unknown user"}. (bytes)
+                    If encoded (always in SERVER_MODE).
+        """
+        if self.mode == SERVER_MODE:
+            result = self._around(self.scoreboard, int(client_id), int(scope))
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._cached(("around", client_id, scope, encoded),
+                                            self._client_around(client_id, scope, encoded)))
+
+        else:
+            result = {"error": "Invalid user, scope values"}
+
+        return result
+
+    async def around_async(self, client_id, scope, encoded=False):
+        """
+            Asyncio counterpart of around (see around). Only in CLIENT_MODE.
+
+        :param client_id: (int) The id of the client.
+        :param scope: (int) Number of ranking positions above and below the one of the client.
+        :param encoded: (bool) True to get the encoded JSON response.
+        :return: (list of dict) The clients that occupy those ranking positions. (bytes) If encoded.
+        """
+        return await self._run_async(self._cached(("around", client_id, scope, encoded),
+                                                  self._client_around(client_id, scope, encoded, wait=False)))
+
+    def _client_around(self, client_id, scope, encoded, wait=True):
+        """
+            Client plan of around (see _run). Only waits for the replicas if wait (see _read_replicas).
+        """
+        if isinstance(client_id, int) and isinstance(scope, int):
+            shard = self.shards.of(client_id)
+
+            if len(self.shards) == 1:
+                result = self._read_replicas(lambda scoreboard: self._around(scoreboard, client_id, scope), [shard],
+                                             wait)
+                if result is None:
+                    result = yield [(shard, "around", (str(client_id), str(scope)))]
+                result = result[0]
+
+            else:
+                rank = self._read_replicas(lambda scoreboard: self._rank(scoreboard, client_id), [shard], wait)
+                rank = rank[0] if rank is not None else loads((yield [(shard, "rank", (str(client_id),))])[0])
+
+                if "total" in rank:
+                    # The nearest scores of every shard include the merged nearest ones
+                    score = rank["total"]
+                    rankings = self._read_replicas(lambda scoreboard: self._encode(
+                        scoreboard.around_score(score, scope)), wait=wait)
+                    if rankings is None:
+                        rankings = yield self._to_all("around_score", str(score), str(scope))
+                    rankings = [loads(ranking) for ranking in rankings]
+
+                    num_higher_scores = self.shards.count_scores([[row["total"] for row in ranking
+                                                                   if row["total"] > score] for ranking in rankings])
+                    result = self.shards.merge(rankings, max(1, num_higher_scores - scope + 1),
+                                               num_higher_scores + 1 + scope)
+                else:
+                    result = {"error": "Unknown user"}
+            self.logger.debug("Client Scoreboard around ({}, {}) : {}".format(client_id, scope, result))
+
+        else:
+            result = {"error": "Invalid user, scope values"}
+
+        # Only the response of a single server is already encoded
+        if isinstance(result, bytes) != encoded:
+            result = dumps(result).encode() if encoded else loads(result)
+
+        return result
+
+    def around_score(self, score, scope):
+        """
+            Returns the clients with the specified score, and the ones with the scope nearest higher and lower scores
+                (see Scoreboard.around_score). Only in SERVER_MODE (used by the clients of a sharded Scoreboard to
+                merge the scope around a client).
+
+        :param score: (str) The score.
+        :param scope: (str) Number of different higher and lower scores.
+        :return: (bytes) The encoded JSON list of clients.
+        """
+        return self._encode(self.scoreboard.around_score(int(score), int(scope)))
+
+    def _around(self, scoreboard, client_id, scope):
+        """
+            Returns the encoded scope around the specified client in the specified Scoreboard (see Scoreboard.around).
+
+        :param scoreboard: (Scoreboard) The Scoreboard (the server one, or a replica).
+        :param client_id: (int) The id of the client.
+        :param scope: (int) Number of ranking positions above and below the one of the client.
+        :return: (bytes) The encoded JSON list of clients, or {"error": "Unknown user"}.
+        """
+        clients = scoreboard.around(client_id, scope)
+
+        return self._encode(clients) if clients is not None else dumps({"error": "Unknown user"}).encode()
+
+    def ranking(self, limit, after=None, after_user=None):
+        """
+            Asks the shared Scoreboard for a page of the full ranking (see Scoreboard.ranking), i.e., the limit clients
+                that follow the specified cursor. Each page ends with the cursor of the next one, so paging through the
+                ranking costs the same for every page, regardless of its depth.
+
+            IMPLEMENTATION NOTE: If sharded, tied clients of different shards are sorted by shard (see Shards), so the
+                cursor of a shard is derived from the one of the page: shards before the one of the cursor client
+                follow the lower scores, and shards after it start from the score of the cursor.
+
+        :param limit: (int) Maximum number of clients of the page, from 1 to RANKING_MAX_LIMIT.
+        :param after: (str) The cursor of the page ("<score>:<user>"), as returned by the prior one. None (or empty)
+                    for the first page. In SERVER_MODE, the score of the cursor only (see Scoreboard.ranking).
+        :param after_user: (str) Only in SERVER_MODE, the id of the cursor client (see Scoreboard.ranking).
+        :return: (dict) The page, as follows:
+
+                    {"ranking": [{"user": <client_id>, "total": <total_score>}, ...], "next": "<score>:<user>"}
+
+                    where next is None if there are no more clients. (bytes) In SERVER_MODE, the encoded JSON list of
+                    the clients.
+        """
+        if self.mode == SERVER_MODE:
+            clients = self.scoreboard.ranking(int(limit), int(after) if after else None,
+                                              int(after_user) if after_user else None)
+            result = self._encode(clients)
+            self.logger.debug("Server Scoreboard ranking ({}, {}, {}) : {}".format(limit, after, after_user, clients))
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._cached(("ranking", limit, after or ""), self._client_ranking(limit, after)))
+
+        else:
+            result = {"error": "Invalid after, limit values"}
+
+        return result
+
+    async def ranking_async(self, limit, after=None):
+        """
+            Asyncio counterpart of ranking (see ranking). Only in CLIENT_MODE.
+
+        :param limit: (int) Maximum number of clients of the page.
+        :param after: (str) The cursor of the page. None for the first page.
+        :return: (dict) The page, and the cursor of the next one.
+        """
+        return await self._run_async(self._cached(("ranking", limit, after or ""),
+                                                  self._client_ranking(limit, after, wait=False)))
+
+    def _client_ranking(self, limit, after, wait=True):
+        """
+            Client plan of ranking (see _run). Only waits for the replicas if wait (see _read_replicas).
+        """
+        try:
+            if not isinstance(limit, int) or not 1 <= limit <= RANKING_MAX_LIMIT:
+                raise ValueError(limit)
+            after_score, after_user = map(int, after.split(":")) if after else (None, None)
+
+        except ValueError:
+            result = {"error": "Invalid after, limit values"}
+
+        else:
+            # The cursor of each shard (see Scoreboard.ranking)
+            if after_score is None:
+                cursors = [("", "")] * len(self.shards)
+            else:
+                cursor_shard = self.shards.of(after_user)
+                cursors = [(str(after_score), "") if shard < cursor_shard else
+                           (str(after_score), str(after_user)) if shard == cursor_shard else
+                           (str(after_score + 1), "") for shard in range(len(self.shards))]
+
+            # One more client than the limit, to know whether there is a next page
+            pages = []
+            for shard, (score, user) in enumerate(cursors):
+                page = self._read_replicas(lambda scoreboard: self._encode(scoreboard.ranking(
+                    limit + 1, int(score) if score else None, int(user) if user else None)), [shard], wait)
+                if page is None:
+                    pages = None
+                    break
+                pages.extend(page)
+            if pages is None:
+                pages = yield [(shard, "ranking", (str(limit + 1), score, user))
+                               for shard, (score, user) in enumerate(cursors)]
+
+            # Stable merge: tied clients keep the order of their shards
+            rows = list(islice(heapq.merge(*[loads(page) for page in pages], key=lambda row: row["total"],
+                                           reverse=True), limit + 1))
+            result = {"ranking": rows[:limit],
+                      "next": "{}:{}".format(rows[limit - 1]["total"], rows[limit - 1]["user"])
+                      if len(rows) > limit else None}
+            self.logger.debug("Client Scoreboard ranking ({}, {}) : {}".format(limit, after, result))
+
+        return result
+
+    def rank(self, client_id):
+        """
+            Asks the shared Scoreboard for the ranking position of the specified client (see Scoreboard.rank)
+
+            IMPLEMENTATION NOTE: If sharded, every shard sends its scores higher than the one of the client, so the
+                cost grows with the ranking position.
+
+        :param client_id: (int) The id of the client.
+        :return: (dict) The client score and ranking position, as follows:
+
+                    {"user": <client_id>, "total": <total_score>, "position": <ranking_position>}
+        """
+        if self.mode == SERVER_MODE:
+            result = self._rank(self.scoreboard, int(client_id))
+            self.logger.debug("Server Scoreboard rank ({}) : {}".format(client_id, result))
+            result = dumps(result)
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._cached(("rank", client_id), self._client_rank(client_id)))
+
+        else:
+            result = {"error": "Invalid user"}
+
+        return result
+
+    async def rank_async(self, client_id):
+        """
+            Asyncio counterpart of rank (see rank). Only in CLIENT_MODE.
+
+        :param client_id: (int) The id of the client.
+        :return: (dict) The client score and ranking position.
+        """
+        return await self._run_async(self._cached(("rank", client_id), self._client_rank(client_id, wait=False)))
+
+    def _client_rank(self, client_id, wait=True):
+        """
+            Client plan of rank (see _run). Only waits for the replicas if wait (see _read_replicas).
+        """
+        if isinstance(client_id, int):
+            shard = self.shards.of(client_id)
+            result = self._read_replicas(lambda scoreboard: self._rank(scoreboard, client_id), [shard], wait)
+            if result is not None:
+                result = result[0]
+            else:
+                payload, = yield [(shard, "rank", (str(client_id),))]
+                result = loads(payload)
+
+            if len(self.shards) > 1 and "position" in result:
+                # The merged ranking position follows the number of higher scores of every shard (see Shards)
+                num_higher_scores, = yield from self._count_higher([result["total"]], wait=wait)
+                result["position"] = num_higher_scores + 1
+            self.logger.debug("Client Scoreboard rank ({}) : {}".format(client_id, result))
+
+        else:
+            result = {"error": "Invalid user"}
+
+        return result
+
+    def _count_higher(self, scores, window="", closed="", board="", wait=True):
+        """
+            Client plan (see _run) that returns the number of merged ranking positions above each one of the specified
+                scores (see Shards), i.e., the number of higher scores of every shard (see count_higher), added up.
+                The time windows are not read from the replicas (see _read_replicas).
+
+        :param scores: (list of int) The scores.
+        :param window: (str) The name of a time window, to use its Scoreboard instead (see _board).
+        :param closed: (str) Not empty for the last closed window.
+        :param board: (str) The name of a named Scoreboard, to use it instead (see _board).
+        :param wait: (bool) True to wait for the replicas (see _read_replicas).
+        :return: (list of int) The number of ranking positions above each score, in the same order.
+        """
+        counts = None
+        if not window:
+            counts = self._read_replicas(lambda scoreboard: [scoreboard.count_higher(score) for score in scores],
+                                         wait=wait, board=board)
+
+        if counts is None:
+            payloads = yield [(shard, "count_higher", (str(score), window, closed, board))
+                              for shard in range(len(self.shards)) for score in scores]
+            counts = [[int(payload) for payload in payloads[shard * len(scores):(shard + 1) * len(scores)]]
+                      for shard in range(len(self.shards))]
+
+        return [sum(shard_counts) for shard_counts in zip(*counts)]
+
+    def _threshold_score(self, num_positions, wait=True):
+        """
+            Client plan (see _run) that returns the highest score with, at least, the specified number of merged
+                ranking positions above it (see Shards), i.e., the highest score of the ranking positions below them.
+
+            It is searched by counting the ranking positions above several probe scores at once (see _count_higher):
+            first exponentially spaced ones, and then equally spaced ones between the nearest two of them, so it takes a
+            few rounds (about log16 of the distance between them), regardless of the number of clients.
+
+        :param num_positions: (int) Number of ranking positions above. Must be a positive value.
+        :param wait: (bool) True to wait for the replicas (see _read_replicas).
+        :return: (tuple) The score, and the actual number of ranking positions above it. None if there are not as many
+                    ranking positions.
+        """
+        # The score is within (low, high]: at least num_positions above low, and less above high
+        low, high = MIN_SCORE - 1, MAX_SCORE
+        probes = [low, 0] + [sign * 16 ** exponent for exponent in range(1, 16) for sign in (-1, 1)]
+        counts = yield from self._count_higher(probes, wait=wait)
+
+        if counts[0] < num_positions:
+            return None
+        num_higher_scores = counts[0]
+
+        while True:
+            for probe, count in zip(probes, counts):
+                if count >= num_positions and probe > low:
+                    low, num_higher_scores = probe, count
+                elif count < num_positions and probe < high:
+                    high = probe
+
+            if high - low <= 1:
+                break
+            probes = sorted({low + (high - low) * step // 16 for step in range(1, 16)} - {low})
+            counts = yield from self._count_higher(probes, wait=wait)
+
+        return low, num_higher_scores
+
+    @staticmethod
+    def _rank(scoreboard, client_id):
+        """
+            Returns the score and ranking position of the specified client in the specified Scoreboard.
+
+        :param scoreboard: (Scoreboard) The Scoreboard (the server one, or a replica).
+        :param client_id: (int) The id of the client.
+        :return: (dict) As follows:
+
+                    {"user": <client_id>, "total": <total_score>, "position": <ranking_position>}
+
+                    or {"error": "Unknown user"}
+        """
+        client = scoreboard.get(client_id)
+
+        if client is not None:
+            result = {"user": client.id, "total": client.score, "position": scoreboard.rank(client.id)}
+        else:
+            result = {"error": "Unknown user"}
+
+        return result
+
+    def _board(self, window, closed, board=""):
+        """
+            Returns the all-time Scoreboard, the one of the specified time window, or the specified named Scoreboard.
+                Only in SERVER_MODE.
+
+        :param window: (str) The name of the time window. Empty for the all-time Scoreboard.
+        :param closed: (str) Not empty for the last closed window (an empty Scoreboard if not closed yet).
+        :param board: (str) The name of a named Scoreboard (an empty Scoreboard if not created yet), instead.
+        :return: (Scoreboard) The Scoreboard.
+        :raises: (KeyError) If the time window is unknown.
+        """
+        if board:
+            return self.boards.get(board) or Scoreboard()
+
+        if not window:
+            return self.scoreboard
+
+        result = self.windows[window].get(bool(closed))
+
+        return result if result is not None else Scoreboard()
+
+    def window_top(self, window, top_size, closed=False):
+        """
+            Asks the shared Scoreboard for the top ranking positions of a time window (see top and WindowedScoreboard).
+                Window queries always go to the servers (the read replicas only follow the all-time Scoreboard).
+
+        :param window: (str) The name of the time window (see WINDOWS).
+        :param top_size: (int) Number of higher ranking positions to retrieve.
+        :param closed: (bool) True for the last closed window (e.g., for its payouts). In SERVER_MODE, not empty.
+        :return: (list of dict) The clients that occupies the specified ranking positions. (bytes) In SERVER_MODE,
+                    the encoded JSON list.
+        """
+        if self.mode == SERVER_MODE:
+            clients = self._board(window, closed).top(int(top_size))
+            result = self._encode(clients)
+            self.logger.debug("Server Scoreboard window top ({}, {}, {}) : {}".format(window, top_size, closed,
+                                                                                      clients))
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._cached(("window_top", window, top_size, bool(closed)),
+                                            self._client_window_top(window, top_size, closed)))
+
+        else:
+            result = {"error": "Invalid window, top size"}
+
+        return result
+
+    async def window_top_async(self, window, top_size, closed=False):
+        """
+            Asyncio counterpart of window_top (see window_top). Only in CLIENT_MODE.
+
+        :param window: (str) The name of the time window.
+        :param top_size: (int) Number of higher ranking positions to retrieve.
+        :param closed: (bool) True for the last closed window.
+        :return: (list of dict) The clients that occupies the specified ranking positions.
+        """
+        return await self._run_async(self._cached(("window_top", window, top_size, bool(closed)),
+                                                  self._client_window_top(window, top_size, closed)))
+
+    def _client_window_top(self, window, top_size, closed):
+        """
+            Client plan of window_top (see _run).
+        """
+        if window in self.window_periods and isinstance(top_size, int):
+            rankings = yield self._to_all("window_top", window, str(top_size), "1" if closed else "")
+            result = self.shards.merge([loads(ranking) for ranking in rankings], 1, top_size)
+            self.logger.debug("Client Scoreboard window top ({}, {}, {}) : {}".format(window, top_size, closed,
+                                                                                      result))
+
+        else:
+            result = {"error": "Invalid window, top size"}
+
+        return result
+
+    def window_rank(self, window, client_id, closed=False):
+        """
+            Asks the shared Scoreboard for the score and ranking position of the specified client in a time window (see
+                rank and WindowedScoreboard).
+
+        :param window: (str) The name of the time window (see WINDOWS).
+        :param client_id: (int) The id of the client.
+        :param closed: (bool) True for the last closed window. In SERVER_MODE, not empty.
+        :return: (dict) The client score and ranking position (see rank).
+        """
+        if self.mode == SERVER_MODE:
+            result = dumps(self._rank(self._board(window, closed), int(client_id)))
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._cached(("window_rank", window, client_id, bool(closed)),
+                                            self._client_window_rank(window, client_id, closed)))
+
+        else:
+            result = {"error": "Invalid window, user"}
+
+        return result
+
+    async def window_rank_async(self, window, client_id, closed=False):
+        """
+            Asyncio counterpart of window_rank (see window_rank). Only in CLIENT_MODE.
+
+        :param window: (str) The name of the time window.
+        :param client_id: (int) The id of the client.
+        :param closed: (bool) True for the last closed window.
+        :return: (dict) The client score and ranking position.
+        """
+        return await self._run_async(self._cached(("window_rank", window, client_id, bool(closed)),
+                                                  self._client_window_rank(window, client_id, closed)))
+
+    def _client_window_rank(self, window, client_id, closed):
+        """
+            Client plan of window_rank (see _run).
+        """
+        if window in self.window_periods and isinstance(client_id, int):
+            closed = "1" if closed else ""
+            payload, = yield [(self.shards.of(client_id), "window_rank", (window, str(client_id), closed))]
+            result = loads(payload)
+
+            if len(self.shards) > 1 and "position" in result:
+                # The merged ranking position (see _client_rank)
+                num_higher_scores, = yield from self._count_higher([result["total"]], window, closed)
+                result["position"] = num_higher_scores + 1
+            self.logger.debug("Client Scoreboard window rank ({}, {}, {}) : {}".format(window, client_id, closed,
+                                                                                       result))
+
+        else:
+            result = {"error": "Invalid window, user"}
+
+        return result
+
+    def windows_info(self):
+        """
+            Asks the shared Scoreboard for the bounds and the number of clients of each time window (see
+                WindowedScoreboard.info).
+
+        :return: (dict) The info of each time window, as follows (the number of clients of all the shards):
+
+                    {<name>: {"start": <start>, "end": <end>, "clients": <num_clients>, "rotations": <num_rotations>,
+                              "closed": {"start": <start>, "end": <end>, "clients": <num_clients>}}, ...}
+        """
+        if self.mode == SERVER_MODE:
+            result = dumps({name: windowed.info() for name, windowed in self.windows.items()})
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._client_windows_info())
+
+        else:
+            result = {"error": "Not started"}
+
+        return result
+
+    async def windows_info_async(self):
+        """
+            Asyncio counterpart of windows_info (see windows_info). Only in CLIENT_MODE.
+
+        :return: (dict) The info of each time window.
+        """
+        return await self._run_async(self._client_windows_info())
+
+    def _client_windows_info(self):
+        """
+            Client plan of windows_info (see _run).
+        """
+        infos = [loads(payload) for payload in (yield self._to_all("windows_info"))]
+        result = infos[0]
+
+        for info in infos[1:]:
+            for name, window_info in info.items():
+                result[name]["clients"] += window_info["clients"]
+                if window_info["closed"] is not None and result[name]["closed"] is not None:
+                    result[name]["closed"]["clients"] += window_info["closed"]["clients"]
+
+        return result
+
+    def _named(self, board, command, create=False):
+        """
+            Returns the specified named Scoreboard, and accounts a request of the specified command to it. Only in
+                SERVER_MODE.
+
+        :param board: (str) The name of the named Scoreboard.
+        :param command: (str) The command of the request.
+        :param create: (bool) True to return a new named Scoreboard if not created yet, that is only kept once it
+                    accepts its first score (see _created).
+        :return: (Scoreboard) The named Scoreboard. None if not created.
+        :raises: (ValueError) If it must be created, but the name is not valid or there are already max_boards.
+        """
+        result = self.boards.get(board)
+
+        if result is None and create:
+            if not self.is_valid_board(board) or len(self.boards) >= self.max_boards:
+                raise ValueError("Cannot create board {}".format(board))
+            result = Scoreboard()
+
+        elif result is not None:
+            requests = self.board_requests[board]
+            requests[command] = requests.get(command, 0) + 1
+
+        return result
+
+    def _created(self, board, scoreboard, command=None):
+        """
+            Keeps the specified named Scoreboard, if not kept yet (see _named). Only in SERVER_MODE.
+
+        :param board: (str) The name of the named Scoreboard.
+        :param scoreboard: (Scoreboard) The new named Scoreboard.
+        :param command: (str) The command of the request that created it. None if not created by a request (e.g.,
+                    restored, regardless of MAX_BOARDS).
+        :return: (Scoreboard) The kept named Scoreboard.
+        """
+        if board not in self.boards:
+            self.boards[board] = scoreboard
+            self.board_requests[board] = {command: 1} if command is not None else {}
+            self.logger.info("Server Scoreboard board created : {}".format(board))
+
+        return self.boards[board]
+
+    def _reset_boards(self):
+        """
+            Removes all the named Scoreboards (dismantled in background, see retire). Only in SERVER_MODE.
+
+        :return: None
+        """
+        for board in self.boards.values():
+            retire(board)
+        self.boards, self.board_requests = {}, {}
+
+    def board_update(self, board, client_info):
+        """
+            Same as update, but on the specified named Scoreboard, created by its first accepted score (see
+                MAX_BOARDS).
+
+            The records of the named Scoreboards are logged and published along with the ones of the Scoreboard,
+            tagged with their name (see WriteAheadLog), so they are restored after a restart and kept by the replicas.
+
+        :param board: (str) The name of the named Scoreboard (see BOARD_NAME).
+        :param client_info: (dict) A JSON submitted by the client (see update).
+        :return: (dict) The updated client score.
+        """
+        if self.mode == SERVER_MODE:
+            try:
+                scoreboard = self._named(board, "update", create=True)
+            except ValueError:
+                return dumps({"error": "Invalid board"})
+
+            client_info = loads(client_info)
+            if scoreboard.update(client_info):
+                self._created(board, scoreboard, "update")
+                client = scoreboard.get(client_info["user"])
+                result = {"user": client.id, "total": client.score}
+                seq = self._log([{"board": board, "user": client.id, "total": client.score}])
+                if seq is not None:
+                    result["seq"] = seq
+            else:
+                result = {"error": "Invalid client info"}
+            result = dumps(result)
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._client_update(client_info, board))
+
+        else:
+            result = {"error": "Invalid client info"}
+
+        return result
+
+    async def board_update_async(self, board, client_info):
+        """
+            Asyncio counterpart of board_update (see board_update). Only in CLIENT_MODE.
+
+        :param board: (str) The name of the named Scoreboard.
+        :param client_info: (dict) A JSON submitted by the client.
+        :return: (dict) The updated client score.
+        """
+        return await self._run_async(self._client_update(client_info, board))
+
+    def board_update_many(self, board, client_info_list):
+        """
+            Same as update_many, but on the specified named Scoreboard (see board_update).
+
+        :param board: (str) The name of the named Scoreboard (see BOARD_NAME).
+        :param client_info_list: (list of dict) JSONs submitted by the clients (see update).
+        :return: (list of dict) The updated client score of each client info, in the same order.
+        """
+        if self.mode == SERVER_MODE:
+            try:
+                scoreboard = self._named(board, "update_many", create=True)
+            except ValueError:
+                return dumps({"error": "Invalid board"})
+
+            client_info_list = loads(client_info_list)
+            totals = scoreboard.update_many(client_info_list)
+            result = [{"user": int(client_info["user"]), "total": total} if total is not None else
+                      {"error": "Invalid client info"} for client_info, total in zip(client_info_list, totals)]
+
+            # A record per modified client, sorted by its last accepted modification (see _update_many)
+            modified_ids = {}
+            for item in result:
+                if "error" not in item:
+                    modified_ids.pop(item["user"], None)
+                    modified_ids[item["user"]] = None
+
+            if modified_ids:
+                self._created(board, scoreboard, "update_many")
+                seq = self._log([{"board": board, "user": client_id, "total": scoreboard.get(client_id).score}
+                                 for client_id in modified_ids])
+                if seq is not None:
+                    for item in result:
+                        if "error" not in item:
+                            item["seq"] = seq
+            result = dumps(result)
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._client_update_many(client_info_list, board))
+
+        else:
+            result = {"error": "Invalid client info list"}
+
+        return result
+
+    async def board_update_many_async(self, board, client_info_list):
+        """
+            Asyncio counterpart of board_update_many (see board_update_many). Only in CLIENT_MODE.
+
+        :param board: (str) The name of the named Scoreboard.
+        :param client_info_list: (list of dict) JSONs submitted by the clients.
+        :return: (list of dict) The updated client score of each client info, in the same order.
+        """
+        return await self._run_async(self._client_update_many(client_info_list, board))
+
+    def board_top(self, board, top_size):
+        """
+            Same as top, but on the specified named Scoreboard (see board_update).
+
+        :param board: (str) The name of the named Scoreboard.
+        :param top_size: (int) Number of higher ranking positions to retrieve.
+        :return: (list of dict) The clients that occupies the specified ranking positions (none if the named
+                    Scoreboard is not created yet). (bytes) In SERVER_MODE, the encoded JSON list.
+        """
+        if self.mode == SERVER_MODE:
+            scoreboard = self._named(board, "top")
+            result = self._encode(scoreboard.top(int(top_size)) if scoreboard is not None else [])
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._cached(("board_top", board, top_size), self._client_board_top(board, top_size)))
+
+        else:
+            result = {"error": "Invalid board, top size"}
+
+        return result
+
+    async def board_top_async(self, board, top_size):
+        """
+            Asyncio counterpart of board_top (see board_top). Only in CLIENT_MODE.
+
+        :param board: (str) The name of the named Scoreboard.
+        :param top_size: (int) Number of higher ranking positions to retrieve.
+        :return: (list of dict) The clients that occupies the specified ranking positions.
+        """
+        return await self._run_async(self._cached(("board_top", board, top_size),
+                                                  self._client_board_top(board, top_size)))
+
+    def _client_board_top(self, board, top_size):
+        """
+            Client plan of board_top (see _run).
+        """
+        if self.is_valid_board(board) and isinstance(top_size, int):
+            rankings = self._read_replicas(lambda scoreboard: self._encode(scoreboard.top(top_size)), board=board)
+            if rankings is None:
+                rankings = yield self._to_all("board_top", board, str(top_size))
+            result = self.shards.merge([loads(ranking) for ranking in rankings], 1, top_size)
+            self.logger.debug("Client Scoreboard board top ({}, {}) : {}".format(board, top_size, result))
+
+        else:
+            result = {"error": "Invalid board, top size"}
+
+        return result
+
+    def board_rank(self, board, client_id):
+        """
+            Same as rank, but on the specified named Scoreboard (see board_update).
+
+        :param board: (str) The name of the named Scoreboard.
+        :param client_id: (int) The id of the client.
+        :return: (dict) The client score and ranking position (see rank).
+        """
+        if self.mode == SERVER_MODE:
+            scoreboard = self._named(board, "rank")
+            result = dumps(self._rank(scoreboard if scoreboard is not None else Scoreboard(), int(client_id)))
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._cached(("board_rank", board, client_id),
+                                            self._client_board_rank(board, client_id)))
+
+        else:
+            result = {"error": "Invalid board, user"}
+
+        return result
+
+    async def board_rank_async(self, board, client_id):
+        """
+            Asyncio counterpart of board_rank (see board_rank). Only in CLIENT_MODE.
+
+        :param board: (str) The name of the named Scoreboard.
+        :param client_id: (int) The id of the client.
+        :return: (dict) The client score and ranking position.
+        """
+        return await self._run_async(self._cached(("board_rank", board, client_id),
+                                                  self._client_board_rank(board, client_id)))
+
+    def _client_board_rank(self, board, client_id):
+        """
+            Client plan of board_rank (see _run).
+        """
+        if self.is_valid_board(board) and isinstance(client_id, int):
+            shard = self.shards.of(client_id)
+            result = self._read_replicas(lambda scoreboard: self._rank(scoreboard, client_id), [shard], board=board)
+            if result is not None:
+                result = result[0]
+            else:
+                payload, = yield [(shard, "board_rank", (board, str(client_id)))]
+                result = loads(payload)
+
+            if len(self.shards) > 1 and "position" in result:
+                # The merged ranking position (see _client_rank)
+                num_higher_scores, = yield from self._count_higher([result["total"]], board=board)
+                result["position"] = num_higher_scores + 1
+            self.logger.debug("Client Scoreboard board rank ({}, {}) : {}".format(board, client_id, result))
+
+        else:
+            result = {"error": "Invalid board, user"}
+
+        return result
+
+    def boards_stats(self):
+        """
+            Asks the shared Scoreboard for the size, the memory (see Scoreboard.memory_usage) and the number of
+                requests of each command of every named Scoreboard.
+
+        :return: (dict) The statistics of each named Scoreboard, as follows (the sum of all the shards):
+
+                    {<name>: {"clients": <num_clients>, "memory": <bytes>,
+                              "requests": {<command>: <num_requests>, ...}}, ...}
+        """
+        if self.mode == SERVER_MODE:
+            result = dumps({name: {"clients": len(scoreboard.clients), "memory": scoreboard.memory_usage(),
+                                   "requests": self.board_requests[name]} for name, scoreboard in self.boards.items()})
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._client_boards_stats())
+
+        else:
+            result = {"error": "Not started"}
+
+        return result
+
+    async def boards_stats_async(self):
+        """
+            Asyncio counterpart of boards_stats (see boards_stats). Only in CLIENT_MODE.
+
+        :return: (dict) The statistics of each named Scoreboard.
+        """
+        return await self._run_async(self._client_boards_stats())
+
+    def _client_boards_stats(self):
+        """
+            Client plan of boards_stats (see _run).
+        """
+        result = {}
+
+        for payload in (yield self._to_all("boards_stats")):
+            for name, stats in loads(payload).items():
+                board_stats = result.setdefault(name, {"clients": 0, "memory": 0, "requests": {}})
+                board_stats["clients"] += stats["clients"]
+                board_stats["memory"] += stats["memory"]
+                for command, num_requests in stats["requests"].items():
+                    board_stats["requests"][command] = board_stats["requests"].get(command, 0) + num_requests
+
+        return result
+
+    def percentile(self, client_id):
+        """
+            Asks the shared Scoreboard for the percentile of the specified client (see ScoreIndex), answered in
+                O(log B) regardless of the number of clients.
+
+            IMPLEMENTATION NOTE: If sharded, every shard sends the number of clients of each score bucket, and the
+                client merges them (i.e., the cost grows with the number of buckets, not with the number of clients).
+
+        :param client_id: (int) The id of the client.
+        :return: (dict) The client score, the share of clients below it ("percentile") and at or above it ("top"), at
+                    the resolution of a score bucket (both from 0 to 100), as follows:
+
+                    {"user": <client_id>, "total": <total_score>, "percentile": <percentile>, "top": <top_share>}
+
+                    or {"error": "Unknown user"}
+        """
+        if self.mode == SERVER_MODE:
+            result = dumps(self._percentile(self.scoreboard, self.scoreboard.score_index, int(client_id)))
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._cached(("percentile", client_id), self._client_percentile(client_id)))
+
+        else:
+            result = {"error": "Invalid user"}
+
+        return result
+
+    async def percentile_async(self, client_id):
+        """
+            Asyncio counterpart of percentile (see percentile). Only in CLIENT_MODE.
+
+        :param client_id: (int) The id of the client.
+        :return: (dict) The client score and percentile.
+        """
+        return await self._run_async(self._cached(("percentile", client_id),
+                                                  self._client_percentile(client_id, wait=False)))
+
+    def _client_percentile(self, client_id, wait=True):
+        """
+            Client plan of percentile (see _run). Only waits for the replicas if wait (see _read_replicas).
+        """
+        if isinstance(client_id, int):
+            shard = self.shards.of(client_id)
+
+            if len(self.shards) == 1:
+                result = self._read_replicas(lambda scoreboard: self._percentile(scoreboard, scoreboard.score_index,
+                                                                                 client_id), [shard], wait)
+                result = result[0] if result is not None else \
+                    loads((yield [(shard, "percentile", (str(client_id),))])[0])
+
+            else:
+                rank = self._read_replicas(lambda scoreboard: self._rank(scoreboard, client_id), [shard], wait)
+                rank = rank[0] if rank is not None else loads((yield [(shard, "rank", (str(client_id),))])[0])
+                result = rank
+                if "total" in rank:
+                    result = self._percentile(None, (yield from self._merged_score_index(wait)), client_id,
+                                              rank["total"])
+            self.logger.debug("Client Scoreboard percentile ({}) : {}".format(client_id, result))
+
+        else:
+            result = {"error": "Invalid user"}
+
+        return result
+
+    def score_at(self, percentile):
+        """
+            Asks the shared Scoreboard for the score at the specified percentile (see ScoreIndex.score_at), answered in
+                O(log B) regardless of the number of clients (see percentile).
+
+        :param percentile: (float) The percentile, from 0 to 100.
+        :return: (dict) The lowest score of the bucket at the percentile (None if there are no clients), as follows:
+
+                    {"percentile": <percentile>, "score": <score>}
+        """
+        if self.mode == SERVER_MODE:
+            percentile = float(percentile)
+            result = dumps({"percentile": percentile, "score": self.scoreboard.score_index.score_at(percentile)})
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._cached(("score_at", str(percentile)), self._client_score_at(percentile)))
+
+        else:
+            result = {"error": "Invalid percentile"}
+
+        return result
+
+    async def score_at_async(self, percentile):
+        """
+            Asyncio counterpart of score_at (see score_at). Only in CLIENT_MODE.
+
+        :param percentile: (float) The percentile, from 0 to 100.
+        :return: (dict) The score at the percentile.
+        """
+        return await self._run_async(self._cached(("score_at", str(percentile)),
+                                                  self._client_score_at(percentile, wait=False)))
+
+    def _client_score_at(self, percentile, wait=True):
+        """
+            Client plan of score_at (see _run). Only waits for the replicas if wait (see _read_replicas).
+        """
+        if isinstance(percentile, (int, float)) and 0 <= percentile <= 100:
+            if len(self.shards) == 1:
+                score = self._read_replicas(lambda scoreboard: scoreboard.score_index.score_at(percentile), wait=wait)
+                result = {"percentile": percentile, "score": score[0]} if score is not None else \
+                    loads((yield [(0, "score_at", (str(percentile),))])[0])
+
+            else:
+                score_index = yield from self._merged_score_index(wait)
+                result = {"percentile": percentile, "score": score_index.score_at(percentile)}
+            self.logger.debug("Client Scoreboard score at ({}) : {}".format(percentile, result))
+
+        else:
+            result = {"error": "Invalid percentile"}
+
+        return result
+
+    def score_counts(self):
+        """
+            Returns the number of clients of each score bucket (see ScoreIndex.counts). Only in SERVER_MODE (used by the
+                clients of a sharded Scoreboard to merge the score distributions).
+
+        :return: (bytes) The counts, as little-endian int64.
+        """
+        return self.scoreboard.score_index.counts().astype("<i8", copy=False).tobytes()
+
+    def _merged_score_index(self, wait):
+        """
+            Client plan (see _run) that returns the score distribution of all the shards (from the replicas, if fresh).
+        """
+        counts = self._read_replicas(lambda scoreboard: scoreboard.score_index.counts(), wait=wait)
+        if counts is None:
+            counts = [np.frombuffer(payload, dtype="<i8") for payload in (yield self._to_all("score_counts"))]
+
+        result = ScoreIndex(SCORE_INDEX_MIN, SCORE_INDEX_MAX, SCORE_INDEX_BUCKETS)
+        result.load_counts(np.sum(counts, axis=0))
+
+        return result
+
+    @staticmethod
+    def _percentile(scoreboard, score_index, client_id, score=None):
+        """
+            Returns the score and percentile of the specified client (see percentile).
+
+        :param scoreboard: (Scoreboard) The Scoreboard of the client (the server one, or a replica). None if the score
+                    is already known.
+        :param score_index: (ScoreIndex) The score distribution (e.g., the merged one of all the shards).
+        :param client_id: (int) The id of the client.
+        :param score: (int) The score of the client, if already known. None if unknown.
+        :return: (dict) The client score and percentile, or {"error": "Unknown user"}.
+        """
+        if scoreboard is not None:
+            client = scoreboard.get(client_id)
+            score = client.score if client is not None else None
+
+        if score is not None:
+            result = {"user": client_id, "total": score, "percentile": score_index.percentile_of(score),
+                      "top": 100 * score_index.count_at_or_above(score) / score_index.count}
+        else:
+            result = {"error": "Unknown user"}
+
+        return result
+
+    def is_valid_stats_query(self, bins, percentiles, thresholds):
+        """
+            True if the format of the specified statistics query is as expected.
+
+            The size of the query is bounded (see STATS_MAX_BINS and STATS_MAX_VALUES), so a single query can not make
+            the server allocate an arbitrarily large result.
+
+        :param bins: (int or list of int) Either the number of equal-width bins (a positive value), or the increasing
+                    bins edges. At most STATS_MAX_BINS bins.
+        :param percentiles: (list of float) Percentiles to compute, from 0 to 100. At most STATS_MAX_VALUES.
+        :param thresholds: (list of int) Thresholds to count the clients above, within MIN_SCORE and MAX_SCORE. At
+                    most STATS_MAX_VALUES.
+        :return: (bool)
+        """
+        result = False
+
+        try:
+            if isinstance(bins, int):
+                valid_bins = 0 < bins <= STATS_MAX_BINS
+            else:
+                valid_bins = (1 < len(bins) <= STATS_MAX_BINS + 1 and
+                              all(isinstance(edge, int) and MIN_SCORE <= edge <= MAX_SCORE for edge in bins) and
+                              all(bins[ptr] < bins[ptr + 1] for ptr in range(len(bins) - 1)))
+
+            valid_percentiles = (len(percentiles) <= STATS_MAX_VALUES and
+                                 all(isinstance(percentile, (int, float)) and 0 <= percentile <= 100
+                                     for percentile in percentiles))
+            valid_thresholds = (len(thresholds) <= STATS_MAX_VALUES and
+                                all(isinstance(threshold, int) and MIN_SCORE <= threshold <= MAX_SCORE
+                                    for threshold in thresholds))
+
+            result = valid_bins and valid_percentiles and valid_thresholds
+
+        except TypeError:
+            pass
+
+        return result
+
+    def stats(self, bins=10, percentiles=(50, 90, 99), thresholds=()):
+        """
+            Asks the shared Scoreboard for the statistics of the scores (see ScoreboardSnapshot.stats), computed over a
+                columnar snapshot of the Scoreboard. If sharded, every shard sends the statistics that add up (see
+                ScoreboardSnapshot.summary) and its score distribution (see score_counts), and the client merges them
+                (see ScoreboardSnapshot.merged_stats: the median and the percentiles are estimated).
+
+        :param bins: (int or list of int) Either the number of equal-width bins, or the bins edges.
+        :param percentiles: (list of float) Percentiles to compute, from 0 to 100.
+        :param thresholds: (list of int) Thresholds to count the clients above.
+        :return: (dict) The statistics.
+        """
+        if self.mode == SERVER_MODE:
+            if isinstance(bins, str):
+                query = loads(bins)
+                bins, percentiles, thresholds = query["bins"], query["percentiles"], query["thresholds"]
+            result = ScoreboardSnapshot(self.scoreboard).stats(bins, percentiles, thresholds)
+            self.logger.debug("Server Scoreboard stats : {}".format(result))
+            result = dumps(result)
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._cached(("stats", dumps([bins, percentiles, thresholds])),
+                                               self._client_stats(bins, percentiles, thresholds)))
+
+        else:
+            result = {"error": "Invalid bins, percentiles, thresholds values"}
+
+        return result
+
+    async def stats_async(self, bins=10, percentiles=(50, 90, 99), thresholds=()):
+        """
+            Asyncio counterpart of stats (see stats). Only in CLIENT_MODE.
+
+        :param bins: (int or list of int) Either the number of equal-width bins, or the bins edges.
+        :param percentiles: (list of float) Percentiles to compute, from 0 to 100.
+        :param thresholds: (list of int) Thresholds to count the clients above.
+        :return: (dict) The statistics.
+        """
+        return await self._run_async(self._cached(("stats", dumps([bins, percentiles, thresholds])),
+                                                        self._client_stats(bins, percentiles, thresholds, wait=False)))
+
+    def _client_stats(self, bins, percentiles, thresholds, wait=True):
+        """
+            Client plan of stats (see _run). Only waits for the replicas if wait (see _read_replicas).
+        """
+        if self.is_valid_stats_query(bins, percentiles, thresholds):
+            if len(self.shards) == 1:
+                query = {"bins": bins, "percentiles": list(percentiles), "thresholds": list(thresholds)}
+                payload, = yield [(0, "stats", (dumps(query),))]
+                result = loads(payload)
+            else:
+                # Merged by the client from the summaries of all the shards. Equal-width bins need the merged min and
+                # max scores first.
+                edges = None if isinstance(bins, int) else list(bins)
+                summaries = [loads(payload) for payload in (yield self._to_all("stats_summary", dumps(
+                    {"edges": edges, "thresholds": list(thresholds)})))]
+
+                if edges is None:
+                    edges = ScoreboardSnapshot.histogram_edges(
+                        bins, min((summary["min"] for summary in summaries if summary["count"]), default=None),
+                        max((summary["max"] for summary in summaries if summary["count"]), default=None))
+                    histograms = yield self._to_all("stats_summary", dumps({"edges": edges, "thresholds": []}))
+                    for summary, payload in zip(summaries, histograms):
+                        summary["histogram"] = loads(payload)["histogram"]
+
+                score_index = yield from self._merged_score_index(wait)
+                result = ScoreboardSnapshot.merged_stats(summaries, edges, percentiles, thresholds, score_index)
+            self.logger.debug("Client Scoreboard stats : {}".format(result))
+
+        else:
+            result = {"error": "Invalid bins, percentiles, thresholds values"}
+
+        return result
+
+    def top_views_stats(self):
+        """
+            Asks the shared Scoreboard for the counters of its pre-serialized hot Top-N responses (see TopViews.stats)
+
+        :return: (dict) The counters. If sharded, (list of dict) the counters of each shard.
+        """
+        if self.mode == SERVER_MODE:
+            result = dumps(self.top_views.stats())
+
+        elif self.mode == CLIENT_MODE:
+            result = [loads(payload) for payload in self._request_all("top_views_stats")]
+            if len(self.shards) == 1:
+                result = result[0]
+
+        else:
+            result = {"error": "Not started"}
+
+        return result
+
+    def wal_stats(self):
+        """
+            Asks the shared Scoreboard for the statistics of its write-ahead log (see WriteAheadLog.stats)
+
+        :return: (dict) The statistics. Empty if the write-ahead log is disabled. If sharded, (list of dict) the
+                    statistics of each shard.
+        """
+        if self.mode == SERVER_MODE:
+            result = dumps(self.wal.stats() if self.wal is not None else {})
+
+        elif self.mode == CLIENT_MODE:
+            result = [loads(payload) for payload in self._request_all("wal_stats")]
+            if len(self.shards) == 1:
+                result = result[0]
+
+        else:
+            result = {"error": "Not started"}
+
+        return result
+
+    def transport_stats(self):
+        """
+            Asks the shared Scoreboard for the statistics of the batches of requests it attends (see
+                TransportServer.stats)
+
+        :return: (dict) The statistics. If sharded, (list of dict) the statistics of each shard.
+        """
+        if self.mode == SERVER_MODE:
+            result = dumps(self.instance.stats())
+
+        elif self.mode == CLIENT_MODE:
+            result = [loads(payload) for payload in self._request_all("transport_stats")]
+            if len(self.shards) == 1:
+                result = result[0]
+
+        else:
+            result = {"error": "Not started"}
+
+        return result
+
+    def metrics(self):
+        """
+            Asks the shared Scoreboard for the metrics of its servers (see render_metrics): the number of requests
+                waiting when the last batch was taken (i.e., the depth of the queue), the service time of each
+                command (see TransportServer), and the number of clients of every Scoreboard.
+
+        :return: (list of dict) The metrics of each shard, as follows:
+
+                    {"queue_depth": <num_requests>, "max_queue_depth": <num_requests>,
+                     "commands": <service time of each command, see Metrics.snapshot>,
+                     "boards": [{"kind": <"main", "window", "closed_window" or "named">, "board": <name>,
+                                 "clients": <num_clients>}, ...]}
+
+                    (str) The JSON metrics of the server, in SERVER_MODE.
+        """
+        if self.mode == SERVER_MODE:
+            boards = [{"kind": "main", "board": "main", "clients": len(self.scoreboard.clients)}]
+            for name, windowed in self.windows.items():
+                boards.append({"kind": "window", "board": name, "clients": len(windowed.get().clients)})
+                if windowed.closed is not None:
+                    boards.append({"kind": "closed_window", "board": name, "clients": len(windowed.closed.clients)})
+            boards.extend({"kind": "named", "board": name, "clients": len(scoreboard.clients)}
+                          for name, scoreboard in self.boards.items())
+
+            result = dumps({"queue_depth": self.instance.last_batch_size,
+                            "max_queue_depth": self.instance.max_batch_size,
+                            "commands": self.instance.metrics.snapshot(), "boards": boards})
+
+        elif self.mode == CLIENT_MODE:
+            result = self._run(self._client_metrics())
+
+        else:
+            result = {"error": "Not started"}
+
+        return result
+
+    async def metrics_async(self):
+        """
+            Asyncio counterpart of metrics (see metrics). Only in CLIENT_MODE.
+
+        :return: (list of dict) The metrics of each shard.
+        """
+        return await self._run_async(self._client_metrics())
+
+    def _client_metrics(self):
+        """
+            Client plan of metrics (see _run).
+        """
+        return [loads(payload) for payload in (yield self._to_all("metrics"))]
+
+    def count_higher(self, score, window="", closed="", board=""):
+        """
+            Returns the number of different scores of the Scoreboard higher than the specified one (see
+                Scoreboard.count_higher). Only in SERVER_MODE (used by the clients of a sharded Scoreboard to merge
+                ranking positions, see Shards).
+
+        :param score: (str) The score.
+        :param window: (str) The name of a time window, to use its Scoreboard instead (see _board).
+        :param closed: (str) Not empty for the last closed window.
+        :param board: (str) The name of a named Scoreboard, to use it instead (see _board).
+        :return: (str) The number of higher scores.
+        """
+        return str(self._board(window, closed, board).count_higher(int(score)))
+
+    def stats_summary(self, query):
+        """
+            Returns the statistics of the scores that add up (see ScoreboardSnapshot.summary). Only in SERVER_MODE (used
+                by the clients of a sharded Scoreboard to merge statistics).
+
+        :param query: (str) The stringified JSON query, as follows:
+
+                    {"edges": [<edge_0>, ... <edge_N>], "thresholds": [<threshold>, ...]}   <- edges may be null
+
+        :return: (str) The stringified JSON summary.
+        """
+        query = loads(query)
+
+        return dumps(ScoreboardSnapshot(self.scoreboard).summary(query["edges"], query["thresholds"]))
@@ -0,0 +1,101 @@
+#!/bin/python3
+
+"""
+    Shards module. Contains all information regarding with a Scoreboard partitioned among several servers
+"""
+
+import heapq
+from itertools import groupby
+
+
+class Shards():
+    """
+        Partitions the clients among several servers (shards), each one keeping the Scoreboard of the clients whose id
+        hashes to it. Updates only travel to the shard that owns the client, so they scale with the number of shards.
+
+        Ranking queries are answered by every shard with its own partial ranking (sorted by score, ties grouped), and
+        the partial rankings are k-way merged: each one is consumed in order, and consecutive rows with the same score
+        (regardless of their shard) share a single ranking position, same as in Scoreboard.top.
+
+        The merged ranking position of a score is 1 plus the number of different higher scores of each shard, added up
+        (i.e., a higher score kept by several shards counts once per shard). So it is computed from a single count of
+        each shard (see Scoreboard.count_higher, O(log N)), instead of merging the higher scores themselves. With a
+        single shard, it is the same ranking position as in Scoreboard.rank.
+
+        IMPLEMENTATION NOTE: Tied clients of different shards are sorted by shard (there is no global arrival order).
+    """
+    def __init__(self, num_shards=1):
+        self.num_shards = num_shards
+
+    def __len__(self):
+        return self.num_shards
+
+    def of(self, client_id):
+        """
+            Returns the shard that owns the specified client.
+
+        :param client_id: (int) The id of the client.
+        :return: (int) The shard, from 0 to num_shards - 1.
+        """
+        return client_id % self.num_shards
+
+    def split(self, client_info_list):
+        """
+            Splits the specified client infos among the shards that own them, keeping their order within each shard.
+
+        :param client_info_list: (list of dict) Valid client infos (see ScoreboardWrapper.is_valid_info).
+        :return: (list of list of int) The indexes of the client infos owned by each shard, in the same order.
+        """
+        result = [[] for _ in range(self.num_shards)]
+
+        for index, client_info in enumerate(client_info_list):
+            result[self.of(client_info["user"])].append(index)
+
+        return result
+
+    @staticmethod
+    def merge(rankings, first_position, last_position):
+        """
+            Merges the specified partial rankings, and returns the rows that occupy the specified range of ranking
+                positions, both included.
+
+            Each partial ranking must include, at least, its own last_position higher ranking positions (i.e., the
+            result of top(last_position) in its shard), since any of them may be one of the merged ones.
+
+        :param rankings: (list of list of dict) The partial ranking of each shard, as follows:
+
+                    [{"user": <client_id>, "total": <total_score>}, ...]   <- Sorted by total, higher first
+
+        :param first_position: (int) Highest ranking position to retrieve. Must be a positive value.
+        :param last_position: (int) Lowest ranking position to retrieve.
+        :return: (list of dict) The rows that occupy the specified ranking positions.
+        """
+        result = []
+
+        num_higher_scores = 0  # Different higher scores of each shard, added up (see count_scores)
+        merged_rows = heapq.merge(*[[(shard, row) for row in ranking] for shard, ranking in enumerate(rankings)],
+                                  key=lambda item: item[1]["total"], reverse=True)
+
+        for _, items in groupby(merged_rows, key=lambda item: item[1]["total"]):
+            position = num_higher_scores + 1
+
+            if position > last_position:
+                break
+
+            items = list(items)
+            if position >= first_position:
+                result.extend(row for _, row in items)
+            num_higher_scores += len({shard for shard, _ in items})
+
+        return result
+
+    @staticmethod
+    def count_scores(score_lists):
+        """
+            Returns the number of ranking positions taken by the specified different scores of each shard once merged
+                (i.e., a score kept by several shards counts once per shard, see class description).
+
+        :param score_lists: (list of list of int) The different scores of each shard.
+        :return: (int)
+        """
+        return sum(len(set(scores)) for scores in score_lists)
@@ -0,0 +1,91 @@
+#!/bin/python3
+
+"""
+    Snapshot module. Contains all information regarding with the compact binary snapshots of a Scoreboard
+"""
+
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from analytics import ScoreboardSnapshot
+
+
+class Snapshot():
+    """
+        Compact binary snapshot of a Scoreboard, stored in a local file. The file holds the sequence number of the last
+        write-ahead log record covered by the snapshot, followed by the ids and the scores of all the clients as two
+        contiguous columns of little-endian 64 bits integers, sorted by score (ties in arrival order):
+
+                <magic (8 bytes)><seq (uint64)><num_clients (uint64)><ids (int64 * N)><scores (int64 * N)>
+
+        The file is written to a temporary path and then atomically renamed, so a crash while writing never corrupts
+        the previous snapshot. It is loaded through a memory map, so the columns are read without intermediate copies,
+        and the Scoreboard is bulk built from them (see Scoreboard.load).
+    """
+    MAGIC = b"SCRBSNP1"
+    HEADER = struct.Struct("<8sQQ")
+    DTYPE = np.dtype("<i8")
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        """
+            True if the snapshot file exists.
+
+        :return: (bool)
+        """
+        return os.path.exists(self.path)
+
+    def write(self, scoreboard, seq):
+        """
+            Writes a snapshot of the specified Scoreboard, replacing the previous one.
+
+        :param scoreboard: (Scoreboard) The Scoreboard.
+        :param seq: (int) Sequence number of the last write-ahead log record applied to the Scoreboard.
+        :return: None
+        """
+        columns = ScoreboardSnapshot(scoreboard, with_ids=True)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "wb") as snapshot_file:
+            snapshot_file.write(self.HEADER.pack(self.MAGIC, seq, len(columns)))
+            snapshot_file.write(columns.ids.astype(self.DTYPE, copy=False).tobytes())
+            snapshot_file.write(columns.scores.astype(self.DTYPE, copy=False).tobytes())
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+
+        os.replace(temporary_path, self.path)
+
+    def load(self, scoreboard):
+        """
+            Replaces the info of the specified Scoreboard with the one of the snapshot.
+
+        :param scoreboard: (Scoreboard) The Scoreboard.
+        :return: (int) Sequence number of the last write-ahead log record covered by the snapshot.
+        :raises: (ValueError) If the file is not a valid snapshot.
+        """
+        with open(self.path, "rb") as snapshot_file:
+            with mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as snapshot_map:
+                magic, seq, num_clients = self.HEADER.unpack_from(snapshot_map)
+
+                if magic != self.MAGIC or len(snapshot_map) != self.HEADER.size + 2 * num_clients * self.DTYPE.itemsize:
+                    raise ValueError("Invalid snapshot {}".format(self.path))
+
+                ids = np.frombuffer(snapshot_map, dtype=self.DTYPE, count=num_clients, offset=self.HEADER.size)
+                scores = np.frombuffer(snapshot_map, dtype=self.DTYPE, count=num_clients,
+                                       offset=self.HEADER.size + num_clients * self.DTYPE.itemsize)
+
+                scoreboard.load(ids.tolist(), scores.tolist())
+
+                # Release the views of the memory map before closing it
+                del ids, scores
+
+        return seq
@@ -0,0 +1,85 @@
+import os
+import unittest
+
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from analytics import ScoreboardSnapshot
+from score_index import ScoreIndex
+from scoreboard import Scoreboard
+
+
+class TestScoreboardSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.client_id_list = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+        self.client_score_list = [100, 200, 150, 350, 225, 155, 60, 415, 190, 200]
+
+        self.scoreboard = Scoreboard()
+        for ptr in range(len(self.client_id_list)):
+            self.scoreboard.update({"user": self.client_id_list[ptr], "total": self.client_score_list[ptr]})
+
+    def test_snapshot_creation_ok(self):
+
+        # Test main
+        snapshot = ScoreboardSnapshot(self.scoreboard, with_ids=True)
+
+        # Check results (ascending scores, ties sorted by arrival)
+        self.assertEqual(len(snapshot), len(self.client_id_list))
+        self.assertEqual(snapshot.scores.tolist(), sorted(self.client_score_list))
+        self.assertEqual(snapshot.ids.tolist(), [7, 1, 3, 6, 9, 2, 10, 5, 4, 8])
+
+    def test_snapshot_stats_ok(self):
+
+        snapshot = ScoreboardSnapshot(self.scoreboard)
+
+        # Test main
+        stats = snapshot.stats(bins=[0, 100, 200, 500], percentiles=[0, 50, 100], thresholds=[0, 200, 415])
+
+        # Check results
+        self.assertEqual(stats["count"], 10)
+        self.assertEqual(stats["min"], 60)
+        self.assertEqual(stats["max"], 415)
+        self.assertAlmostEqual(stats["mean"], sum(self.client_score_list) / 10)
+        self.assertEqual(stats["median"], 195.0)
+        self.assertEqual(stats["histogram"], {"counts": [1, 4, 5], "edges": [0, 100, 200, 500]})
+        self.assertEqual(stats["percentiles"], {"0": 60.0, "50": 195.0, "100": 415.0})
+        self.assertEqual(stats["above"], {"0": 10, "200": 3, "415": 0})
+
+    def test_empty_snapshot_stats_ok(self):
+
+        # Test main
+        stats = ScoreboardSnapshot(Scoreboard()).stats(bins=2, percentiles=[50], thresholds=[10])
+
+        # Check results
+        self.assertEqual(stats["count"], 0)
+        self.assertEqual(stats["mean"], None)
+        self.assertEqual(stats["histogram"]["counts"], [0, 0])
+        self.assertEqual(stats["percentiles"], {"50": None})
+        self.assertEqual(stats["above"], {"10": 0})
+
+    def test_merged_stats_ok(self):
+
+        # The clients split into two Scoreboards (e.g., shards), and their merged score distribution
+        scoreboards = [Scoreboard(), Scoreboard()]
+        for client_id, score in zip(self.client_id_list, self.client_score_list):
+            scoreboards[client_id % 2].update({"user": client_id, "total": score})
+        score_index = ScoreIndex(0, 1000, 100)
+        score_index.load(self.client_score_list)
+
+        # Test main (equal-width bins between the merged min and max scores)
+        summaries = [ScoreboardSnapshot(scoreboard).summary(thresholds=[0, 200]) for scoreboard in scoreboards]
+        edges = ScoreboardSnapshot.histogram_edges(4, min(summary["min"] for summary in summaries),
+                                                   max(summary["max"] for summary in summaries))
+        for summary, scoreboard in zip(summaries, scoreboards):
+            summary["histogram"] = ScoreboardSnapshot(scoreboard).summary(edges)["histogram"]
+        stats = ScoreboardSnapshot.merged_stats(summaries, edges, [0, 100], [0, 200], score_index)
+
+        # Check results (same as the stats of the whole Scoreboard, but the percentiles, estimated within a bucket)
+        expected = ScoreboardSnapshot(self.scoreboard).stats(bins=4, thresholds=[0, 200])
+        self.assertEqual({key: stats[key] for key in ["count", "min", "max", "histogram", "above"]},
+                         {key: expected[key] for key in ["count", "min", "max", "histogram", "above"]})
+        self.assertAlmostEqual(stats["mean"], expected["mean"])
+        self.assertEqual(stats["median"], 190.0)
+        self.assertEqual(stats["percentiles"], {"0": 60.0, "100": 410.0})
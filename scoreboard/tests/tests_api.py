@@ -9,6 +9,7 @@ os.environ['PATH'] += ':'+path
 
 from api import get_api
 from scoreboard_wrapper import ScoreboardWrapper
+from transport import TransportError
 
 
 class TestApi(unittest.TestCase):
@@ -36,7 +37,7 @@ class TestApi(unittest.TestCase):
 
         top_size = 100
         expected_top = [{"user": 123, "total": 250}, {"user": 456, "total": 200}, {"user": 789, "total": 100}]
-        self.scoreboard_wrapper.top = MagicMock(return_value=expected_top)
+        self.scoreboard_wrapper.top = MagicMock(return_value=dumps(expected_top).encode())
 
         # Test main
         response = self.client.get('/top/{}'.format(top_size))
@@ -45,14 +46,14 @@ class TestApi(unittest.TestCase):
         body = response.data.decode('utf8')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(loads(body), expected_top)
-        self.scoreboard_wrapper.top.assert_called_with(top_size)
+        self.scoreboard_wrapper.top.assert_called_with(top_size, encoded=True)
 
     def test_relative_top_ok(self):
 
         ranking_position = 2
         scope_size = 1
         expected_top = [{"user": 123, "total": 250}, {"user": 456, "total": 200}, {"user": 789, "total": 100}]
-        self.scoreboard_wrapper.relative_top = MagicMock(return_value=expected_top)
+        self.scoreboard_wrapper.relative_top = MagicMock(return_value=dumps(expected_top).encode())
 
         # Test main
         response = self.client.get('/top/{}/{}'.format(ranking_position, scope_size))
@@ -61,4 +62,172 @@ class TestApi(unittest.TestCase):
         body = response.data.decode('utf8')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(loads(body), expected_top)
-        self.scoreboard_wrapper.relative_top.assert_called_with(ranking_position, scope_size)
+        self.scoreboard_wrapper.relative_top.assert_called_with(ranking_position, scope_size, encoded=True)
+
+    def test_around_ok(self):
+
+        expected_around = [{"user": 456, "total": 200}, {"user": 123, "total": 100}]
+        self.scoreboard_wrapper.around = MagicMock(return_value=dumps(expected_around).encode())
+
+        # Test main
+        response = self.client.get('/around/123/1')
+
+        # Check results
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(loads(response.data.decode('utf8')), expected_around)
+        self.scoreboard_wrapper.around.assert_called_with(123, 1, encoded=True)
+
+    def test_percentile_and_score_at_ok_and_wrong(self):
+
+        expected_percentile = {"user": 123, "total": 250, "percentile": 75.0, "top": 25.0}
+        expected_score_at = {"percentile": 99.9, "score": 1024}
+        self.scoreboard_wrapper.percentile = MagicMock(return_value=expected_percentile)
+        self.scoreboard_wrapper.score_at = MagicMock(return_value=expected_score_at)
+
+        # Test main
+        percentile_response = self.client.get('/percentile/123')
+        score_at_response = self.client.get('/score_at/99.9')
+        wrong_response = self.client.get('/score_at/high')
+
+        # Check results
+        self.assertEqual(loads(percentile_response.data.decode('utf8')), expected_percentile)
+        self.assertEqual(loads(score_at_response.data.decode('utf8')), expected_score_at)
+        self.assertEqual(loads(wrong_response.data.decode('utf8')), {"error": "Invalid percentile"})
+        self.scoreboard_wrapper.percentile.assert_called_with(123)
+        self.scoreboard_wrapper.score_at.assert_called_once_with(99.9)
+
+    def test_rank_ok(self):
+
+        user = 123
+        expected_rank = {"user": user, "total": 250, "position": 2}
+        self.scoreboard_wrapper.rank = MagicMock(return_value=expected_rank)
+
+        # Test main
+        response = self.client.get('/rank/{}'.format(user))
+
+        # Check results
+        body = response.data.decode('utf8')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(loads(body), expected_rank)
+        self.scoreboard_wrapper.rank.assert_called_with(user)
+
+    def test_ranking_ok_and_wrong(self):
+
+        expected_page = {"ranking": [{"user": 456, "total": 200}, {"user": 789, "total": 100}], "next": "100:789"}
+        self.scoreboard_wrapper.ranking = MagicMock(return_value=expected_page)
+
+        # Test main
+        response = self.client.get('/ranking?after=250:123&limit=2')
+        first_response = self.client.get('/ranking')
+        wrong_response = self.client.get('/ranking?limit=two')
+
+        # Check results
+        body = response.data.decode('utf8')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(loads(body), expected_page)
+        self.assertEqual(first_response.status_code, 200)
+        self.assertEqual(self.scoreboard_wrapper.ranking.call_args_list[0].args, (2, "250:123"))
+        self.assertEqual(self.scoreboard_wrapper.ranking.call_args_list[1].args, (100, None))
+        self.assertEqual(loads(wrong_response.data.decode('utf8')), {"error": "Invalid after, limit values"})
+
+    def test_window_top_and_rank_ok(self):
+
+        expected_top = [{"user": 123, "total": 250}]
+        expected_rank = {"user": 123, "total": 250, "position": 1}
+        self.scoreboard_wrapper.window_top = MagicMock(return_value=expected_top)
+        self.scoreboard_wrapper.window_rank = MagicMock(return_value=expected_rank)
+
+        # Test main
+        top_response = self.client.get('/windows/daily/top/10')
+        rank_response = self.client.get('/windows/weekly/rank/123?closed=1')
+
+        # Check results
+        self.assertEqual(loads(top_response.data.decode('utf8')), expected_top)
+        self.assertEqual(loads(rank_response.data.decode('utf8')), expected_rank)
+        self.scoreboard_wrapper.window_top.assert_called_with("daily", 10, False)
+        self.scoreboard_wrapper.window_rank.assert_called_with("weekly", 123, True)
+
+    def test_board_score_and_top_ok(self):
+
+        client_msg = {"user": 123, "total": 250}
+        self.scoreboard_wrapper.board_update = MagicMock(return_value=client_msg)
+        self.scoreboard_wrapper.board_top = MagicMock(return_value=[client_msg])
+
+        # Test main
+        score_response = self.client.put('/boards/ctf/score', data=dumps(client_msg), content_type='application/json')
+        top_response = self.client.get('/boards/ctf/top/10')
+
+        # Check results
+        self.assertEqual(loads(score_response.data.decode('utf8')), client_msg)
+        self.assertEqual(loads(top_response.data.decode('utf8')), [client_msg])
+        self.scoreboard_wrapper.board_update.assert_called_with("ctf", client_msg)
+        self.scoreboard_wrapper.board_top.assert_called_with("ctf", 10)
+
+    def test_scores_ok(self):
+
+        client_msg_list = [{"user": 123, "total": 250}, {"user": 456, "score": "+10"}]
+        expected_result = [{"user": 123, "total": 250}, {"user": 456, "total": 10}]
+        self.scoreboard_wrapper.update_many = MagicMock(return_value=expected_result)
+
+        # Test main
+        response = self.client.put('/scores', data=dumps(client_msg_list), content_type='application/json')
+
+        # Check results
+        body = response.data.decode('utf8')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(loads(body), expected_result)
+        self.scoreboard_wrapper.update_many.assert_called_with(client_msg_list)
+
+    def test_metrics_ok(self):
+
+        server_metrics = {"queue_depth": 2, "max_queue_depth": 7, "commands": {"buckets": [0.001], "series": {
+            "top": {"count": 3, "sum": 0.0015, "buckets": [2, 3], "in_flight": 0}}},
+            "boards": [{"kind": "main", "board": "main", "clients": 42}]}
+        self.scoreboard_wrapper.top = MagicMock(return_value=b"[]")
+        self.scoreboard_wrapper.metrics = MagicMock(return_value=[server_metrics])
+
+        # Test main
+        self.client.get('/top/10')
+        response = self.client.get('/metrics')
+
+        # Check results (both the metrics of the client and the ones of the server)
+        lines = response.data.decode('utf8').splitlines()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, "text/plain; version=0.0.4")
+        self.assertIn('scoreboard_http_requests_total{endpoint="top"} 1', lines)
+        self.assertIn('scoreboard_http_requests_in_flight{endpoint="metrics"} 1', lines)
+        self.assertIn('scoreboard_http_request_duration_seconds_bucket{endpoint="top",le="+Inf"} 1', lines)
+        self.assertIn('scoreboard_servers_up 1', lines)
+        self.assertIn('scoreboard_server_queue_depth{shard="0"} 2', lines)
+        self.assertIn('scoreboard_server_command_duration_seconds_bucket{shard="0",command="top",le="0.001"} 2', lines)
+        self.assertIn('scoreboard_board_clients{shard="0",kind="main",board="main"} 42', lines)
+
+    def test_metrics_without_servers_ok(self):
+
+        self.scoreboard_wrapper.metrics = MagicMock(side_effect=TransportError("timeout"))
+
+        # Test main
+        response = self.client.get('/metrics')
+
+        # Check results
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('scoreboard_servers_up 0', response.data.decode('utf8').splitlines())
+
+    def test_stats_ok_and_wrong(self):
+
+        expected_stats = {"count": 3, "min": 100, "max": 250, "mean": 183.3, "median": 200.0,
+                          "histogram": {"counts": [1, 2], "edges": [0, 150, 300]},
+                          "percentiles": {"99.9": 249.9}, "above": {"100": 2}}
+        self.scoreboard_wrapper.stats = MagicMock(return_value=expected_stats)
+
+        # Test main
+        response = self.client.get('/stats?bins=0,150,300&percentiles=99.9&thresholds=100')
+        wrong_response = self.client.get('/stats?bins=ten')
+
+        # Check results
+        body = response.data.decode('utf8')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(loads(body), expected_stats)
+        self.scoreboard_wrapper.stats.assert_called_once_with([0, 150, 300], [99.9], [100])
+        self.assertEqual(loads(wrong_response.data.decode('utf8')),
+                         {"error": "Invalid bins, percentiles, thresholds values"})
@@ -1,4 +1,6 @@
 import os
+import shutil
+import tempfile
 import unittest
 from json import dumps, loads
 from multiprocessing import Process
@@ -19,7 +21,9 @@ class TestApp(unittest.TestCase):
         # Setup a real server
         #
         DEBUG_MODE = True
-        cls.server_app = Process(target=start_scoreboard_server, args=(DEFAULT_PORT, DEFAULT_IP, not DEBUG_MODE))
+        cls.wal_dir = tempfile.mkdtemp()
+        cls.server_app = Process(target=start_scoreboard_server, args=(DEFAULT_PORT, DEFAULT_IP, not DEBUG_MODE,
+                                                                       cls.wal_dir))
         cls.server_app.start()
 
         #
@@ -30,6 +34,7 @@ class TestApp(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         cls.server_app.terminate()
+        shutil.rmtree(cls.wal_dir)
 
     def setUp(self):
         self.client = self.client_app.test_client()
@@ -90,3 +95,36 @@ class TestApp(unittest.TestCase):
         body = response.data.decode('utf8')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(loads(body), expected_top)
+
+    def test_rank_ok(self):
+
+        expected_top = [{"user": 123, "total": 250}, {"user": 456, "total": 200}, {"user": 789, "total": 100}]
+
+        #
+        # Prepopulate according to expected
+        #
+        for user_msg in expected_top:
+            response = self.client.put('/score', data=dumps(user_msg), content_type='application/json')
+
+            self.assertEqual(response.status_code, 200)
+
+        # Test main
+        response = self.client.get('/rank/{}'.format(456))
+
+        # Check results
+        body = response.data.decode('utf8')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(loads(body), {"user": 456, "total": 200, "position": 2})
+
+    def test_scores_ok(self):
+
+        client_msg_list = [{"user": 123, "total": 250}, {"user": 456, "score": "+10"}, {"user": 789}]
+        expected_result = [{"user": 123, "total": 250}, {"user": 456, "total": 10}, {"error": "Invalid client info"}]
+
+        # Test main
+        response = self.client.put('/scores', data=dumps(client_msg_list), content_type='application/json')
+
+        # Check results
+        body = response.data.decode('utf8')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(loads(body), expected_result)
@@ -0,0 +1,200 @@
+import asyncio
+import os
+import unittest
+from json import dumps, loads
+from unittest.mock import AsyncMock
+
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from async_api import get_async_api
+from scoreboard_wrapper import ScoreboardWrapper
+
+
+class TestAsyncApi(unittest.TestCase):
+
+    def setUp(self):
+        self.scoreboard_wrapper = ScoreboardWrapper()
+        self.api = get_async_api(self.scoreboard_wrapper)
+        self.maxDiff = None
+
+    def request(self, method, target, body=b""):
+        return asyncio.run(self.api.handle(method, target, body))
+
+    def test_score_ok(self):
+
+        client_msg = {"user": 123, "total": 250}
+        self.scoreboard_wrapper.update_async = AsyncMock(return_value=client_msg)
+
+        # Test main
+        status, body = self.request("PUT", "/score", dumps(client_msg).encode())
+
+        # Check results
+        self.assertEqual(status, 200)
+        self.assertEqual(loads(body), client_msg)
+        self.scoreboard_wrapper.update_async.assert_awaited_with(client_msg)
+
+    def test_top_and_relative_top_ok(self):
+
+        expected_top = [{"user": 123, "total": 250}, {"user": 456, "total": 200}, {"user": 789, "total": 100}]
+        self.scoreboard_wrapper.top_async = AsyncMock(return_value=dumps(expected_top).encode())
+        self.scoreboard_wrapper.relative_top_async = AsyncMock(return_value=dumps(expected_top).encode())
+
+        # Test main
+        top_status, top_body = self.request("GET", "/top/100")
+        relative_status, relative_body = self.request("GET", "/top/2/1")
+
+        # Check results
+        self.assertEqual((top_status, loads(top_body)), (200, expected_top))
+        self.assertEqual((relative_status, loads(relative_body)), (200, expected_top))
+        self.scoreboard_wrapper.top_async.assert_awaited_with(100, encoded=True)
+        self.scoreboard_wrapper.relative_top_async.assert_awaited_with(2, 1, encoded=True)
+
+    def test_around_ok(self):
+
+        expected_around = [{"user": 456, "total": 200}, {"user": 123, "total": 100}]
+        self.scoreboard_wrapper.around_async = AsyncMock(return_value=dumps(expected_around).encode())
+
+        # Test main
+        status, body = self.request("GET", "/around/123/1")
+
+        # Check results
+        self.assertEqual((status, loads(body)), (200, expected_around))
+        self.scoreboard_wrapper.around_async.assert_awaited_once_with(123, 1, encoded=True)
+
+    def test_percentile_and_score_at_ok_and_wrong(self):
+
+        expected_percentile = {"user": 123, "total": 250, "percentile": 75.0, "top": 25.0}
+        expected_score_at = {"percentile": 99.9, "score": 1024}
+        self.scoreboard_wrapper.percentile_async = AsyncMock(return_value=expected_percentile)
+        self.scoreboard_wrapper.score_at_async = AsyncMock(return_value=expected_score_at)
+
+        # Test main
+        percentile_status, percentile_body = self.request("GET", "/percentile/123")
+        score_at_status, score_at_body = self.request("GET", "/score_at/99.9")
+        wrong_status, wrong_body = self.request("GET", "/score_at/high")
+
+        # Check results
+        self.assertEqual((percentile_status, loads(percentile_body)), (200, expected_percentile))
+        self.assertEqual((score_at_status, loads(score_at_body)), (200, expected_score_at))
+        self.assertEqual((wrong_status, loads(wrong_body)), (200, {"error": "Invalid percentile"}))
+        self.scoreboard_wrapper.percentile_async.assert_awaited_once_with(123)
+        self.scoreboard_wrapper.score_at_async.assert_awaited_once_with(99.9)
+
+    def test_metrics_ok(self):
+
+        self.scoreboard_wrapper.rank_async = AsyncMock(return_value={"error": "Unknown user"})
+        self.scoreboard_wrapper.metrics_async = AsyncMock(return_value=[
+            {"queue_depth": 1, "max_queue_depth": 3, "commands": {"buckets": [0.001], "series": {}},
+             "boards": [{"kind": "named", "board": "arena", "clients": 5}]}])
+
+        # Test main
+        self.request("GET", "/rank/123")
+        status, body = self.request("GET", "/metrics")
+
+        # Check results (both the metrics of the client and the ones of the server)
+        lines = body.splitlines()
+        self.assertEqual(status, 200)
+        self.assertIn('scoreboard_http_requests_total{endpoint="rank"} 1', lines)
+        self.assertIn('scoreboard_http_requests_in_flight{endpoint="rank"} 0', lines)
+        self.assertIn('scoreboard_server_max_queue_depth{shard="0"} 3', lines)
+        self.assertIn('scoreboard_board_clients{shard="0",kind="named",board="arena"} 5', lines)
+
+    def test_stats_ok_and_wrong(self):
+
+        expected_stats = {"count": 3, "min": 100, "max": 250}
+        self.scoreboard_wrapper.stats_async = AsyncMock(return_value=expected_stats)
+
+        # Test main
+        status, body = self.request("GET", "/stats?bins=0,150,300&percentiles=99.9&thresholds=100")
+        wrong_status, wrong_body = self.request("GET", "/stats?bins=ten")
+
+        # Check results
+        self.assertEqual((status, loads(body)), (200, expected_stats))
+        self.scoreboard_wrapper.stats_async.assert_awaited_once_with([0, 150, 300], [99.9], [100])
+        self.assertEqual((wrong_status, loads(wrong_body)),
+                         (200, {"error": "Invalid bins, percentiles, thresholds values"}))
+
+    def test_ranking_ok(self):
+
+        expected_page = {"ranking": [{"user": 456, "total": 200}], "next": "200:456"}
+        self.scoreboard_wrapper.ranking_async = AsyncMock(return_value=expected_page)
+
+        # Test main
+        status, body = self.request("GET", "/ranking?after=250:123&limit=1")
+
+        # Check results
+        self.assertEqual((status, loads(body)), (200, expected_page))
+        self.scoreboard_wrapper.ranking_async.assert_awaited_once_with(1, "250:123")
+
+    def test_window_top_ok(self):
+
+        expected_top = [{"user": 123, "total": 250}]
+        self.scoreboard_wrapper.window_top_async = AsyncMock(return_value=expected_top)
+
+        # Test main
+        status, body = self.request("GET", "/windows/daily/top/10?closed=true")
+
+        # Check results (the name of the window is kept as is)
+        self.assertEqual((status, loads(body)), (200, expected_top))
+        self.scoreboard_wrapper.window_top_async.assert_awaited_once_with("daily", 10, True)
+
+    def test_board_scores_and_rank_ok(self):
+
+        client_msg_list = [{"user": 123, "total": 250}]
+        expected_rank = {"user": 123, "total": 250, "position": 1}
+        self.scoreboard_wrapper.board_update_many_async = AsyncMock(return_value=client_msg_list)
+        self.scoreboard_wrapper.board_rank_async = AsyncMock(return_value=expected_rank)
+
+        # Test main
+        scores_status, scores_body = self.request("PUT", "/boards/ctf/scores", dumps(client_msg_list).encode())
+        rank_status, rank_body = self.request("GET", "/boards/ctf/rank/123")
+
+        # Check results
+        self.assertEqual((scores_status, loads(scores_body)), (200, client_msg_list))
+        self.assertEqual((rank_status, loads(rank_body)), (200, expected_rank))
+        self.scoreboard_wrapper.board_update_many_async.assert_awaited_once_with("ctf", client_msg_list)
+        self.scoreboard_wrapper.board_rank_async.assert_awaited_once_with("ctf", 123)
+
+    def test_request_wrong(self):
+
+        # Test main / Check results
+        self.assertEqual(self.request("GET", "/unknown")[0], 404)
+        self.assertEqual(self.request("GET", "/score")[0], 405)
+        self.assertEqual(self.request("GET", "/top/ten")[0], 404)
+        self.assertEqual(self.request("PUT", "/score", b"{not json")[0], 400)
+
+    def test_keep_alive_ok(self):
+
+        expected_rank = {"user": 123, "total": 250, "position": 1}
+        self.scoreboard_wrapper.rank_async = AsyncMock(return_value=expected_rank)
+
+        async def two_requests_on_one_connection():
+            server = await asyncio.start_server(self.api.handle_connection, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+
+            async with server:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                responses = []
+                for _ in range(2):
+                    writer.write(b"GET /rank/123 HTTP/1.1\r\nHost: localhost\r\n\r\n")
+                    status_line = await reader.readline()
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line == b"\r\n":
+                            break
+                        name, _, value = line.decode().partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                    body = await reader.readexactly(int(headers["content-length"]))
+                    responses.append((status_line, "connection" in headers, loads(body)))
+                writer.close()
+
+            return responses
+
+        # Test main
+        responses = asyncio.run(two_requests_on_one_connection())
+
+        # Check results (both answered on the same connection)
+        self.assertEqual(responses, [(b"HTTP/1.1 200 OK\r\n", False, expected_rank)] * 2)
@@ -0,0 +1,108 @@
+import os
+import unittest
+
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from bucket import Bucket
+from client import Client
+
+
+class TestBucket(unittest.TestCase):
+
+    def test_bucket_creation_ok(self):
+
+        # Test main
+        bucket = Bucket()
+
+        # Check results
+        self.assertEqual(len(bucket), 0)
+        self.assertEqual(list(bucket), [])
+
+    def test_bucket_append_ok(self):
+
+        client_id_list = [3, 1, 2]
+
+        # Test main
+        bucket = Bucket()
+        for client_id in client_id_list:
+            bucket.append(Client(client_id))
+
+        # Check results (arrival order)
+        self.assertEqual(len(bucket), len(client_id_list))
+        self.assertEqual([client.id for client in bucket], client_id_list)
+
+    def test_bucket_remove_ok(self):
+
+        client_id_list = [1, 2, 3, 4, 5]
+
+        #
+        # (<removed_client_id>, <expected_client_id_list>)
+        #
+        scenario_list = [
+            (3, [1, 2, 4, 5]),  # Middle
+            (1, [2, 4, 5]),     # Head
+            (5, [2, 4]),        # Tail
+            (2, [4]),
+            (4, [])             # The only one
+        ]
+
+        bucket = Bucket()
+        clients = {}
+        for client_id in client_id_list:
+            clients[client_id] = Client(client_id)
+            bucket.append(clients[client_id])
+
+        for removed_client_id, expected_client_id_list in scenario_list:
+
+            # Test main
+            bucket.remove(clients[removed_client_id])
+
+            # Check results
+            self.assertEqual(len(bucket), len(expected_client_id_list))
+            self.assertEqual([client.id for client in bucket], expected_client_id_list)
+
+        bucket.append(clients[3])
+        self.assertEqual([client.id for client in bucket], [3])
+
+    def test_bucket_remove_tied_client_ok(self):
+
+        # Same score, different clients (Client equality compares scores)
+        client_list = [Client(1), Client(2), Client(3)]
+        self.assertEqual(client_list[0], client_list[2])
+
+        bucket = Bucket()
+        for client in client_list:
+            bucket.append(client)
+
+        # Test main
+        bucket.remove(client_list[2])
+
+        # Check results
+        self.assertEqual([client.id for client in bucket], [1, 2])
+
+    def test_bucket_group_ok(self):
+
+        client_score_list = [(1, 10), (2, 10), (3, 20), (4, 30), (5, 30), (6, 30)]
+
+        client_list = []
+        for client_id, score in client_score_list:
+            client = Client(client_id)
+            client.score = score
+            client_list.append(client)
+
+        # Test main
+        result = Bucket.group(client_list)
+
+        # Check results
+        self.assertEqual([score for score, _ in result], [10, 20, 30])
+        self.assertEqual([[client.id for client in bucket] for _, bucket in result], [[1, 2], [3], [4, 5, 6]])
+        self.assertEqual([len(bucket) for _, bucket in result], [2, 1, 3])
+
+        # Still removable
+        result[2][1].remove(client_list[5])
+        result[2][1].append(client_list[5])
+        result[2][1].remove(client_list[3])
+        self.assertEqual([client.id for client in result[2][1]], [5, 6])
+        self.assertEqual(Bucket.group([]), [])
@@ -91,3 +91,43 @@ class TestClient(unittest.TestCase):
 
         for ptr in range(len(sorted_client_list)):
             self.assertEqual(sorted_client_list[ptr].id, expected_sorted_id_list[ptr])
+
+    def test_client_compact_layout_ok(self):
+
+        # Test main
+        client = Client(983)
+
+        # Check results (no per instance __dict__)
+        self.assertFalse(hasattr(client, "__dict__"))
+        with self.assertRaises(AttributeError):
+            client.nickname = "player"
+
+    def test_client_out_of_range_wrong(self):
+
+        client = Client(984)
+        client.total(2**63 - 10)
+
+        # Test main
+        total_success = client.total(2**63)
+        relative_success = client.relative("+10")
+
+        # Check results (scores must fit in 64 bits)
+        self.assertEqual(total_success, False)
+        self.assertEqual(relative_success, False)
+        self.assertEqual(client.score, 2**63 - 10)
+
+    def test_client_encoded_ok(self):
+
+        client = Client(985)
+        client.total(250)
+
+        # Test main
+        encoded = client.encoded()
+        same_encoded = client.encoded()
+        client.relative("+10")
+        modified_encoded = client.encoded()
+
+        # Check results (built once per score)
+        self.assertEqual(encoded, b'{"user": 985, "total": 250}')
+        self.assertIs(same_encoded, encoded)
+        self.assertEqual(modified_encoded, b'{"user": 985, "total": 260}')
@@ -0,0 +1,53 @@
+import os
+import unittest
+
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from metrics import Metrics, render_metrics
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics(buckets=[0.001, 0.01])
+
+    def test_observe_and_snapshot_ok(self):
+
+        # Test main
+        start = self.metrics.start("top")
+        in_flight = self.metrics.snapshot()["series"]["top"]["in_flight"]
+        self.metrics.finish("top", start)
+        self.metrics.observe("update", 0.005, count=3)
+        self.metrics.observe("update", 0.5)
+
+        # Check results (cumulative buckets, the last one +Inf)
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(in_flight, 1)
+        self.assertEqual(snapshot["buckets"], [0.001, 0.01])
+        self.assertEqual(snapshot["series"]["top"]["in_flight"], 0)
+        self.assertEqual(snapshot["series"]["top"]["count"], 1)
+        self.assertEqual(snapshot["series"]["update"]["buckets"], [0, 3, 4])
+        self.assertAlmostEqual(snapshot["series"]["update"]["sum"], 0.515)
+
+    def test_render_metrics_ok(self):
+
+        self.metrics.observe("top", 0.002)
+
+        # Test main
+        lines = render_metrics(self.metrics.snapshot(), None).splitlines()
+
+        # Check results
+        self.assertIn("# TYPE scoreboard_http_request_duration_seconds histogram", lines)
+        self.assertEqual([line for line in lines if line.startswith("scoreboard_http_request_duration_seconds")],
+                         ['scoreboard_http_request_duration_seconds_bucket{endpoint="top",le="0.001"} 0',
+                          'scoreboard_http_request_duration_seconds_bucket{endpoint="top",le="0.01"} 1',
+                          'scoreboard_http_request_duration_seconds_bucket{endpoint="top",le="+Inf"} 1',
+                          'scoreboard_http_request_duration_seconds_sum{endpoint="top"} 0.002',
+                          'scoreboard_http_request_duration_seconds_count{endpoint="top"} 1'])
+        self.assertIn("scoreboard_servers_up 0", lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import threading
+import unittest
+
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from replication import Replica, UpdatePublisher
+from scoreboard import Scoreboard
+
+
+class TestReplication(unittest.TestCase):
+
+    def setUp(self):
+        # A publisher that is not listening (only used to take snapshots)
+        self.scoreboard = Scoreboard()
+        self.scoreboard.update_many([{"user": 1, "total": 100}, {"user": 2, "total": 200}, {"user": 3, "total": 100}])
+        self.publisher = UpdatePublisher("inproc://test")
+
+        self.replica = Replica("inproc://test", lambda: self.publisher.snapshot(self.scoreboard))
+        self.replica.resync()
+
+    def test_resync_ok(self):
+
+        # Test main
+        result = self.replica.read(lambda scoreboard: [(client.id, client.score) for client in scoreboard.top(10)])
+
+        # Check results (same ranking and ties order as the server)
+        self.assertEqual(result, [(2, 200), (1, 100), (3, 100)])
+        self.assertEqual(self.replica.seq, self.publisher.seq)
+
+    def test_receive_ok(self):
+
+        seq = self.publisher.seq
+
+        # Test main
+        self.replica.receive(self.publisher.epoch, seq, [{"user": 9, "total": 900}])  # Covered by the snapshot
+        self.replica.receive(self.publisher.epoch, seq + 1, [{"user": 1, "total": 300}])
+        self.replica.receive(self.publisher.epoch, seq + 2, [{"reset": True}, {"user": 4, "total": 50}])
+        self.replica.receive(self.publisher.epoch, seq + 2, None)  # Heartbeat
+
+        # Check results
+        result = self.replica.read(lambda scoreboard: [(client.id, client.score) for client in scoreboard.top(10)],
+                                   min_seq=seq + 2)
+        self.assertEqual(result, [(4, 50)])
+        self.assertTrue(self.replica.synced)
+
+    def test_boards_ok(self):
+
+        board = Scoreboard()
+        board.update_many([{"user": 1, "total": 10}, {"user": 5, "total": 20}])
+        self.replica.fetch_snapshot = lambda: self.publisher.snapshot(self.scoreboard, {"ctf": board})
+        self.replica.resync()
+        seq = self.publisher.seq
+
+        # Test main
+        self.replica.receive(self.publisher.epoch, seq + 1, [{"board": "ctf", "user": 1, "total": 30},
+                                                             {"board": "race", "user": 2, "total": 5}])
+
+        # Check results (the named Scoreboards apart from the main one)
+        def ranking(scoreboard):
+            return [(client.id, client.score) for client in scoreboard.top(10)]
+
+        self.assertEqual(self.replica.read(ranking, board="ctf"), [(1, 30), (5, 20)])
+        self.assertEqual(self.replica.read(ranking, board="race"), [(2, 5)])
+        self.assertEqual(self.replica.read(ranking, board="missing"), [])
+        self.assertEqual(self.replica.read(ranking), [(2, 200), (1, 100), (3, 100)])
+
+    def test_reads_outside_lock_ok(self):
+
+        seq = self.publisher.seq
+        started, release = threading.Event(), threading.Event()
+        slow_results = []
+
+        def slow_query(scoreboard):
+            started.set()
+            release.wait(1)
+            return len(scoreboard.clients)
+
+        slow_reader = threading.Thread(target=lambda: slow_results.append(self.replica.read(slow_query)))
+        slow_reader.start()
+        started.wait(1)
+
+        # Test main
+        fast_result = self.replica.read(lambda scoreboard: len(scoreboard.clients))
+        receiver = threading.Thread(target=self.replica.receive,
+                                    args=(self.publisher.epoch, seq + 1, [{"user": 9, "total": 900}]))
+        receiver.start()
+        receiver.join(0.05)
+        seq_meanwhile = self.replica.stats()["seq"]
+        release.set()
+        slow_reader.join()
+        receiver.join()
+
+        # Check results (reads run at once, and the message is applied once they are over)
+        self.assertEqual(fast_result, 3)
+        self.assertEqual(slow_results, [3])
+        self.assertEqual(seq_meanwhile, seq)
+        self.assertEqual(self.replica.read(lambda scoreboard: len(scoreboard.clients), min_seq=seq + 1), 4)
+
+    def test_receive_gap_wrong(self):
+
+        seq = self.publisher.seq
+        self.replica.max_staleness = 0.01
+
+        # Test main
+        self.replica.receive(self.publisher.epoch, seq + 2, [{"user": 1, "total": 300}])  # seq + 1 was lost
+
+        # Check results (stale until restarted from a new snapshot)
+        self.assertFalse(self.replica.synced)
+        self.assertEqual(self.replica.read(lambda scoreboard: len(scoreboard.clients)), None)
+        self.replica.resync()
+        self.assertEqual(self.replica.read(lambda scoreboard: len(scoreboard.clients)), 3)
+        self.assertEqual(self.replica.stats()["resyncs"], 2)
@@ -0,0 +1,60 @@
+import os
+import time
+import unittest
+
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from response_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_get_and_put_ok(self):
+
+        cache = ResponseCache(max_size=10, max_staleness=60)
+        response = [{"user": 123, "total": 250}]
+
+        # Test main
+        miss = cache.get((("top", 100), (1,)))
+        cache.put((("top", 100), (1,)), response)
+        hit = cache.get((("top", 100), (1,)))
+        newer_version = cache.get((("top", 100), (2,)))
+
+        # Check results
+        self.assertIsNone(miss)
+        self.assertIs(hit, response)
+        self.assertIsNone(newer_version)
+        self.assertEqual(cache.stats(), {"size": 1, "hits": 1, "misses": 2, "hit_rate": 1 / 3, "evictions": 0,
+                                         "expirations": 0})
+
+    def test_eviction_ok(self):
+
+        cache = ResponseCache(max_size=2, max_staleness=60)
+
+        # Test main
+        cache.put(("a", (1,)), "a")
+        cache.put(("b", (1,)), "b")
+        cache.get(("a", (1,)))  # The least recently used is b now
+        cache.put(("c", (1,)), "c")
+
+        # Check results
+        self.assertEqual(cache.get(("a", (1,))), "a")
+        self.assertIsNone(cache.get(("b", (1,))))
+        self.assertEqual(cache.get(("c", (1,))), "c")
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_expiration_ok(self):
+
+        cache = ResponseCache(max_size=10, max_staleness=0.01)
+        cache.put(("a", (1,)), "a")
+
+        # Test main
+        time.sleep(0.02)
+        expired = cache.get(("a", (1,)))
+
+        # Check results
+        self.assertIsNone(expired)
+        self.assertEqual(cache.stats()["expirations"], 1)
+        self.assertEqual(cache.stats()["size"], 0)
@@ -0,0 +1,58 @@
+import os
+import unittest
+
+import numpy as np
+
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from score_index import ScoreIndex
+
+
+class TestScoreIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.score_index = ScoreIndex(0, 1000, 100)  # Buckets of 10 points
+
+    def test_add_and_move_ok(self):
+
+        # Test main
+        for score in [5, 15, 15, 95, 2000, -30]:
+            self.score_index.move(None, score)
+        self.score_index.move(15, 18)  # Same bucket
+        self.score_index.move(95, 45)
+
+        # Check results (scores out of range counted in the first/last bucket)
+        self.assertEqual(self.score_index.count, 6)
+        self.assertEqual(self.score_index.count_below(15), 2)
+        self.assertEqual(self.score_index.count_at_or_above(45), 2)
+        self.assertAlmostEqual(self.score_index.percentile_of(999), 500 / 6)
+        self.assertEqual(self.score_index.counts()[[0, 1, 4, 99]].tolist(), [2, 2, 1, 1])
+
+    def test_load_ok(self):
+
+        scores = np.random.RandomState(0).randint(-100, 1100, 1000)
+        expected = ScoreIndex(0, 1000, 100)
+        for score in scores:
+            expected.add(score)
+
+        # Test main
+        self.score_index.load(scores)
+
+        # Check results (same tree as adding them one by one)
+        self.assertEqual(self.score_index.tree, expected.tree)
+        self.assertEqual(self.score_index.count, 1000)
+
+    def test_score_at_ok(self):
+
+        self.score_index.load([0, 100, 200, 300])
+
+        # Test main / Check results (lowest score of the bucket of the client at the percentile)
+        self.assertEqual([self.score_index.score_at(percentile) for percentile in [0, 25, 26, 50, 75, 100]],
+                         [0, 0, 100, 100, 200, 300])
+        self.assertEqual(ScoreIndex(0, 1000, 100).score_at(50), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
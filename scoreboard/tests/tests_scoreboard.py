@@ -39,7 +39,7 @@ class TestScoreboard(unittest.TestCase):
             self.assertEqual(len(scoreboard.clients), 1)
             self.assertEqual(len(scoreboard.sorted_clients), 1)
             self.assertEqual(scoreboard.clients[client_id].score, new_total["total"])
-            self.assertEqual(scoreboard.sorted_clients[new_total["total"]][0].score, new_total["total"])
+            self.assertEqual(next(iter(scoreboard.sorted_clients[new_total["total"]])).score, new_total["total"])
 
     def test_single_client_relative_ok(self):
 
@@ -65,7 +65,7 @@ class TestScoreboard(unittest.TestCase):
             self.assertEqual(len(scoreboard.clients), 1)
             self.assertEqual(len(scoreboard.sorted_clients), 1)
             self.assertEqual(scoreboard.clients[client_id].score, expected_total[ptr])
-            self.assertEqual(scoreboard.sorted_clients[expected_total[ptr]][0].score, expected_total[ptr])
+            self.assertEqual(next(iter(scoreboard.sorted_clients[expected_total[ptr]])).score, expected_total[ptr])
 
     def test_single_client_relative_wrong(self):
 
@@ -153,6 +153,9 @@ class TestScoreboard(unittest.TestCase):
             (5, 2, 5, "Full range exists"),
             (11, 2, 2, "Range truncated on the right (not enough low scores)"),
             (1, 2, 3, "Only truncated on the left (enough low scores)"),
+            (3, 2, 5, "Full range exists, starting at the 1st ranking position"),
+            (12, 2, 1, "Range truncated on the right, only the last ranking position exists"),
+            (15, 2, 0, "Range does not exists (beyond the last ranking position)"),
             (5, 8, 10, "Range truncated both on the left and on the right (not enough neither low nor high scores)")
         ]
 
@@ -188,3 +191,213 @@ class TestScoreboard(unittest.TestCase):
 
             for idx, ptr in enumerate(position_ptr_list):
                 self.assertEqual(sorted_client_list[idx].id, expected_sorted_id_list[ptr])
+
+    def test_multiple_client_relative_top_tied_ok(self):
+
+        client_id_list = [1, 2, 3, 4, 5, 6, 7, 8]
+        client_score_list = [100, 200, 100, 350, 200, 155, 60, 100]
+
+        scoreboard = Scoreboard()
+        for ptr in range(len(client_id_list)):
+            scoreboard.update({"user": client_id_list[ptr], "total": client_score_list[ptr]})
+
+        # Test main
+        sorted_client_list = scoreboard.relative_top(3, 1)
+
+        # Check results (2nd, 3rd and 4th ranking positions, tied clients in arrival order)
+        self.assertEqual([client.id for client in sorted_client_list], [2, 5, 6, 1, 3, 8])
+
+    def test_multiple_client_rank_ok_and_wrong(self):
+
+        client_id_list = [1, 2, 3, 4, 5, 6, 7, 8]
+        client_score_list = [100, 200, 100, 350, 200, 155, 60, 100]
+        expected_position_list = [4, 2, 4, 1, 2, 3, 5, 4]
+
+        scoreboard = Scoreboard()
+        for ptr in range(len(client_id_list)):
+            scoreboard.update({"user": client_id_list[ptr], "total": client_score_list[ptr]})
+
+        # Test main
+        for ptr, client_id in enumerate(client_id_list):
+            position = scoreboard.rank(client_id)
+
+            # Check results (same ranking position as in relative_top)
+            self.assertEqual(position, expected_position_list[ptr])
+            self.assertIn(client_id, [client.id for client in scoreboard.relative_top(position, 0)])
+
+        self.assertEqual(scoreboard.rank(999), None)
+        self.assertEqual([scoreboard.count_higher(score) for score in [400, 350, 200, 120, 0]], [0, 0, 1, 3, 5])
+
+    def test_multiple_client_tied_update_ok(self):
+
+        client_id_list = [1, 2, 3, 4, 5]
+
+        scoreboard = Scoreboard()
+        for client_id in client_id_list:
+            scoreboard.update({"user": client_id, "total": 0})
+
+        # Test main
+        scoreboard.update({"user": 4, "score": "+10"})
+        scoreboard.update({"user": 2, "total": 0})
+
+        # Check results (only the updated clients moved; ties sorted by arrival to the score)
+        self.assertEqual(len(scoreboard.sorted_clients), 2)
+        self.assertEqual([client.id for client in scoreboard.sorted_clients[10]], [4])
+        self.assertEqual([client.id for client in scoreboard.sorted_clients[0]], [1, 3, 5, 2])
+        self.assertEqual([client.id for client in scoreboard.top(2)], [4, 1, 3, 5, 2])
+
+    def test_single_client_wrong_info_keeps_ranking(self):
+
+        client_id = 126
+
+        scoreboard = Scoreboard()
+        scoreboard.update({"user": client_id, "total": 250})
+
+        # Test main
+        success = scoreboard.update({"user": client_id})
+
+        # Check results
+        self.assertEqual(success, False)
+        self.assertEqual(scoreboard.rank(client_id), 1)
+        self.assertEqual([client.id for client in scoreboard.top(1)], [client_id])
+
+    def test_multiple_client_wrong_info_keeps_tie_order(self):
+
+        scoreboard = Scoreboard()
+        for client_id in [1, 2, 3]:
+            scoreboard.update({"user": client_id, "total": 5})
+
+        # Test main
+        success = scoreboard.update({"user": 1, "score": "x5"})
+        scoreboard.update({"user": 2, "total": "five"})
+
+        # Check results (rejected updates do not move the client to the end of its bucket)
+        self.assertEqual(success, False)
+        self.assertEqual([client.id for client in scoreboard.sorted_clients[5]], [1, 2, 3])
+
+    def test_multiple_client_update_many_ok_and_wrong(self):
+
+        client_info_list = [{"user": 1, "total": 100},
+                            {"user": 2, "total": 200},
+                            {"user": 1, "score": "+50"},
+                            {"user": 3, "score": "*10"},
+                            {"total": 10},
+                            {"user": 2, "score": "-150"},
+                            {"user": 4, "total": 50}
+                            ]
+        expected_result = [100, 200, 150, None, None, 50, 50]
+
+        scoreboard = Scoreboard()
+        scoreboard.update({"user": 2, "total": 75})
+        scoreboard.update({"user": 5, "total": 75})
+
+        # Test main
+        result = scoreboard.update_many(client_info_list)
+
+        # Check results (same as applying the updates one by one; the rejected first report of 3 is not kept)
+        self.assertEqual(result, expected_result)
+        self.assertEqual(len(scoreboard.clients), 4)
+        self.assertEqual(scoreboard.get(3), None)
+        self.assertEqual(sorted(scoreboard.sorted_clients.keys()), [50, 75, 150])
+        self.assertEqual([(client.id, client.score) for client in scoreboard.top(4)],
+                         [(1, 150), (5, 75), (2, 50), (4, 50)])
+        self.assertEqual(scoreboard.rank(4), 3)
+
+    def test_multiple_client_update_many_tie_order_ok(self):
+
+        client_info_list = [{"user": 1, "total": 5},
+                            {"user": 2, "total": 5},
+                            {"user": 1, "total": 5},
+                            {"user": 3, "score": "x5"}
+                            ]
+
+        one_by_one = Scoreboard()
+        at_once = Scoreboard()
+        for scoreboard in [one_by_one, at_once]:
+            scoreboard.update({"user": 3, "total": 5})
+            scoreboard.update({"user": 4, "total": 5})
+
+        # Test main
+        for client_info in client_info_list:
+            one_by_one.update(client_info)
+        at_once.update_many(client_info_list)
+
+        # Check results (ties sorted by the last accepted modification, same as applying the updates one by one)
+        self.assertEqual([client.id for client in one_by_one.sorted_clients[5]], [3, 4, 2, 1])
+        self.assertEqual([client.id for client in at_once.sorted_clients[5]], [3, 4, 2, 1])
+
+    def test_ranking_pages_ok(self):
+
+        scoreboard = Scoreboard()
+        scoreboard.load([7, 1, 3, 8, 2, 5, 4], [-10, 60, 100, 100, 200, 200, 350])
+
+        # Test main (pages of 2, each one after the last client of the prior one)
+        pages = [scoreboard.ranking(2)]
+        while pages[-1]:
+            pages.append(scoreboard.ranking(2, pages[-1][-1].score, pages[-1][-1].id))
+
+        # Check results (every client once, ties by arrival, even if a page splits them)
+        self.assertEqual([[client.id for client in page] for page in pages], [[4, 2], [5, 3], [8, 1], [7], []])
+
+    def test_ranking_moved_cursor_ok(self):
+
+        scoreboard = Scoreboard()
+        scoreboard.load([1, 2, 3, 4], [50, 100, 100, 100])
+
+        # Test main
+        scoreboard.update({"user": 3, "total": 10})  # The cursor leaves its bucket
+        moved = scoreboard.ranking(10, 100, 3)
+        below = scoreboard.ranking(10, 100)
+
+        # Check results (the bucket of the cursor is restarted, so no client is skipped)
+        self.assertEqual([client.id for client in moved], [2, 4, 1, 3])
+        self.assertEqual([client.id for client in below], [1, 3])
+        self.assertEqual(scoreboard.ranking(0), [])
+
+    def test_around_ok_and_wrong(self):
+
+        scoreboard = Scoreboard()
+        scoreboard.load([7, 1, 3, 8, 2, 5, 4], [-10, 60, 100, 100, 200, 200, 350])
+
+        # Test main / Check results (same as relative_top of the ranking position of the client)
+        for client_id in [7, 1, 3, 8, 2, 5, 4]:
+            for scope in [0, 1, 2, 5]:
+                self.assertEqual(scoreboard.around(client_id, scope),
+                                 scoreboard.relative_top(scoreboard.rank(client_id), scope))
+        self.assertEqual([client.id for client in scoreboard.around(3, 1)], [2, 5, 3, 8, 1])
+        self.assertEqual(scoreboard.around(99, 1), None)
+        self.assertEqual(scoreboard.around(3, -1), [])
+
+    def test_memory_usage_ok(self):
+
+        scoreboard = Scoreboard()
+        empty_usage = scoreboard.memory_usage()
+
+        # Test main
+        scoreboard.update_many([{"user": client_id, "total": client_id % 10} for client_id in range(1000)])
+
+        # Check results (grows with the clients)
+        self.assertGreater(empty_usage, 0)
+        self.assertGreater(scoreboard.memory_usage(), empty_usage + 1000 * 100)
+
+    def test_load_ok(self):
+
+        client_id_list = [7, 1, 3, 8, 2, 5, 4]
+        client_score_list = [-10, 60, 100, 100, 200, 200, 350]
+
+        scoreboard = Scoreboard()
+        scoreboard.update({"user": 99, "total": 1000})
+
+        # Test main
+        scoreboard.load(client_id_list, client_score_list)
+
+        # Check results (prior info replaced, ties in the given order)
+        self.assertEqual(len(scoreboard.clients), len(client_id_list))
+        self.assertEqual(scoreboard.get(99), None)
+        self.assertEqual([client.id for client in scoreboard.top(10)], [4, 2, 5, 3, 8, 1, 7])
+        self.assertEqual(scoreboard.rank(8), 3)
+
+        # Still updatable
+        scoreboard.update({"user": 3, "score": "+100"})
+        self.assertEqual([client.id for client in scoreboard.sorted_clients[100]], [8])
+        self.assertEqual([client.id for client in scoreboard.sorted_clients[200]], [2, 5, 3])
@@ -1,17 +1,30 @@
+import asyncio
 import os
+import shutil
+import tempfile
+import threading
+import time
 import unittest
-from multiprocessing import Process
+from json import dumps, loads
+from multiprocessing import Process, get_context
 os.path.dirname(os.path.realpath(__file__))
 path = os.path.dirname(os.path.realpath(__file__))
 os.environ['PATH'] += ':'+path
 
 
+from analytics import ScoreboardSnapshot
+from scoreboard import Scoreboard
 from scoreboard_wrapper import ScoreboardWrapper
+from shards import Shards
+from top_views import TopViews
+from wal import WriteAheadLog
+from windows import WindowedScoreboard
+from conf import SCORE_INDEX_MIN, SCORE_INDEX_MAX, SCORE_INDEX_BUCKETS
 from constants import DEFAULT_IP, DEFAULT_PORT, CLIENT_MODE, SERVER_MODE
 
 
-def start_server():
-    server = ScoreboardWrapper()
+def start_server(port=DEFAULT_PORT):
+    server = ScoreboardWrapper(port)
     server.start(SERVER_MODE)
 
 
@@ -26,6 +39,10 @@ class TestScoreboardWrapper(unittest.TestCase):
         cls.client = ScoreboardWrapper()
         cls.client.start(CLIENT_MODE)
 
+        # A client without read replicas nor response cache (i.e., all the reads go to the server)
+        cls.server_client = ScoreboardWrapper(replica_max_staleness=None, cache_max_staleness_ms=None)
+        cls.server_client.start(CLIENT_MODE)
+
     @classmethod
     def tearDownClass(cls):
         cls.server.terminate()
@@ -162,6 +179,132 @@ class TestScoreboardWrapper(unittest.TestCase):
         for ptr in range(top_size):
             self.assertEqual(sorted_client_list[ptr]["user"], expected_sorted_id_list[ptr])
 
+    def test_encoded_top_ok(self):
+
+        for client_id, score in [(1, 100), (2, 200), (3, 100)]:
+            self.client.update({"user": client_id, "total": score})
+
+        # Test main
+        encoded_top = self.server_client.top(10, encoded=True)
+        encoded_relative_top = self.server_client.relative_top(2, 0, encoded=True)
+        replica_encoded_top = self.client.top(10, encoded=True)
+        wrong_encoded_top = self.client.top("ten", encoded=True)
+
+        # Check results (same as the decoded response, once encoded)
+        self.assertEqual(encoded_top, dumps(self.server_client.top(10)).encode())
+        self.assertEqual(encoded_relative_top, b'[{"user": 1, "total": 100}, {"user": 3, "total": 100}]')
+        self.assertEqual(replica_encoded_top, encoded_top)
+        self.assertEqual(wrong_encoded_top, b'{"error": "Invalid top size"}')
+
+    def test_around_ok_and_wrong(self):
+
+        self.client.update_many([{"user": client_id, "total": score}
+                                 for client_id, score in [(1, 100), (2, 200), (3, 100), (4, 50), (5, 300)]])
+
+        # Test main (both through the replicas and through the server)
+        around = self.client.around(3, 1)
+        server_around = self.server_client.around(3, 1)
+        encoded_around = self.server_client.around(4, 1, encoded=True)
+
+        # Check results (same as relative_top of the ranking position of the client)
+        self.assertEqual(around, self.client.relative_top(3, 1))
+        self.assertEqual([row["user"] for row in server_around], [2, 1, 3, 4])
+        self.assertEqual(encoded_around, b'[{"user": 1, "total": 100}, {"user": 3, "total": 100}, '
+                                         b'{"user": 4, "total": 50}]')
+        self.assertEqual(self.client.around(99, 1), {"error": "Unknown user"})
+        self.assertEqual(self.client.around("one", 1), {"error": "Invalid user, scope values"})
+
+    def test_percentile_and_score_at_ok_and_wrong(self):
+
+        self.client.update_many([{"user": client_id, "total": score}
+                                 for client_id, score in [(1, 0), (2, 1000), (3, 2000), (4, 3000)]])
+
+        # Test main (both through the replicas and through the server)
+        percentile = self.client.percentile(3)
+        server_percentile = self.server_client.percentile(3)
+        score_at = self.client.score_at(50)
+        server_score_at = self.server_client.score_at(100)
+
+        # Check results (at the resolution of a score bucket)
+        self.assertEqual(percentile, {"user": 3, "total": 2000, "percentile": 50.0, "top": 50.0})
+        self.assertEqual(server_percentile, percentile)
+        self.assertEqual(score_at, {"percentile": 50, "score": 768})
+        self.assertEqual(server_score_at, {"percentile": 100, "score": 2816})
+        self.assertEqual(self.client.percentile(99), {"error": "Unknown user"})
+        self.assertEqual(self.client.percentile("one"), {"error": "Invalid user"})
+        self.assertEqual(self.client.score_at(101), {"error": "Invalid percentile"})
+
+    def test_ranking_pages_ok_and_wrong(self):
+
+        self.client.update_many([{"user": client_id, "total": score}
+                                 for client_id, score in [(1, 100), (2, 200), (3, 100), (4, 50), (5, 100)]])
+
+        # Test main (both through the replicas and through the server)
+        paged_ids = []
+        for client in [self.client, self.server_client]:
+            pages = [client.ranking(2)]
+            while pages[-1]["next"] is not None:
+                pages.append(client.ranking(2, pages[-1]["next"]))
+            paged_ids.append([[row["user"] for row in page["ranking"]] for page in pages])
+
+        # Check results (the tied clients split by a page are neither repeated nor skipped)
+        self.assertEqual(paged_ids, [[[2, 1], [3, 5], [4]]] * 2)
+        self.assertEqual(self.client.ranking(2)["next"], "100:1")
+        self.assertEqual(self.client.ranking(0), {"error": "Invalid after, limit values"})
+        self.assertEqual(self.client.ranking(2, "100"), {"error": "Invalid after, limit values"})
+
+    def test_windows_ok_and_wrong(self):
+
+        self.client.update({"user": 1, "total": 100})
+        self.client.update_many([{"user": 2, "score": "+30"}, {"user": 1, "score": "+10"},
+                                 {"user": 3, "score": "x"}])
+
+        # Test main
+        daily_top = self.client.window_top("daily", 10)
+        weekly_rank = self.client.window_rank("weekly", 2)
+        closed_top = self.client.window_top("daily", 10, closed=True)
+        info = self.client.windows_info()
+
+        # Check results (same client infos as the all-time Scoreboard, the rejected one excluded)
+        self.assertEqual(daily_top, [{"user": 1, "total": 110}, {"user": 2, "total": 30}])
+        self.assertEqual(weekly_rank, {"user": 2, "total": 30, "position": 2})
+        self.assertEqual(closed_top, [])
+        self.assertEqual(info["daily"]["clients"], 2)
+        self.assertEqual(info["weekly"]["end"] - info["weekly"]["start"], 7 * 24 * 3600)
+        self.assertEqual(self.client.window_top("hourly", 10), {"error": "Invalid window, top size"})
+        self.assertEqual(self.client.window_rank("daily", "one"), {"error": "Invalid window, user"})
+
+    def test_boards_ok_and_wrong(self):
+
+        # Test main
+        updated = self.client.board_update("ctf", {"user": 1, "total": 100})
+        updated_many = self.client.board_update_many("ctf", [{"user": 2, "score": "+30"}, {"user": 1, "score": "x"}])
+        self.client.board_update("race", {"user": 1, "total": 5})
+        rejected = self.client.board_update("void", {"user": 1, "total": 2**63})  # Out of range
+        top = self.server_client.board_top("ctf", 10)
+        rank = self.server_client.board_rank("ctf", 2)
+        missing_top = self.server_client.board_top("missing", 10)
+        stats = self.client.boards_stats()
+        replica_top = self.client.board_top("ctf", 10)  # From the read replica, if fresh
+        replica_rank = self.client.board_rank("ctf", 2)
+
+        # Check results (each named Scoreboard apart from the main one, and from each other)
+        self.assertEqual(updated, {"user": 1, "total": 100})
+        self.assertEqual(updated_many, [{"user": 2, "total": 30}, {"error": "Invalid client info"}])
+        self.assertEqual(top, [{"user": 1, "total": 100}, {"user": 2, "total": 30}])
+        self.assertEqual(rank, {"user": 2, "total": 30, "position": 2})
+        self.assertEqual(replica_top, top)
+        self.assertEqual(replica_rank, rank)
+        self.assertEqual(missing_top, [])
+        self.assertEqual(self.client.top(10), [])
+        self.assertEqual(stats["ctf"]["clients"], 2)
+        self.assertEqual(stats["ctf"]["requests"], {"update": 1, "update_many": 1, "top": 1, "rank": 1})
+        self.assertGreater(stats["ctf"]["memory"], stats["race"]["memory"])
+        self.assertNotIn("missing", stats)
+        self.assertEqual(rejected, {"error": "Invalid client info"})
+        self.assertNotIn("void", stats)  # Not created by a rejected score
+        self.assertEqual(self.client.board_update("no/such", {"user": 1, "total": 5}), {"error": "Invalid board"})
+
     def test_multiple_client_relative_top_ok_and_wrong(self):
 
         client_id_list = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
@@ -219,3 +362,647 @@ class TestScoreboardWrapper(unittest.TestCase):
 
             for idx, ptr in enumerate(position_ptr_list):
                 self.assertEqual(sorted_client_list[idx]["user"], expected_sorted_id_list[ptr])
+
+    def test_rank_ok_and_wrong(self):
+
+        client_id_list = [1, 2, 3, 4]
+        client_score_list = [100, 200, 100, 350]
+        expected_position_list = [3, 2, 3, 1]
+
+        for ptr in range(len(client_id_list)):
+            self.client.update({"user": client_id_list[ptr], "total": client_score_list[ptr]})
+
+        # Test main
+        for ptr, client_id in enumerate(client_id_list):
+            result = self.client.rank(client_id)
+
+            # Check results
+            self.assertEqual(result, {"user": client_id, "total": client_score_list[ptr],
+                                      "position": expected_position_list[ptr]})
+
+        self.assertEqual(self.client.rank(999), {"error": "Unknown user"})
+        self.assertEqual(self.client.rank("1"), {"error": "Invalid user"})
+
+    def test_update_many_ok_and_wrong(self):
+
+        client_info_list = [{"user": 1, "total": 100},
+                            {"user": 2, "score": "10"},
+                            {"user": 1, "score": "+50"},
+                            {"user": 3, "score": "-20"}
+                            ]
+        expected_result = [{"user": 1, "total": 100},
+                           {"error": "Invalid client info"},
+                           {"user": 1, "total": 150},
+                           {"user": 3, "total": -20}
+                           ]
+
+        # Test main
+        result = self.client.update_many(client_info_list)
+
+        # Check results
+        self.assertEqual(result, expected_result)
+        self.assertEqual(self.client.top(1), [{"user": 1, "total": 150}])
+        self.assertEqual(self.client.update_many({"user": 1, "total": 100}), {"error": "Invalid client info list"})
+
+    def test_top_views_ok(self):
+
+        top_size = 100  # A hot size in the server
+        client_id_list = [1, 2, 3, 4, 5, 6]
+        client_score_list = [100, 200, 150, 350, 225, 155]
+
+        for ptr in range(len(client_id_list)):
+            self.server_client.update({"user": client_id_list[ptr], "total": client_score_list[ptr]})
+
+        prior_stats = self.server_client.top_views_stats()
+
+        # Test main
+        first_top = self.server_client.top(top_size)
+        second_top = self.server_client.top(top_size)
+        self.server_client.update({"user": 1, "score": "+300"})
+        third_top = self.server_client.top(top_size)
+
+        # Check results
+        stats = self.server_client.top_views_stats()
+        self.assertEqual(first_top, second_top)
+        self.assertEqual([row["user"] for row in third_top], [1, 4, 5, 2, 6, 3])
+        self.assertEqual(stats["hits"] - prior_stats["hits"], 1)
+        self.assertEqual(stats["misses"] - prior_stats["misses"], 2)
+        self.assertEqual(stats["invalidations"] - prior_stats["invalidations"], 1)
+
+    def test_replica_reads_own_writes_ok(self):
+
+        # The replica catches up with the server in background, once the server is started
+        deadline = time.monotonic() + 5
+        while not self.client.replica_stats()["synced"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        prior_stats = self.client.replica_stats()
+
+        # Test main
+        self.client.update({"user": 1, "total": 100})
+        self.server_client.update({"user": 2, "total": 200})  # Another client process
+        first_top = self.client.top(10)
+        self.client.update({"user": 3, "score": "+300"})
+        second_top = self.client.top(10)
+        rank = self.client.rank(1)
+
+        # Check results (answered by the replica, that includes the updates of this client)
+        stats = self.client.replica_stats()
+        self.assertIn({"user": 1, "total": 100}, first_top)
+        self.assertEqual(second_top[0], {"user": 3, "total": 300})
+        self.assertEqual(rank["user"], 1)
+        self.assertTrue(stats["synced"])
+        self.assertEqual(stats["local_reads"] - prior_stats["local_reads"], 3)
+        self.assertEqual(self.server_client.replica_stats(), {})
+
+    def test_response_cache_ok(self):
+
+        # A client without read replicas, whose reads are cached for up to 50 ms
+        client = ScoreboardWrapper(replica_max_staleness=None, cache_max_staleness_ms=50)
+        client.start(CLIENT_MODE)
+        client.update({"user": 1, "total": 100})
+
+        # Test main
+        first_top = client.top(10)
+        self.server_client.update({"user": 2, "total": 200})  # Another client process
+        cached_top = client.top(10)
+        time.sleep(0.06)
+        expired_top = client.top(10)
+        client.update({"user": 3, "total": 300})
+        own_write_top = client.top(10)
+
+        # Check results
+        stats = client.cache_stats()
+        self.assertIs(cached_top, first_top)
+        self.assertEqual(cached_top, [{"user": 1, "total": 100}])
+        self.assertEqual(expired_top, [{"user": 2, "total": 200}, {"user": 1, "total": 100}])
+        self.assertEqual(own_write_top[0], {"user": 3, "total": 300})
+        self.assertEqual((stats["hits"], stats["misses"], stats["expirations"]), (1, 3, 1))
+        self.assertEqual(self.server_client.cache_stats(), {})
+
+    def test_concurrent_threads_ok(self):
+
+        # A client shared by more threads than pooled connections
+        client = ScoreboardWrapper(replica_max_staleness=None, pool_size=2)
+        client.start(CLIENT_MODE)
+        results = {}
+
+        def report(client_id):
+            results[client_id] = [client.update({"user": client_id, "score": "+1"}) for _ in range(20)][-1]
+
+        # Test main
+        threads = [threading.Thread(target=report, args=(client_id,)) for client_id in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Check results
+        stats = client.pool_stats()
+        self.assertEqual(results, {client_id: {"user": client_id, "total": 20} for client_id in range(8)})
+        self.assertEqual(len(client.top(1)), 8)  # All of them tied
+        self.assertLessEqual(stats["opened"], 2)
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["checkouts"], 8 * 20)
+
+    def test_async_queries_ok(self):
+
+        async def queries():
+            # A client of its own, whose non-blocking connections belong to this event loop
+            client = ScoreboardWrapper(replica_max_staleness=None)
+            client.start(CLIENT_MODE)
+
+            updates = await asyncio.gather(client.update_async({"user": 1, "total": 100}),
+                                           client.update_many_async([{"user": 2, "total": 200}, {"user": 3}]))
+            return (updates, await client.top_async(10), await client.relative_top_async(1, 1),
+                    await client.rank_async(1), await client.stats_async(bins=1, percentiles=[], thresholds=[150]),
+                    await client.top_async("ten"))
+
+        # Test main
+        updates, top, relative_top, rank, stats, wrong_top = asyncio.run(queries())
+
+        # Check results
+        self.assertEqual(updates, [{"user": 1, "total": 100},
+                                   [{"user": 2, "total": 200}, {"error": "Invalid client info"}]])
+        self.assertEqual(top, [{"user": 2, "total": 200}, {"user": 1, "total": 100}])
+        self.assertEqual(relative_top, top)
+        self.assertEqual(rank, {"user": 1, "total": 100, "position": 2})
+        self.assertEqual(stats["above"], {"150": 1})
+        self.assertEqual(wrong_top, {"error": "Invalid top size"})
+
+    def test_stats_ok_and_wrong(self):
+
+        client_id_list = [1, 2, 3, 4]
+        client_score_list = [100, 200, 100, 350]
+
+        for ptr in range(len(client_id_list)):
+            self.client.update({"user": client_id_list[ptr], "total": client_score_list[ptr]})
+
+        # Test main
+        stats = self.client.stats(bins=[0, 150, 400], percentiles=[50], thresholds=[100])
+
+        # Check results
+        self.assertEqual(stats["count"], 4)
+        self.assertEqual(stats["histogram"]["counts"], [2, 2])
+        self.assertEqual(stats["percentiles"], {"50": 150.0})
+        self.assertEqual(stats["above"], {"100": 2})
+        self.assertEqual(self.client.stats(bins=0), {"error": "Invalid bins, percentiles, thresholds values"})
+        self.assertEqual(self.client.stats(percentiles=[101]),
+                         {"error": "Invalid bins, percentiles, thresholds values"})
+        self.assertEqual(self.client.stats(bins=10**9), {"error": "Invalid bins, percentiles, thresholds values"})
+        self.assertEqual(self.client.stats(thresholds=list(range(10**4))),
+                         {"error": "Invalid bins, percentiles, thresholds values"})
+        self.assertEqual(self.client.update({"user": 5, "total": 2**63}), {"error": "Invalid client info"})
+
+    def test_replay_wal_ok(self):
+
+        wal_dir = tempfile.mkdtemp()
+        wal_path = os.path.join(wal_dir, "test.wal")
+
+        wal = WriteAheadLog(wal_path)
+        wal.open()
+        wal.log([{"user": 1, "total": 100}, {"user": 2, "total": 200}, {"reset": True}])
+        wal.log([{"user": 3, "total": 300}, {"user": 4, "total": 50}, {"user": 3, "total": 30}])
+        wal.close()
+
+        server = ScoreboardWrapper(wal_path=wal_path)
+        server.scoreboard = Scoreboard()
+        server.wal = WriteAheadLog(wal_path)
+
+        # Test main
+        server.replay_wal(batch_size=2)
+
+        # Check results
+        shutil.rmtree(wal_dir)
+        self.assertEqual([(client.id, client.score) for client in server.scoreboard.top(10)], [(4, 50), (3, 30)])
+
+    def test_wal_round_trip_keeps_ties_order_ok(self):
+
+        wal_dir = tempfile.mkdtemp()
+        wal_path = os.path.join(wal_dir, "test.wal")
+
+        server = ScoreboardWrapper(wal_path=wal_path)
+        server.mode = SERVER_MODE
+        server.scoreboard = Scoreboard()
+        server.top_views = TopViews([])
+        server.wal = WriteAheadLog(wal_path)
+        server.wal.open()
+
+        # Test main
+        for client_info in [{"user": 1, "total": 5}, {"user": 2, "total": 5}, {"user": 1, "total": 5}]:
+            server.update(dumps(client_info))
+        server.update_many(dumps([{"user": 3, "total": 5}, {"user": 4, "total": 5}, {"user": 3, "total": 5}]))
+        rejected = server.update(dumps({"user": 99, "score": "x"}))
+        server.wal.close()
+
+        restarted_server = ScoreboardWrapper(wal_path=wal_path)
+        restarted_server.scoreboard = Scoreboard()
+        restarted_server.wal = WriteAheadLog(wal_path)
+        restarted_server.replay_wal()
+
+        # Check results (same ties order after the restart; the rejected update is neither applied nor logged)
+        shutil.rmtree(wal_dir)
+        self.assertEqual(rejected, dumps({"error": "Invalid client info"}))
+        self.assertEqual(server.scoreboard.get(99), None)
+        self.assertEqual(server.wal.last_seq, 5)
+        self.assertEqual([client.id for client in server.scoreboard.top(1)], [2, 1, 4, 3])
+        self.assertEqual([client.id for client in restarted_server.scoreboard.top(1)], [2, 1, 4, 3])
+
+    def test_update_batch_ok(self):
+
+        server = ScoreboardWrapper()
+        server.mode = SERVER_MODE
+        server.scoreboard = Scoreboard()
+        server.top_views = TopViews([])
+
+        # Test main (a run of updates to the same hot client, attended at once)
+        result = server.update_batch([[dumps({"user": 7, "score": "+10"})], [dumps({"user": 7, "total": 100})],
+                                      ["not a json"], [dumps({"user": 7, "score": "+5"})],
+                                      [dumps({"user": 8, "score": "x"})], [dumps({"user": 7, "score": "-20"})]])
+
+        # Check results (each update gets the total right after applying it, same as one by one)
+        self.assertEqual([loads(item) for item in result[:2]], [{"user": 7, "total": 10}, {"user": 7, "total": 100}])
+        self.assertIsInstance(result[2], ValueError)
+        self.assertEqual([loads(item) for item in result[3:]],
+                         [{"user": 7, "total": 105}, {"error": "Invalid client info"}, {"user": 7, "total": 85}])
+        self.assertEqual([(client.id, client.score) for client in server.scoreboard.top(10)], [(7, 85)])
+        self.assertEqual(server.version, 1)  # A single logged change
+
+    def test_transport_stats_ok(self):
+
+        # Test main
+        result = self.server_client.transport_stats()
+
+        # Check results
+        self.assertGreater(result["batches"], 0)
+        self.assertGreaterEqual(result["requests"], result["batches"])
+        self.assertGreaterEqual(result["mean_batch_size"], 1.0)
+
+    def test_metrics_ok(self):
+
+        self.client.update_many([{"user": client_id, "total": 100} for client_id in range(3)])
+        self.client.board_update("arena", {"user": 1, "total": 10})
+
+        # Test main
+        result = self.client.metrics()
+
+        # Check results (a single shard, with the service time of the commands it attended)
+        self.assertEqual(len(result), 1)
+        self.assertGreaterEqual(result[0]["max_queue_depth"], result[0]["queue_depth"])
+        self.assertGreater(result[0]["commands"]["series"]["update_many"]["count"], 0)
+        self.assertIn({"kind": "main", "board": "main", "clients": 3}, result[0]["boards"])
+        self.assertIn({"kind": "window", "board": "daily", "clients": 3}, result[0]["boards"])
+        self.assertIn({"kind": "named", "board": "arena", "clients": 1}, result[0]["boards"])
+
+    def test_wal_stats_ok(self):
+
+        # Test main
+        result = self.client.wal_stats()
+
+        # Check results (the test server has no write-ahead log)
+        self.assertEqual(result, {})
+
+    def test_snapshot_and_restore_ok(self):
+
+        wal_dir = tempfile.mkdtemp()
+        wal_path = os.path.join(wal_dir, "test.wal")
+        snapshot_path = os.path.join(wal_dir, "test.snapshot")
+
+        #
+        # Setup a server (not listening) that takes a snapshot every 4 records
+        #
+        server = ScoreboardWrapper(wal_path=wal_path, snapshot_path=snapshot_path, snapshot_every=4)
+        server.mode = SERVER_MODE
+        server.scoreboard = Scoreboard()
+        server.top_views = TopViews([])
+        server.wal = WriteAheadLog(wal_path)
+        server.restore()
+        server.wal.open()
+
+        # Test main
+        server.update_many(dumps([{"user": 1, "total": 100}, {"user": 2, "total": 200}]))
+        server.update_many(dumps([{"user": 3, "total": 300}, {"user": 4, "total": 50}]))  # Starts a snapshot
+        while server.snapshot_pid is not None:
+            # Wait for the background snapshot
+            time.sleep(0.01)
+            server._check_snapshot()
+        server.update(dumps({"user": 1, "score": "+500"}))  # Log tail (and checks the finished snapshot)
+        server.wal.close()
+
+        restarted_server = ScoreboardWrapper(wal_path=wal_path, snapshot_path=snapshot_path)
+        restarted_server.scoreboard = Scoreboard()
+        restarted_server.wal = WriteAheadLog(wal_path)
+        restarted_server.restore()
+
+        # Check results
+        self.assertEqual(server.snapshot_seq, 4)
+        self.assertEqual(server.wal.segments(), [])  # Covered by the snapshot
+        self.assertEqual(restarted_server.snapshot_seq, 4)
+        self.assertEqual([(client.id, client.score) for client in restarted_server.scoreboard.top(10)],
+                         [(1, 600), (3, 300), (2, 200), (4, 50)])
+        self.assertEqual(restarted_server.wal.last_seq, 5)
+        shutil.rmtree(wal_dir)
+
+    def test_windows_restore_ok(self):
+
+        wal_dir = tempfile.mkdtemp()
+        wal_path = os.path.join(wal_dir, "test.wal")
+        snapshot_path = os.path.join(wal_dir, "test.snapshot")
+
+        #
+        # Setup a server (not listening) with a time window, that takes a snapshot every 3 records
+        #
+        server = ScoreboardWrapper(wal_path=wal_path, snapshot_path=snapshot_path, snapshot_every=3)
+        server.mode = SERVER_MODE
+        server.scoreboard = Scoreboard()
+        server.top_views = TopViews([])
+        server.windows = {"forever": WindowedScoreboard(10**10)}
+        server.wal = WriteAheadLog(wal_path)
+        server.restore()
+        server.wal.open()
+        server.scoreboard.update({"user": 1, "total": 1000})  # Earned before the window (i.e., not logged)
+
+        # Test main
+        server.update(dumps({"user": 1, "total": 1200}))
+        server.update_many(dumps([{"user": 2, "total": 50}, {"user": 1, "score": "+30"}]))  # Starts a snapshot
+        while server.snapshot_pid is not None:
+            # Wait for the background snapshot
+            time.sleep(0.01)
+            server._check_snapshot()
+        server.update(dumps({"user": 2, "total": 20}))  # Log tail
+        server.update_many(dumps([{"user": 3, "score": "+40"}, {"user": 3, "total": 45}]))
+        server.wal.close()
+
+        restarted_server = ScoreboardWrapper(wal_path=wal_path, snapshot_path=snapshot_path)
+        restarted_server.scoreboard = Scoreboard()
+        restarted_server.windows = {"forever": WindowedScoreboard(10**10)}
+        restarted_server.wal = WriteAheadLog(wal_path)
+        restarted_server.restore()
+
+        # Check results (the window gets the changes of the total scores, also after the restart)
+        expected = [(1, 230), (3, 45), (2, 20)]
+        shutil.rmtree(wal_dir)
+        self.assertEqual(server.snapshot_seq, 3)
+        self.assertEqual(restarted_server.windows_seqs, {"forever": 3})
+        self.assertEqual([(client.id, client.score) for client in server.windows["forever"].get().top(10)], expected)
+        self.assertEqual([(client.id, client.score) for client in restarted_server.windows["forever"].get().top(10)],
+                         expected)
+
+    def test_boards_restore_ok(self):
+
+        wal_dir = tempfile.mkdtemp()
+        wal_path = os.path.join(wal_dir, "test.wal")
+        snapshot_path = os.path.join(wal_dir, "test.snapshot")
+
+        #
+        # Setup a server (not listening) that takes a snapshot every 3 records
+        #
+        server = ScoreboardWrapper(wal_path=wal_path, snapshot_path=snapshot_path, snapshot_every=3)
+        server.mode = SERVER_MODE
+        server.scoreboard = Scoreboard()
+        server.top_views = TopViews([])
+        server.wal = WriteAheadLog(wal_path)
+        server.restore()
+        server.wal.open()
+
+        # Test main
+        server.board_update("ctf", dumps({"user": 1, "total": 100}))
+        server.update(dumps({"user": 1, "total": 7}))
+        server.board_update_many("race", dumps([{"user": 2, "total": 30}, {"user": 3, "score": "x"}]))  # Snapshot
+        while server.snapshot_pid is not None:
+            # Wait for the background snapshot
+            time.sleep(0.01)
+            server._check_snapshot()
+        server.board_update("ctf", dumps({"user": 2, "score": "+50"}))  # Log tail
+        server.board_update("void", dumps({"user": 2, "total": 2**63}))  # Rejected (neither logged nor created)
+        server.wal.close()
+
+        restarted_server = ScoreboardWrapper(wal_path=wal_path, snapshot_path=snapshot_path)
+        restarted_server.scoreboard = Scoreboard()
+        restarted_server.wal = WriteAheadLog(wal_path)
+        restarted_server.restore()
+
+        # Check results (the named Scoreboards apart from the main one, also after the restart)
+        shutil.rmtree(wal_dir)
+        self.assertEqual(server.wal.last_seq, 4)
+        self.assertEqual(sorted(restarted_server.boards), ["ctf", "race"])
+        self.assertEqual([(client.id, client.score) for client in restarted_server.boards["ctf"].top(10)],
+                         [(1, 100), (2, 50)])
+        self.assertEqual([(client.id, client.score) for client in restarted_server.boards["race"].top(10)],
+                         [(2, 30)])
+        self.assertEqual([(client.id, client.score) for client in restarted_server.scoreboard.top(10)], [(1, 7)])
+
+    def test_failed_snapshot_backoff_ok(self):
+
+        wal_dir = tempfile.mkdtemp()
+        wal_path = os.path.join(wal_dir, "test.wal")
+        blocker_path = os.path.join(wal_dir, "blocker")
+        open(blocker_path, "w").close()
+        snapshot_path = os.path.join(blocker_path, "test.snapshot")  # Can not be written (its directory is a file)
+
+        server = ScoreboardWrapper(wal_path=wal_path, snapshot_path=snapshot_path, snapshot_every=2)
+        server.mode = SERVER_MODE
+        server.scoreboard = Scoreboard()
+        server.top_views = TopViews([])
+        server.wal = WriteAheadLog(wal_path)
+        server.wal.open()
+
+        # Test main
+        server.update_many(dumps([{"user": 1, "total": 100}, {"user": 2, "total": 200}]))  # Starts a snapshot
+        while server.snapshot_pid is not None:
+            # Wait for the background snapshot (it fails)
+            time.sleep(0.01)
+            server._check_snapshot()
+        server.update(dumps({"user": 1, "score": "+1"}))  # Does not retry it yet
+        retried_pid = server.snapshot_pid
+        server.update(dumps({"user": 2, "score": "+1"}))  # Retries it
+        retrying_pid = server.snapshot_pid
+        while server.snapshot_pid is not None:
+            time.sleep(0.01)
+            server._check_snapshot()
+        server.wal.close()
+
+        # Check results
+        shutil.rmtree(wal_dir)
+        self.assertEqual(server.snapshot_seq, 0)
+        self.assertEqual(retried_pid, None)
+        self.assertNotEqual(retrying_pid, None)
+        self.assertEqual(server.snapshot_attempt_seq, 4)
+
+
+class TestShardedScoreboardWrapper(unittest.TestCase):
+
+    NUM_SHARDS = 2
+    PORT = DEFAULT_PORT + 10
+
+    @classmethod
+    def setUpClass(cls):
+        # Setup a server per shard (spawned, since ZMQ contexts of this process must not be forked)
+        context = get_context("spawn")
+        cls.servers = [context.Process(target=start_server, args=(cls.PORT + shard,))
+                       for shard in range(cls.NUM_SHARDS)]
+        for server in cls.servers:
+            server.start()
+
+        cls.client = ScoreboardWrapper(cls.PORT, num_shards=cls.NUM_SHARDS)
+        cls.client.start(CLIENT_MODE)
+
+        # A client without read replicas nor response cache (i.e., all the reads go to the servers)
+        cls.server_client = ScoreboardWrapper(cls.PORT, num_shards=cls.NUM_SHARDS, replica_max_staleness=None,
+                                              cache_max_staleness_ms=None)
+        cls.server_client.start(CLIENT_MODE)
+
+    @classmethod
+    def tearDownClass(cls):
+        for server in cls.servers:
+            server.terminate()
+
+    def setUp(self):
+        self.client.reset()
+
+    def test_sharded_top_and_relative_top_ok(self):
+
+        client_id_list = [1, 2, 3, 4, 5, 6]
+        client_score_list = [200, 300, 100, 100, 100, 50]
+
+        result = self.client.update_many([{"user": client_id_list[ptr], "total": client_score_list[ptr]}
+                                          for ptr in range(len(client_id_list))])
+
+        # Test main
+        top = self.client.top(3)
+        relative_top = self.client.relative_top(3, 1)
+
+        # Check results (ties of both shards grouped into a single ranking position, the higher scores of each shard
+        # added up, see Shards)
+        self.assertEqual([row["total"] for row in result], client_score_list)
+        self.assertEqual([row["user"] for row in top], [2, 1, 4, 3, 5])
+        self.assertEqual([row["user"] for row in relative_top], [1, 4, 3, 5])
+        self.assertEqual(self.client.top(3, encoded=True), dumps(top).encode())
+
+    def test_sharded_deep_relative_top_ok(self):
+
+        scores = [(client_id, (client_id * 7919 % 50 - 10) * 10) for client_id in range(1, 41)]
+        self.client.update_many([{"user": client_id, "total": score} for client_id, score in scores])
+
+        # The whole partial ranking of each shard
+        scoreboards = [Scoreboard() for _ in range(self.NUM_SHARDS)]
+        for client_id, score in scores:
+            scoreboards[client_id % self.NUM_SHARDS].update({"user": client_id, "total": score})
+        rankings = [[{"user": client.id, "total": client.score} for client in scoreboard.top(len(scores))]
+                    for scoreboard in scoreboards]
+
+        # Test main / Check results (only the scores around the scope are merged, same result as merging them all)
+        for client in [self.client, self.server_client]:
+            for position in range(1, 60, 3):
+                for scope in [0, 2]:
+                    self.assertEqual(client.relative_top(position, scope),
+                                     Shards.merge(rankings, max(1, position - scope), position + scope))
+
+    def test_sharded_around_ok(self):
+
+        self.client.update_many([{"user": client_id, "total": score}
+                                 for client_id, score in [(1, 200), (2, 300), (3, 100), (4, 100), (5, 150), (6, 50),
+                                                          (7, 400), (8, 250)]])
+
+        # Test main / Check results (same as relative_top of the merged ranking position of the client)
+        for client_id in range(1, 9):
+            for scope in [0, 1, 2]:
+                self.assertEqual(self.client.around(client_id, scope),
+                                 self.client.relative_top(self.client.rank(client_id)["position"], scope))
+        self.assertEqual(self.client.around(99, 1), {"error": "Unknown user"})
+
+    def test_sharded_percentile_and_score_at_ok(self):
+
+        self.client.update_many([{"user": client_id, "total": client_id * 1000} for client_id in range(1, 9)])
+
+        # Test main (the score distributions of both shards merged)
+        percentiles = [self.client.percentile(client_id)["percentile"] for client_id in range(1, 9)]
+        score_at = self.client.score_at(25)
+
+        # Check results
+        self.assertEqual(percentiles, [12.5 * ptr for ptr in range(8)])
+        self.assertEqual(self.client.percentile(8)["top"], 12.5)
+        self.assertEqual(score_at, {"percentile": 25, "score": 1792})
+        self.assertEqual(self.client.percentile(99), {"error": "Unknown user"})
+
+    def test_sharded_ranking_ok(self):
+
+        self.client.update_many([{"user": client_id, "total": score}
+                                 for client_id, score in [(1, 200), (2, 300), (3, 100), (4, 100), (5, 100), (6, 50)]])
+
+        # Test main (pages of 2, split among the tied clients of both shards)
+        pages = [self.client.ranking(2)]
+        while pages[-1]["next"] is not None:
+            pages.append(self.client.ranking(2, pages[-1]["next"]))
+
+        # Check results (merged ranking, tied clients sorted by shard, each one once)
+        self.assertEqual([[row["user"] for row in page["ranking"]] for page in pages], [[2, 1], [4, 3], [5, 6]])
+
+    def test_sharded_rank_and_stats_ok(self):
+
+        for client_info in [{"user": 1, "total": 200}, {"user": 2, "total": 300}, {"user": 3, "total": 100},
+                            {"user": 4, "total": 200}, {"user": 5, "score": "+50"}]:
+            self.client.update(client_info)
+
+        # Test main
+        rank = self.client.rank(3)
+        stats = self.client.stats(bins=[0, 150, 400], percentiles=[50], thresholds=[100])
+
+        # Check results (the higher scores of each shard added up: 300 and 200, and 200, see Shards)
+        self.assertEqual(rank, {"user": 3, "total": 100, "position": 4})
+        self.assertEqual(stats["count"], 5)
+        self.assertEqual(stats["histogram"]["counts"], [2, 3])
+        self.assertEqual(stats["above"], {"100": 3})
+        self.assertEqual(len(self.client.wal_stats()), self.NUM_SHARDS)
+
+    def test_sharded_stats_ok(self):
+
+        scores = [(client_id, client_id * 7919 % 1000) for client_id in range(1, 101)]
+        self.client.update_many([{"user": client_id, "total": score} for client_id, score in scores])
+
+        scoreboard = Scoreboard()
+        for client_id, score in scores:
+            scoreboard.update({"user": client_id, "total": score})
+        expected = ScoreboardSnapshot(scoreboard).stats(bins=7, percentiles=[10, 90], thresholds=[0, 500])
+
+        # Test main
+        stats = self.server_client.stats(bins=7, percentiles=[10, 90], thresholds=[0, 500])
+
+        # Check results (merged from the summaries of the shards, only the percentiles estimated within a bucket)
+        bucket_width = (SCORE_INDEX_MAX - SCORE_INDEX_MIN) // SCORE_INDEX_BUCKETS
+        self.assertEqual({key: stats[key] for key in ["count", "min", "max", "histogram", "above"]},
+                         {key: expected[key] for key in ["count", "min", "max", "histogram", "above"]})
+        self.assertAlmostEqual(stats["mean"], expected["mean"])
+        for percentile in ["10", "90"]:
+            self.assertLessEqual(abs(stats["percentiles"][percentile] - expected["percentiles"][percentile]),
+                                 bucket_width)
+
+    def test_sharded_windows_ok(self):
+
+        for client_info in [{"user": 1, "total": 200}, {"user": 2, "total": 300}, {"user": 3, "score": "+100"},
+                            {"user": 4, "total": 200}]:
+            self.client.update(client_info)
+
+        # Test main
+        top = self.client.window_top("daily", 2)
+        rank = self.client.window_rank("daily", 3)
+
+        # Check results (merged as the all-time Scoreboard)
+        self.assertEqual([row["user"] for row in top], [2, 4, 1])
+        self.assertEqual(rank, {"user": 3, "total": 100, "position": 4})
+        self.assertEqual(self.client.windows_info()["daily"]["clients"], 4)
+
+    def test_sharded_boards_ok(self):
+
+        self.client.board_update_many("ctf", [{"user": 1, "total": 200}, {"user": 2, "total": 300},
+                                              {"user": 3, "total": 100}, {"user": 4, "total": 200}])
+
+        # Test main
+        top = self.client.board_top("ctf", 2)
+        rank = self.client.board_rank("ctf", 3)
+        stats = self.client.boards_stats()
+
+        # Check results (merged as the main Scoreboard, accounted by every shard)
+        self.assertEqual([row["user"] for row in top], [2, 4, 1])
+        self.assertEqual(rank, {"user": 3, "total": 100, "position": 4})
+        self.assertEqual(stats["ctf"]["clients"], 4)
+        self.assertEqual(stats["ctf"]["requests"]["update_many"], self.NUM_SHARDS)
@@ -0,0 +1,47 @@
+import os
+import unittest
+
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from shards import Shards
+
+
+class TestShards(unittest.TestCase):
+
+    def test_split_ok(self):
+
+        client_info_list = [{"user": 1, "total": 10}, {"user": 2, "total": 20}, {"user": 3, "score": "+5"},
+                            {"user": 5, "total": 50}, {"user": 4, "score": "-5"}]
+
+        # Test main
+        result = Shards(2).split(client_info_list)
+
+        # Check results (in order within each shard)
+        self.assertEqual(result, [[1, 4], [0, 2, 3]])
+
+    def test_merge_ok(self):
+
+        rankings = [[{"user": 2, "total": 300}, {"user": 4, "total": 100}, {"user": 6, "total": 50}],
+                    [{"user": 1, "total": 200}, {"user": 3, "total": 100}, {"user": 5, "total": 100}]]
+
+        # Test main
+        top = Shards.merge(rankings, 1, 3)
+        relative_top = Shards.merge(rankings, 2, 4)
+        beyond = Shards.merge(rankings, 5, 6)
+
+        # Check results (ties of every shard grouped into a single ranking position, 3, and the higher scores of each
+        # shard added up for the next one, 5)
+        self.assertEqual([row["user"] for row in top], [2, 1, 4, 3, 5])
+        self.assertEqual([row["user"] for row in relative_top], [1, 4, 3, 5])
+        self.assertEqual([row["user"] for row in beyond], [6])
+        self.assertEqual(Shards.merge(rankings, 6, 7), [])
+
+    def test_count_scores_ok(self):
+
+        # Test main
+        result = Shards.count_scores([[100, 200, 300], [200, 400], []])
+
+        # Check results (a score kept by several shards counts once per shard)
+        self.assertEqual(result, 5)
@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from scoreboard import Scoreboard
+from snapshot import Snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.snapshot_dir = tempfile.mkdtemp()
+        self.snapshot_path = os.path.join(self.snapshot_dir, "test.snapshot")
+
+    def tearDown(self):
+        shutil.rmtree(self.snapshot_dir)
+
+    def test_snapshot_write_and_load_ok(self):
+
+        client_id_list = [1, 2, 3, 4, 5, 6, 7, 8]
+        client_score_list = [100, 200, 100, -350, 200, 155, 60, 100]
+
+        scoreboard = Scoreboard()
+        for ptr in range(len(client_id_list)):
+            scoreboard.update({"user": client_id_list[ptr], "total": client_score_list[ptr]})
+
+        # Test main
+        Snapshot(self.snapshot_path).write(scoreboard, 42)
+        loaded_scoreboard = Scoreboard()
+        seq = Snapshot(self.snapshot_path).load(loaded_scoreboard)
+
+        # Check results (same ranking, ties in the same order)
+        self.assertEqual(seq, 42)
+        self.assertEqual(len(loaded_scoreboard.clients), len(client_id_list))
+        self.assertEqual(list(loaded_scoreboard.sorted_clients.keys()), list(scoreboard.sorted_clients.keys()))
+        self.assertEqual([(client.id, client.score) for client in loaded_scoreboard.top(10)],
+                         [(client.id, client.score) for client in scoreboard.top(10)])
+        self.assertFalse(os.path.exists(self.snapshot_path + ".tmp"))
+
+    def test_empty_snapshot_ok(self):
+
+        # Test main
+        Snapshot(self.snapshot_path).write(Scoreboard(), 0)
+        loaded_scoreboard = Scoreboard()
+        seq = Snapshot(self.snapshot_path).load(loaded_scoreboard)
+
+        # Check results
+        self.assertEqual(seq, 0)
+        self.assertEqual(len(loaded_scoreboard.clients), 0)
+        self.assertEqual(len(loaded_scoreboard.sorted_clients), 0)
+
+    def test_invalid_snapshot_wrong(self):
+
+        Snapshot(self.snapshot_path).write(Scoreboard(), 7)
+        with open(self.snapshot_path, "ab") as snapshot_file:
+            snapshot_file.write(b"garbage")
+
+        # Test main & Check results
+        with self.assertRaises(ValueError):
+            Snapshot(self.snapshot_path).load(Scoreboard())
@@ -0,0 +1,60 @@
+import os
+import unittest
+
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from top_views import TopViews
+
+
+class TestTopViews(unittest.TestCase):
+
+    def test_top_views_hit_and_miss_ok(self):
+
+        top_views = TopViews([100, 200])
+
+        # Test main
+        self.assertEqual(top_views.get(100), None)
+        top_views.store(100, "[]", 50)
+        top_views.store(5, "[]", 50)  # Not a hot size
+
+        # Check results
+        self.assertEqual(top_views.get(100), "[]")
+        self.assertEqual(top_views.get(5), None)
+        self.assertEqual(top_views.stats(), {"hits": 1, "misses": 1, "invalidations": 0, "views": 1})
+
+    def test_top_views_invalidate_ok(self):
+
+        #
+        # (<prior_score>, <new_score>, <expected_invalidated>)
+        #
+        scenario_list = [
+            (10, 20, False),    # Deep in the ranking
+            (None, 49, False),  # New client deep in the ranking
+            (10, 50, True),     # Reaches the cutoff
+            (50, 10, True),     # Leaves the cutoff
+            (None, 70, True),   # New client in the view
+        ]
+
+        for prior_score, new_score, expected_invalidated in scenario_list:
+            top_views = TopViews([100])
+            top_views.store(100, "[]", 50)
+
+            # Test main
+            top_views.invalidate(prior_score, new_score)
+
+            # Check results
+            self.assertEqual(top_views.get(100) is None, expected_invalidated)
+
+    def test_top_views_not_full_invalidate_ok(self):
+
+        top_views = TopViews([100])
+        top_views.store(100, "[]", None)
+
+        # Test main
+        top_views.invalidate(None, -1000)
+
+        # Check results
+        self.assertEqual(top_views.get(100), None)
+        self.assertEqual(top_views.invalidations, 1)
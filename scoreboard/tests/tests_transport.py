@@ -0,0 +1,271 @@
+import asyncio
+import os
+import threading
+import time
+import unittest
+
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from transport import AsyncTransportClient, ConnectionPool, TransportClient, TransportError, TransportServer
+
+
+class EchoHandler():
+
+    def __init__(self):
+        self.num_flushes = 0
+        self.version = 0
+
+    def bump(self):
+        self.version += 1
+
+    def echo(self, *args):
+        return ",".join(args)
+
+    def raw(self):
+        return b"\x00\x01"
+
+    def fail(self):
+        raise ValueError("failed")
+
+    def hidden(self):
+        return "hidden"
+
+    def flush(self):
+        self.num_flushes += 1
+
+    def echo_run(self, args_list):
+        self.num_runs = getattr(self, "num_runs", 0) + 1
+        return [ValueError("failed") if args == ["fail"] else ",".join(args) for args in args_list]
+
+
+class StubSocket():
+
+    def __init__(self):
+        self.sent = []
+
+    def send_multipart(self, frames):
+        self.sent.append(frames)
+
+
+class TestTransport(unittest.TestCase):
+
+    ADDRESS = "inproc://tests_transport"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.handler = EchoHandler()
+        cls.server = TransportServer(cls.handler, cls.ADDRESS, ["echo", "raw", "fail", "bump"])
+        cls.server.open()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    def setUp(self):
+        self.client = TransportClient(self.ADDRESS, timeout=1.0)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_request_ok(self):
+
+        # Test main
+        result = self.client.request("echo", "a", "b")
+        raw_result = self.client.request("raw")
+
+        # Check results
+        self.assertEqual(result, b"a,b")
+        self.assertEqual(raw_result, b"\x00\x01")
+        self.assertGreater(self.handler.num_flushes, 0)
+
+    def test_pipelined_requests_ok(self):
+
+        # Test main
+        request_ids = [self.client.send("echo", str(ptr)) for ptr in range(100)]
+        result = [self.client.receive(request_id) for request_id in reversed(request_ids)]
+
+        # Check results (each reply matched with its request, regardless of the order they are waited for)
+        self.assertEqual(result, [str(ptr).encode() for ptr in reversed(range(100))])
+        self.assertEqual(self.client.replies, {})
+
+    def test_version_ok(self):
+
+        # Test main
+        self.client.request("bump")
+        version = self.client.version
+        self.client.request("echo")
+
+        # Check results (the version of the handler once each request is attended)
+        self.assertEqual(version, self.handler.version)
+        self.assertEqual(self.client.version, self.handler.version)
+
+    def test_request_wrong(self):
+
+        # Test main / Check results
+        with self.assertRaises(TransportError):
+            self.client.request("fail")
+        with self.assertRaises(TransportError):
+            self.client.request("hidden")  # Not in the commands set
+        self.assertEqual(self.client.request("echo", "still ok"), b"still ok")
+
+    def test_abandon_ok(self):
+
+        request_ids = [self.client.send("fail"), self.client.send("echo", "late")]
+        with self.assertRaises(TransportError):
+            self.client.receive(request_ids[0])
+
+        # Test main
+        self.client.abandon(request_ids[1])
+        result = self.client.request("echo", "next")
+
+        # Check results (the late reply of the abandoned request is discarded)
+        self.assertEqual(result, b"next")
+        self.assertEqual(self.client.pending, set())
+        self.assertEqual(self.client.replies, {})
+
+    def test_async_concurrent_requests_ok(self):
+
+        async def concurrent_requests():
+            client = AsyncTransportClient(self.ADDRESS, timeout=1.0)
+            try:
+                result = await asyncio.gather(*[client.request("echo", str(ptr)) for ptr in range(100)])
+                with self.assertRaises(TransportError):
+                    await client.request("fail")
+                return result, client.pending
+            finally:
+                client.close()
+
+        # Test main
+        result, pending = asyncio.run(concurrent_requests())
+
+        # Check results (each coroutine gets its own reply)
+        self.assertEqual(result, [str(ptr).encode() for ptr in range(100)])
+        self.assertEqual(pending, {})
+
+
+class TestCoalescedBatch(unittest.TestCase):
+
+    def test_serve_batch_ok(self):
+        handler = EchoHandler()
+        server = TransportServer(handler, "inproc://tests_transport_batch", ["echo", "raw"],
+                                 coalesced={"echo": "echo_run"})
+        server.socket = StubSocket()
+        batch = [[b"c1", b"1", b"echo", b"a"], [b"c2", b"2", b"echo", b"fail"], [b"c1", b"3", b"echo", b"b"],
+                 [b"c2", b"4", b"raw"], [b"c1", b"5", b"echo", b"c"]]
+
+        # Test main
+        server.serve_batch(batch)
+
+        # Check results (a single call for the run of the first three echoes, each request gets its own reply)
+        self.assertEqual(handler.num_runs, 1)
+        self.assertEqual(handler.num_flushes, 1)
+        self.assertEqual([frames[:3] for frames in server.socket.sent],
+                         [[b"c1", b"1", b"OK"], [b"c2", b"2", b"ERROR"], [b"c1", b"3", b"OK"], [b"c2", b"4", b"OK"],
+                          [b"c1", b"5", b"OK"]])
+        self.assertEqual([frames[3] for frames in server.socket.sent if frames[2] == b"OK"],
+                         [b"a", b"b", b"\x00\x01", b"c"])
+        self.assertEqual(server.stats(), {"batches": 1, "requests": 5, "mean_batch_size": 5.0,
+                                          "max_batch_size": 5, "coalesced": 3})
+        self.assertEqual(server.last_batch_size, 5)
+        self.assertEqual({command: series["count"] for command, series in server.metrics.snapshot()["series"].items()},
+                         {"echo": 4, "raw": 1})
+
+    def test_receive_batch_window_ok(self):
+        address = "inproc://tests_transport_window"
+        server = TransportServer(EchoHandler(), address, ["echo"], max_batch=3, batch_window=1.0)
+        server.open()
+        client = TransportClient(address, timeout=1.0)
+
+        def send_later():
+            time.sleep(0.05)
+            client.send("echo", "2")
+            client.send("echo", "3")
+            client.send("echo", "4")
+
+        # Test main
+        client.send("echo", "1")
+        threading.Thread(target=send_later).start()
+        batch = server.receive_batch()
+
+        # Check results (waited for the late requests, up to max_batch)
+        self.assertEqual([request[3] for request in batch], [b"1", b"2", b"3"])
+        client.close()
+        server.socket.close(linger=0)
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def test_checkout_and_wait_ok(self):
+
+        pool = ConnectionPool(object, size=2)
+        checked_out = []
+        lock = threading.Lock()
+
+        def hold():
+            with pool.connection() as connection:
+                with lock:
+                    checked_out.append(connection)
+                time.sleep(0.05)
+
+        # Test main
+        threads = [threading.Thread(target=hold) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Check results (only 2 connections, reused by the threads that waited for them)
+        stats = pool.stats()
+        self.assertEqual(len(set(map(id, checked_out))), 2)
+        self.assertEqual((stats["opened"], stats["in_use"], stats["checkouts"]), (2, 0, 4))
+        self.assertEqual(stats["waits"], 2)
+        self.assertGreater(stats["max_wait_time"], 0.02)
+        self.assertGreaterEqual(stats["wait_time"], stats["max_wait_time"])
+
+    def test_failed_open_wrong(self):
+
+        def fail():
+            raise TransportError("unreachable")
+
+        pool = ConnectionPool(fail, size=1)
+
+        # Test main / Check results (the failed connection does not count against the size)
+        with self.assertRaises(TransportError):
+            pool.checkout()
+        with self.assertRaises(TransportError):
+            pool.checkout()
+        self.assertEqual(pool.stats()["opened"], 0)
+
+    def test_failed_open_frees_waiter_ok(self):
+
+        attempts = []
+
+        def open_slowly():
+            attempts.append(None)
+            if len(attempts) == 1:
+                time.sleep(0.05)
+                raise TransportError("unreachable")
+            return object()
+
+        pool = ConnectionPool(open_slowly, size=1)
+        failed = threading.Thread(target=lambda: self.assertRaises(TransportError, pool.checkout))
+        failed.start()
+        time.sleep(0.01)  # The first checkout is opening the only connection
+
+        # Test main
+        connection = pool.checkout()
+        failed.join()
+
+        # Check results (the waiting thread opens the connection the failed one could not)
+        self.assertIsNotNone(connection)
+        self.assertEqual((pool.stats()["opened"], pool.stats()["waits"]), (1, 1))
+
+    def test_checkout_timeout_wrong(self):
+
+        pool = ConnectionPool(object, size=1, timeout=0.02)
+        pool.checkout()  # Never returned
+
+        # Test main / Check results
+        with self.assertRaises(TransportError):
+            pool.checkout()
+        self.assertEqual(pool.stats()["waits"], 1)
+        self.assertGreaterEqual(pool.stats()["max_wait_time"], 0.02)
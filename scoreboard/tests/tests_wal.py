@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from wal import WriteAheadLog
+
+
+class TestWriteAheadLog(unittest.TestCase):
+
+    def setUp(self):
+        self.wal_dir = tempfile.mkdtemp()
+        self.wal_path = os.path.join(self.wal_dir, "test.wal")
+
+    def tearDown(self):
+        shutil.rmtree(self.wal_dir)
+
+    def test_log_and_replay_ok(self):
+
+        records = [{"user": 1, "total": 100}, {"user": 2, "total": 200}, {"reset": True}, {"user": 1, "total": 50}]
+
+        wal = WriteAheadLog(self.wal_path)
+        self.assertEqual(list(wal.replay()), [])
+        wal.open()
+
+        # Test main
+        wal.log(records[:2])
+        wal.log(records[2:])
+        wal.close()
+
+        # Check results
+        stats = wal.stats()
+        self.assertEqual(stats["records"], 4)
+        self.assertEqual(stats["logs"], 2)
+        self.assertEqual(stats["commits"], 2)
+        self.assertEqual(stats["avg_batch_size"], 2.0)
+
+        replayed_wal = WriteAheadLog(self.wal_path)
+        replayed_records = list(replayed_wal.replay())
+        self.assertEqual([record["seq"] for record in replayed_records], [1, 2, 3, 4])
+        self.assertEqual(replayed_records, records)
+
+        # New records follow the replayed ones
+        replayed_wal.open()
+        replayed_wal.log([{"user": 3, "total": 300}])
+        replayed_wal.close()
+        self.assertEqual([record["seq"] for record in WriteAheadLog(self.wal_path).replay()], [1, 2, 3, 4, 5])
+
+    def test_replay_truncated_record_ok(self):
+
+        wal = WriteAheadLog(self.wal_path)
+        wal.open()
+        wal.log([{"user": 1, "total": 100}, {"user": 2, "total": 200}])
+        wal.close()
+
+        with open(self.wal_path, "a") as log_file:
+            log_file.write('{"seq": 3, "user": 3, "to')  # Torn write
+
+        # Test main
+        replayed_wal = WriteAheadLog(self.wal_path)
+        replayed_records = list(replayed_wal.replay())
+        replayed_wal.open()
+        replayed_wal.log([{"user": 4, "total": 400}])
+        replayed_wal.close()
+
+        # Check results
+        self.assertEqual([record["user"] for record in replayed_records], [1, 2])
+        self.assertEqual([(record["seq"], record["user"]) for record in WriteAheadLog(self.wal_path).replay()],
+                         [(1, 1), (2, 2), (3, 4)])
+
+    def test_group_commit_ok(self):
+
+        num_threads = 8
+
+        wal = WriteAheadLog(self.wal_path, commit_window=0.05)
+        wal.open()
+
+        # Test main
+        thread_list = [threading.Thread(target=wal.log, args=([{"user": user, "total": user}],))
+                       for user in range(num_threads)]
+        for thread in thread_list:
+            thread.start()
+        for thread in thread_list:
+            thread.join()
+
+        # Check results (less fsyncs than records)
+        stats = wal.stats()
+        wal.close()
+        self.assertEqual(stats["records"], num_threads)
+        self.assertLess(stats["commits"], num_threads)
+        self.assertGreater(stats["max_batch_size"], 1)
+        self.assertEqual(len(list(WriteAheadLog(self.wal_path).replay())), num_threads)
+
+    def test_rotate_and_discard_ok(self):
+
+        wal = WriteAheadLog(self.wal_path)
+        wal.open()
+        wal.log([{"user": 1, "total": 100}, {"user": 2, "total": 200}])
+
+        # Test main
+        rotated_seq = wal.rotate()
+        wal.log([{"user": 3, "total": 300}])
+        wal.close()
+
+        # Check results
+        self.assertEqual(rotated_seq, 2)
+        self.assertEqual(wal.segments(), [(2, self.wal_path + ".2")])
+        self.assertEqual([record["user"] for record in WriteAheadLog(self.wal_path).replay()], [1, 2, 3])
+        self.assertEqual([record["user"] for record in WriteAheadLog(self.wal_path).replay(after_seq=2)], [3])
+
+        wal.discard(rotated_seq)
+        replayed_wal = WriteAheadLog(self.wal_path)
+        self.assertEqual(wal.segments(), [])
+        self.assertEqual([record["user"] for record in replayed_wal.replay(after_seq=2)], [3])
+        self.assertEqual(replayed_wal.last_seq, 3)
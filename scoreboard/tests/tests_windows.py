@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from scoreboard import Scoreboard
+from windows import WindowedScoreboard, retire
+
+
+class TestWindows(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        self.windowed = WindowedScoreboard(100, offset=50, clock=lambda: self.now)
+
+    def test_rotation_ok(self):
+
+        # Test main
+        self.windowed.update({"user": 1, "total": 10})
+        self.windowed.update_many([{"user": 2, "score": "+5"}, {"user": 1, "score": "+5"}])
+        before = self.windowed.get(closed=True)
+        self.now = 1060.0  # Next window
+        num_current_clients = len(self.windowed.get().clients)
+        self.windowed.update({"user": 2, "score": "+1"})
+        closed = self.windowed.get(closed=True)
+
+        # Check results (the closed window keeps its scores, the new one starts empty)
+        self.assertEqual(before, None)
+        self.assertEqual(num_current_clients, 0)
+        self.assertEqual([(client.id, client.score) for client in closed.top(10)], [(1, 15), (2, 5)])
+        self.assertEqual([(client.id, client.score) for client in self.windowed.get().top(10)], [(2, 1)])
+        self.assertEqual(self.windowed.info(), {"start": 1050, "end": 1150, "clients": 1, "rotations": 1,
+                                                "closed": {"start": 950, "end": 1050, "clients": 2}})
+
+    def test_idle_rotation_ok(self):
+
+        self.windowed.update({"user": 1, "total": 10})
+
+        # Test main
+        self.now = 1300.0  # Two windows later
+
+        # Check results (the last closed window got no client infos)
+        self.assertEqual(len(self.windowed.get(closed=True).clients), 0)
+        self.assertEqual(self.windowed.info()["closed"]["start"], 1150)
+
+    def test_update_at_timestamp_ok(self):
+
+        self.windowed.update({"user": 1, "total": 10})
+        self.now = 1060.0  # Next window
+
+        # Test main
+        late = self.windowed.update({"user": 1, "score": "+5"}, timestamp=1040.0)  # Accepted before the rotation
+        current = self.windowed.update_many([{"user": 2, "total": 3}], timestamp=1060.0)
+        expired = self.windowed.update_many([{"user": 3, "total": 1}], timestamp=940.0)  # Older than the closed one
+
+        # Check results
+        self.assertTrue(late)
+        self.assertEqual(current, [3])
+        self.assertEqual(expired, [None])
+        self.assertEqual([(client.id, client.score) for client in self.windowed.get(closed=True).top(10)], [(1, 15)])
+        self.assertEqual([(client.id, client.score) for client in self.windowed.get().top(10)], [(2, 3)])
+
+    def test_write_and_load_ok(self):
+
+        snapshot_dir = tempfile.mkdtemp()
+        snapshot_path = os.path.join(snapshot_dir, "test.snapshot.daily")
+
+        self.windowed.update({"user": 1, "total": 10})
+        self.windowed.write(snapshot_path, 3)  # Overwritten by the next ones
+        self.now = 1060.0  # Next window
+        self.windowed.update({"user": 2, "total": 7})
+        self.windowed.write(snapshot_path, 4)
+        self.now = 1160.0  # Next window
+        self.windowed.update({"user": 3, "total": 5})
+
+        # Test main
+        self.windowed.write(snapshot_path, 5)
+        restarted = WindowedScoreboard(100, offset=50, clock=lambda: 1160.0)
+        seq = restarted.load(snapshot_path)
+        rotated = WindowedScoreboard(100, offset=50, clock=lambda: 1260.0)  # Next window (the current one got closed)
+        rotated.load(snapshot_path)
+
+        # Check results (only the current and the last closed windows are kept)
+        windows = [window for window, _ in WindowedScoreboard.snapshots(snapshot_path)]
+        shutil.rmtree(snapshot_dir)
+        self.assertEqual(seq, 5)
+        self.assertEqual(windows, [10, 11])
+        self.assertEqual([(client.id, client.score) for client in restarted.get().top(10)], [(3, 5)])
+        self.assertEqual([(client.id, client.score) for client in restarted.get(closed=True).top(10)], [(2, 7)])
+        self.assertEqual([(client.id, client.score) for client in rotated.get(closed=True).top(10)], [(3, 5)])
+        self.assertEqual(len(rotated.get().clients), 0)
+
+    def test_retire_ok(self):
+
+        scoreboard = Scoreboard()
+        scoreboard.update_many([{"user": client_id, "total": client_id % 7} for client_id in range(1000)])
+
+        # Test main
+        retire(scoreboard, chunk_size=100).join()
+
+        # Check results
+        self.assertEqual(len(scoreboard.clients), 0)
+        self.assertEqual(len(scoreboard.sorted_clients), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/bin/python3
+
+"""
+    Top views module. Contains all information regarding with the pre-serialized Top-N responses of the server
+"""
+
+
+class TopViews():
+    """
+        Keeps the pre-serialized responses of a configurable set of hot Top-N sizes (e.g., Top100, Top200, Top500), so
+        the server can answer them without walking the ranking nor serializing the clients again.
+
+        Each view remembers its cutoff, i.e., the lowest score included in it. An update only invalidates a view when
+        either the prior or the new score of the client is at or above that cutoff, since any other update does not
+        modify the ranking positions included in it. Therefore, updates deep in the ranking cost the views nothing.
+    """
+    def __init__(self, sizes):
+        # Hot Top-N sizes
+        self.sizes = frozenset(sizes)
+
+        # Valid views
+        #   <key> :<value> -> <top_size> : (<cutoff>, <payload>)
+        #
+        #   where:
+        #
+        #           <top_size> (int) : Number of higher ranking positions of the view.
+        #           <cutoff> (int) : Lowest score in the view. None if the Scoreboard has less ranking positions than
+        #                   top_size (i.e., any new score modifies the view).
+        #           <payload> (bytes) : The pre-serialized response.
+        #
+        self.views = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def reset(self):
+        """
+            Invalidates all the views (counters are kept).
+
+        :return: None
+        """
+        self.invalidations += len(self.views)
+        self.views = {}
+
+    def is_hot(self, top_size):
+        """
+            True if the views of the specified size are kept.
+
+        :param top_size: (int) Number of higher ranking positions.
+        :return: (bool)
+        """
+        return top_size in self.sizes
+
+    def get(self, top_size):
+        """
+            Returns the pre-serialized response of the specified Top-N, if it is a hot size and it is still valid.
+
+        :param top_size: (int) Number of higher ranking positions.
+        :return: (bytes) The pre-serialized response. None if not available.
+        """
+        result = None
+
+        if top_size in self.sizes:
+            try:
+                result = self.views[top_size][1]
+                self.hits += 1
+            except KeyError:
+                self.misses += 1
+
+        return result
+
+    def store(self, top_size, payload, cutoff):
+        """
+            Keeps the pre-serialized response of the specified Top-N, if it is a hot size.
+
+        :param top_size: (int) Number of higher ranking positions.
+        :param payload: (bytes) The pre-serialized response.
+        :param cutoff: (int) Lowest score in the response. None if it includes all the ranking positions.
+        :return: None
+        """
+        if top_size in self.sizes:
+            self.views[top_size] = (cutoff, payload)
+
+    def invalidate(self, prior_score, new_score):
+        """
+            Invalidates the views affected by a client that moved from prior_score to new_score.
+
+        :param prior_score: (int) The score of the client before the update. None if it is a new client.
+        :param new_score: (int) The score of the client after the update.
+        :return: None
+        """
+        for top_size, (cutoff, _) in list(self.views.items()):
+            if cutoff is None or new_score >= cutoff or (prior_score is not None and prior_score >= cutoff):
+                del self.views[top_size]
+                self.invalidations += 1
+
+    def stats(self):
+        """
+            Returns the counters of the views.
+
+        :return: (dict) As follows:
+
+                    {"hits": <hits>, "misses": <misses>, "invalidations": <invalidations>, "views": <valid_views>}
+        """
+        return {"hits": self.hits, "misses": self.misses, "invalidations": self.invalidations,
+                "views": len(self.views)}
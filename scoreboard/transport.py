@@ -0,0 +1,546 @@
+#!/bin/python3
+
+"""
+    Transport module. Contains all information regarding with the communication between the clients and the servers
+"""
+
+import asyncio
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+import zmq
+import zmq.asyncio
+
+import os
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from metrics import Metrics
+
+
+class TransportError(Exception):
+    """
+        The server failed to attend a request (or did not answer it in time).
+    """
+    pass
+
+
+class TransportServer():
+    """
+        Attends the requests of the clients through a ZMQ ROUTER socket, calling the method of the handler named after
+        the command of each request. Only the commands of a fixed set are accepted.
+
+        Requests and replies are multipart messages, as follows:
+
+                Request: [<request_id>, <command>, <arg_1>, ... <arg_N>]
+                Reply:   [<request_id>, <status>, <payload>, <version>]
+
+        where:
+
+                <request_id> (bytes) : Id of the request, chosen by the client (i.e., the reply may arrive in any order).
+                <command> (bytes) : ASCII name of the command.
+                <arg_i> (bytes) : UTF-8 string arguments of the command.
+                <status> (bytes) : OK or ERROR.
+                <payload> (bytes) : The result of the command (a UTF-8 string, bytes, or empty if None), or the error.
+                <version> (bytes) : ASCII version attribute of the handler once the command is attended (e.g., the
+                        version of the Scoreboard the payload reflects), or empty if the handler has none.
+
+        The server attends the requests in micro-batches: once a request arrives, it waits up to batch_window seconds
+        for more (up to max_batch, and without waiting at all for the ones already received) before replying any of
+        them. Once a batch is attended, the handler flush method (if any) is called before sending the replies (e.g., a
+        single fsync makes durable the updates of all the requests of the batch).
+
+        Besides, consecutive requests of a batch with the same coalesced command are attended at once, by the handler
+        method the command is mapped to: it receives the arguments of every request of the run, and returns the
+        payload (or the exception) of each one of them, in the same order.
+
+        The service time of each command is kept in a latency histogram (see Metrics). The requests of a coalesced run
+        share its time equally.
+    """
+    OK = b"OK"
+    ERROR = b"ERROR"
+
+    def __init__(self, handler, address, commands, max_batch=1000, batch_window=0.0, coalesced=None):
+        self.handler = handler
+        self.address = address
+        self.commands = frozenset(commands)
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        # <command> : <handler method that attends a run of requests of the command at once>
+        self.coalesced = {command.encode(): method for command, method in (coalesced or {}).items()}
+        self.socket = None
+
+        # Statistics
+        self.num_batches = 0
+        self.num_requests = 0
+        self.max_batch_size = 0
+        self.num_coalesced = 0  # Requests attended at once along with others (see coalesced)
+        self.last_batch_size = 0  # Requests waiting when the last batch was taken (i.e., the depth of the queue)
+        self.metrics = Metrics(thread_safe=False)  # Service time of each command (attended by a single thread)
+
+    def open(self):
+        """
+            Binds the socket.
+
+        :return: None
+        """
+        self.socket = zmq.Context.instance().socket(zmq.ROUTER)
+        self.socket.bind(self.address)
+
+    def serve_forever(self):
+        """
+            Attends the requests, one batch at a time.
+
+        :return: None
+        """
+        if self.socket is None:
+            self.open()
+
+        while True:
+            self.serve_batch(self.receive_batch())
+
+    def receive_batch(self):
+        """
+            Waits for a request, and returns it along with all the requests received up to batch_window seconds later
+                (up to max_batch).
+
+        :return: (list of list of bytes) The requests, each one with the identity of the client first.
+        """
+        result = [self.socket.recv_multipart()]
+        deadline = time.monotonic() + self.batch_window
+
+        while len(result) < self.max_batch:
+            try:
+                result.append(self.socket.recv_multipart(zmq.NOBLOCK))
+            except zmq.Again:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.socket.poll(remaining * 1000):
+                    break
+
+        return result
+
+    def serve_batch(self, batch):
+        """
+            Attends the specified requests, and replies them.
+
+        :param batch: (list of list of bytes) The requests, each one with the identity of the client first.
+        :return: None
+        """
+        replies = []
+
+        ptr = 0
+        while ptr < len(batch):
+            # Run of consecutive requests with the same coalesced command
+            end = ptr + 1
+            if batch[ptr][2] in self.coalesced:
+                while end < len(batch) and batch[end][2] == batch[ptr][2]:
+                    end += 1
+
+            if end - ptr > 1:
+                replies.extend(self.attend_run(batch[ptr:end]))
+                self.num_coalesced += end - ptr
+            else:
+                replies.append(self.attend(batch[ptr]))
+            ptr = end
+
+        self.num_batches += 1
+        self.num_requests += len(batch)
+        self.last_batch_size = len(batch)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+
+        flush = getattr(self.handler, "flush", None)
+        if flush is not None:
+            flush()
+
+        for reply in replies:
+            self.socket.send_multipart(reply)
+
+    def attend(self, request):
+        """
+            Attends the specified request.
+
+        :param request: (list of bytes) The request, with the identity of the client first.
+        :return: (list of bytes) The reply, with the identity of the client first.
+        """
+        command = request[2].decode()
+        start = time.perf_counter()
+
+        try:
+            if command not in self.commands:
+                raise TransportError("Unknown command {}".format(command))
+
+            payload = getattr(self.handler, command)(*[arg.decode() for arg in request[3:]])
+
+        except Exception as exc:
+            payload = exc
+
+        if command in self.commands:
+            self.metrics.observe(command, time.perf_counter() - start)
+
+        return self._reply(request, payload)
+
+    def attend_run(self, requests):
+        """
+            Attends the specified run of requests with the same coalesced command at once (see coalesced).
+
+        :param requests: (list of list of bytes) The requests, each one with the identity of the client first.
+        :return: (list of list of bytes) The reply of each request, in the same order.
+        """
+        start = time.perf_counter()
+
+        try:
+            payloads = getattr(self.handler, self.coalesced[requests[0][2]])(
+                [[arg.decode() for arg in request[3:]] for request in requests])
+
+        except Exception as exc:
+            payloads = [exc] * len(requests)
+
+        self.metrics.observe(requests[0][2].decode(), (time.perf_counter() - start) / len(requests), len(requests))
+
+        return [self._reply(request, payload) for request, payload in zip(requests, payloads)]
+
+    def _reply(self, request, payload):
+        """
+            Returns the reply of the specified request.
+
+        :param request: (list of bytes) The request, with the identity of the client first.
+        :param payload: The result of the command (str, bytes or None), or the exception that failed it.
+        :return: (list of bytes) The reply, with the identity of the client first.
+        """
+        if isinstance(payload, Exception):
+            status, payload = self.ERROR, repr(payload).encode()
+        else:
+            status = self.OK
+            if payload is None:
+                payload = b""
+            elif isinstance(payload, str):
+                payload = payload.encode()
+
+        version = getattr(self.handler, "version", None)
+
+        return [request[0], request[1], status, payload, str(version).encode() if version is not None else b""]
+
+    def stats(self):
+        """
+            Returns the statistics of the batches attended by the server.
+
+        :return: (dict) As follows:
+
+                    {"batches": <num_batches>, "requests": <num_requests>, "mean_batch_size": <mean_batch_size>,
+                     "max_batch_size": <max_batch_size>, "coalesced": <num_coalesced_requests>}
+        """
+        return {"batches": self.num_batches, "requests": self.num_requests,
+                "mean_batch_size": self.num_requests / self.num_batches if self.num_batches else 0.0,
+                "max_batch_size": self.max_batch_size, "coalesced": self.num_coalesced}
+
+
+class TransportClient():
+    """
+        Sends requests to a server (see TransportServer) through a ZMQ DEALER socket.
+
+        Requests are pipelined: many requests may be sent before waiting for any reply (e.g., to every shard of a
+        sharded Scoreboard, or a burst of updates), and each reply is matched with its request by id. A client is not
+        thread-safe (as any ZMQ socket), so each thread must use its own one.
+    """
+    REQUEST_ID = struct.Struct("<Q")
+
+    def __init__(self, address, timeout=5.0):
+        self.address = address
+        self.timeout = timeout
+        self.last_request_id = 0
+        self.pending = set()  # Ids of the requests still waiting for their reply
+        self.replies = {}  # Replies received while waiting for another one
+        self.version = 0  # Highest version of the server among the received replies (see TransportServer)
+        self.socket = zmq.Context.instance().socket(zmq.DEALER)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        self.socket.connect(address)
+
+    def close(self):
+        """
+            Closes the connection.
+
+        :return: None
+        """
+        self.socket.close()
+
+    def send(self, command, *args):
+        """
+            Sends a request, without waiting for its reply.
+
+        :param command: (str) The command.
+        :param args: (str) The arguments of the command.
+        :return: (bytes) The id of the request (see receive).
+        """
+        self.last_request_id += 1
+        request_id = self.REQUEST_ID.pack(self.last_request_id)
+        self.socket.send_multipart([request_id, command.encode()] + [arg.encode() for arg in args])
+        self.pending.add(request_id)
+
+        return request_id
+
+    def receive(self, request_id):
+        """
+            Waits for the reply of the specified request.
+
+        :param request_id: (bytes) The id of the request (see send).
+        :return: (bytes) The payload of the reply.
+        :raises: (TransportError) If the server failed, or did not answer in time.
+        """
+        deadline = time.monotonic() + self.timeout
+
+        while request_id not in self.replies:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.socket.poll(remaining * 1000):
+                # Abandoned: its reply will be discarded if it ever arrives
+                self.pending.discard(request_id)
+                raise TransportError("No reply from {}".format(self.address))
+
+            reply_id, status, payload, version = self.socket.recv_multipart()
+            if reply_id in self.pending:
+                self.replies[reply_id] = (status, payload)
+            if version:
+                self.version = max(self.version, int(version))
+
+        self.pending.discard(request_id)
+        status, payload = self.replies.pop(request_id)
+
+        if status != TransportServer.OK:
+            raise TransportError(payload.decode())
+
+        return payload
+
+    def abandon(self, request_id):
+        """
+            Gives up waiting for the reply of the specified request (e.g., a request of a fan-out that failed): its
+                reply is discarded, whether it already arrived or it arrives later.
+
+        :param request_id: (bytes) The id of the request (see send).
+        :return: None
+        """
+        self.pending.discard(request_id)
+        self.replies.pop(request_id, None)
+
+    def request(self, command, *args):
+        """
+            Sends a request and waits for its reply.
+
+        :param command: (str) The command.
+        :param args: (str) The arguments of the command.
+        :return: (bytes) The payload of the reply.
+        """
+        return self.receive(self.send(command, *args))
+
+
+class AsyncTransportClient():
+    """
+        Asyncio counterpart of TransportClient: sends requests to a server (see TransportServer) through a ZMQ DEALER
+        socket without blocking the event loop.
+
+        Any number of coroutines of the same event loop may share a client, all of their requests pipelined on the same
+        socket: a single reader task receives the replies, and hands each one to the coroutine waiting for it (by id).
+    """
+    def __init__(self, address, timeout=5.0):
+        self.address = address
+        self.timeout = timeout
+        self.last_request_id = 0
+        self.pending = {}  # Future of each request still waiting for its reply
+        self.reader = None  # Task that receives the replies
+        self.version = 0  # Highest version of the server among the received replies (see TransportServer)
+        # Same context as the blocking sockets (i.e., the same I/O thread, and inproc addresses are shared)
+        self.socket = zmq.asyncio.Context.shadow(zmq.Context.instance().underlying).socket(zmq.DEALER)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        self.socket.connect(address)
+
+    def close(self):
+        """
+            Closes the connection.
+
+        :return: None
+        """
+        if self.reader is not None:
+            self.reader.cancel()
+        self.socket.close()
+
+    async def send(self, command, *args):
+        """
+            Sends a request, without waiting for its reply.
+
+        :param command: (str) The command.
+        :param args: (str) The arguments of the command.
+        :return: (bytes) The id of the request (see receive).
+        """
+        self.last_request_id += 1
+        request_id = TransportClient.REQUEST_ID.pack(self.last_request_id)
+        self.pending[request_id] = asyncio.get_running_loop().create_future()
+
+        if self.reader is None or self.reader.done():
+            self.reader = asyncio.ensure_future(self._read())
+
+        await self.socket.send_multipart([request_id, command.encode()] + [arg.encode() for arg in args])
+
+        return request_id
+
+    async def _read(self):
+        """
+            Receives the replies, and hands each one to the request waiting for it. Replies of abandoned requests are
+                discarded.
+
+        :return: None
+        """
+        while True:
+            reply_id, status, payload, version = await self.socket.recv_multipart()
+            if version:
+                self.version = max(self.version, int(version))
+
+            future = self.pending.get(reply_id)
+            if future is not None and not future.done():
+                future.set_result((status, payload))
+
+    async def receive(self, request_id):
+        """
+            Waits for the reply of the specified request.
+
+        :param request_id: (bytes) The id of the request (see send).
+        :return: (bytes) The payload of the reply.
+        :raises: (TransportError) If the server failed, or did not answer in time.
+        """
+        try:
+            status, payload = await asyncio.wait_for(self.pending[request_id], self.timeout)
+        except asyncio.TimeoutError:
+            raise TransportError("No reply from {}".format(self.address))
+        finally:
+            # Abandoned on timeout: its reply will be discarded if it ever arrives
+            self.pending.pop(request_id, None)
+
+        if status != TransportServer.OK:
+            raise TransportError(payload.decode())
+
+        return payload
+
+    def abandon(self, request_id):
+        """
+            Gives up waiting for the reply of the specified request (see TransportClient.abandon).
+
+        :param request_id: (bytes) The id of the request (see send).
+        :return: None
+        """
+        self.pending.pop(request_id, None)
+
+    async def request(self, command, *args):
+        """
+            Sends a request and waits for its reply.
+
+        :param command: (str) The command.
+        :param args: (str) The arguments of the command.
+        :return: (bytes) The payload of the reply.
+        """
+        return await self.receive(await self.send(command, *args))
+
+
+class ConnectionPool():
+    """
+        Bounded pool of connections shared by the threads of a process (e.g., the request threads of the Flask API).
+        ZMQ sockets are not thread-safe, so a connection is only used by the thread that checked it out, until it is
+        returned. Connections are opened on demand, up to size. Once all of them are checked out, a thread waits for
+        one to be returned, or for a failed one to free its place, up to timeout seconds (and the time it waits is
+        accounted, see stats).
+    """
+    def __init__(self, factory, size=8, timeout=5.0):
+        self.factory = factory  # Callable that opens a new connection
+        self.size = size
+        self.timeout = timeout
+        self.condition = threading.Condition()
+        self.idle = []  # Connections not checked out (the most recently returned last)
+        self.num_opened = 0
+
+        # Statistics
+        self.num_checkouts = 0
+        self.num_waits = 0  # Checkouts that found every connection in use
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def checkout(self):
+        """
+            Checks out a connection, waiting for one to be returned if all of them are in use.
+
+        :return: The connection. It must be returned (see checkin).
+        :raises: (TransportError) If no connection was available in timeout seconds.
+        """
+        start = time.monotonic()
+        connection = None
+
+        with self.condition:
+            if not self.idle and self.num_opened >= self.size:
+                self.num_waits += 1
+                deadline = start + self.timeout
+                # A failed connection frees its place instead of returning one (see below)
+                while not self.idle and self.num_opened >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.wait_time += self.timeout
+                        self.max_wait_time = max(self.max_wait_time, self.timeout)
+                        raise TransportError("No connection available in {} seconds".format(self.timeout))
+                    self.condition.wait(remaining)
+
+            if self.idle:
+                connection = self.idle.pop()
+            else:
+                self.num_opened += 1
+
+            wait_time = time.monotonic() - start
+            self.num_checkouts += 1
+            self.wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+
+        if connection is None:
+            try:
+                connection = self.factory()
+            except Exception:
+                with self.condition:
+                    self.num_opened -= 1
+                    self.condition.notify()
+                raise
+
+        return connection
+
+    def checkin(self, connection):
+        """
+            Returns a connection checked out by the same thread.
+
+        :param connection: The connection (see checkout).
+        :return: None
+        """
+        with self.condition:
+            self.idle.append(connection)
+            self.condition.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+            Checks out a connection for the duration of a with block.
+
+        :return: (contextmanager) Yields the connection.
+        """
+        connection = self.checkout()
+        try:
+            yield connection
+        finally:
+            self.checkin(connection)
+
+    def stats(self):
+        """
+            Returns the statistics of the pool.
+
+        :return: (dict) As follows (times in seconds):
+
+                    {"size": <size>, "opened": <num_opened>, "in_use": <num_checked_out>, "checkouts": <num_checkouts>,
+                     "waits": <num_checkouts_that_waited>, "wait_time": <total_wait_time>,
+                     "max_wait_time": <max_wait_time>}
+        """
+        with self.condition:
+            return {"size": self.size, "opened": self.num_opened, "in_use": self.num_opened - len(self.idle),
+                    "checkouts": self.num_checkouts, "waits": self.num_waits, "wait_time": self.wait_time,
+                    "max_wait_time": self.max_wait_time}
@@ -0,0 +1,285 @@
+#!/bin/python3
+
+"""
+    Write-ahead log module. Contains all information regarding with the durability of the updates of a Scoreboard
+"""
+
+import os
+import threading
+import time
+from json import dumps, loads
+
+
+class WriteAheadLog():
+    """
+        Append-only log of the updates accepted by the server, stored in a local file. Each record is a JSON line
+        with a sequence number:
+
+                {"seq": 1, "user": 123, "total": 250}   <- The client 123 reached a total score of 250
+                {"seq": 2, "reset": true}               <- The Scoreboard was reset
+                {"seq": 3, "user": 7, "total": 10, "time": 1700000000.5}  <- Time of the update (if there are time
+                                                                             windows, see WindowedScoreboard)
+                {"seq": 4, "board": "ctf", "user": 7, "total": 5}         <- Update of a named Scoreboard
+
+        Records keep the resulting total score (never the relative modification), so replaying them is idempotent.
+
+        The log can be rotated (e.g., when a snapshot of the Scoreboard is taken): the current file is renamed after
+        its last sequence number (<path>.<last_seq>) and new records are appended to a new one. Rotated segments are
+        replayed before the current file, and discarded once a snapshot covers all their records.
+
+        Records are appended to the file buffer and only acknowledged once they are durable (i.e., after an fsync).
+        Durability is achieved using group commit: a single fsync covers all the records appended so far, either by
+        the same caller (e.g., a batch of updates) or by concurrent callers. The first caller waiting for its records
+        leads the commit: it waits up to commit_window seconds since the oldest pending record (so other records can
+        join the group), and then fsyncs them all. The rest of the callers just wait for the commit that covers them.
+
+        IMPLEMENTATION NOTE: The commit window only groups records appended by other threads while the leader waits.
+            A single threaded caller (e.g., the server) never gets other records meanwhile, so it must use a window of
+            0 and log its records in batches instead (e.g., the server logs at once the records of all the requests it
+            attends in a batch, see ScoreboardWrapper.flush).
+    """
+    def __init__(self, path, commit_window=0.0):
+        self.path = path
+        self.commit_window = commit_window
+        self.file = None
+
+        self.condition = threading.Condition()
+        self.last_seq = 0  # Last appended record
+        self.synced_seq = 0  # Last durable record
+        self.syncing = False  # True while a commit is in progress
+        self.first_pending_time = None  # When the oldest not durable record was appended
+
+        # Statistics
+        self.num_logs = 0
+        self.total_log_time = 0.0
+        self.max_log_time = 0.0
+        self.num_commits = 0
+        self.num_committed = 0
+        self.max_batch_size = 0
+
+    def segments(self):
+        """
+            Returns the rotated segments of the log, sorted by sequence number.
+
+        :return: (list of tuple) The (<last_seq>, <path>) of each rotated segment.
+        """
+        result = []
+
+        directory = os.path.dirname(self.path) or "."
+        prefix = os.path.basename(self.path) + "."
+
+        if os.path.isdir(directory):
+            for filename in os.listdir(directory):
+                if filename.startswith(prefix) and filename[len(prefix):].isdigit():
+                    result.append((int(filename[len(prefix):]), os.path.join(directory, filename)))
+
+        return sorted(result)
+
+    def replay(self, after_seq=0):
+        """
+            Reads the records of the log (rotated segments first), in order. A truncated last record (e.g., a torn
+                write of a crashed server) is ignored and removed from the file, so new records are appended right
+                after the last complete one.
+
+            Must be called before open.
+
+        :param after_seq: (int) Only the records with a higher sequence number are returned (e.g., the ones that are
+                    not covered by a snapshot). Whole segments below it are skipped without reading them.
+        :return: (generator of dict) The records.
+        """
+        self.last_seq = self.synced_seq = after_seq
+
+        for last_seq, segment_path in self.segments():
+            if last_seq > after_seq:
+                yield from self._read(segment_path, after_seq)
+            self.last_seq = self.synced_seq = max(self.last_seq, last_seq)
+
+        if os.path.exists(self.path):
+            yield from self._read(self.path, after_seq)
+
+    def _read(self, path, after_seq):
+        """
+            Reads the records of the specified file of the log, in order (see replay).
+
+        :param path: (str) The file.
+        :param after_seq: (int) Only the records with a higher sequence number are returned.
+        :return: (generator of dict) The records.
+        """
+        valid_size = 0
+
+        with open(path, "rb") as log_file:
+            for line in log_file:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("Truncated record")
+                    record = loads(line.decode())
+                except ValueError:
+                    break
+
+                valid_size += len(line)
+                if record["seq"] > after_seq:
+                    self.last_seq = self.synced_seq = record["seq"]
+                    yield record
+
+        if valid_size < os.path.getsize(path):
+            with open(path, "r+b") as log_file:
+                log_file.truncate(valid_size)
+
+    def open(self):
+        """
+            Opens the log to append new records.
+
+        :return: None
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.file = open(self.path, "a")
+
+    def close(self):
+        """
+            Makes durable the pending records and closes the log.
+
+        :return: None
+        """
+        if self.file is not None:
+            self.commit(self.last_seq)
+            self.file.close()
+            self.file = None
+
+    def rotate(self):
+        """
+            Makes durable the pending records and starts a new segment of the log (see WriteAheadLog).
+
+        :return: (int) The last sequence number of the rotated segment.
+        """
+        with self.condition:
+            while self.syncing:
+                self.condition.wait()
+
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.synced_seq = self.last_seq
+            self.first_pending_time = None
+            self.condition.notify_all()
+
+            if os.path.getsize(self.path) > 0:
+                self.file.close()
+                os.rename(self.path, "{}.{}".format(self.path, self.last_seq))
+                self.file = open(self.path, "a")
+
+            return self.last_seq
+
+    def discard(self, seq):
+        """
+            Removes the rotated segments whose records are all covered by a snapshot.
+
+        :param seq: (int) Sequence number of the last record covered by the snapshot.
+        :return: None
+        """
+        for last_seq, segment_path in self.segments():
+            if last_seq <= seq:
+                os.remove(segment_path)
+
+    def append(self, record):
+        """
+            Appends the specified record to the log, but does not wait for it to be durable (see commit).
+
+        :param record: (dict) The record, without sequence number.
+        :return: (int) The sequence number of the record.
+        """
+        with self.condition:
+            self.last_seq += 1
+            record["seq"] = self.last_seq
+            self.file.write(dumps(record) + "\n")
+
+            if self.first_pending_time is None:
+                self.first_pending_time = time.monotonic()
+
+            return self.last_seq
+
+    def commit(self, seq):
+        """
+            Waits until the record with the specified sequence number (and all the previous ones) is durable.
+
+        :param seq: (int) Sequence number of the record.
+        :return: None
+        """
+        with self.condition:
+            while self.synced_seq < seq:
+                if self.syncing:
+                    # Another caller leads the commit. Wait for it.
+                    self.condition.wait()
+                    continue
+
+                # Lead the commit
+                self.syncing = True
+                try:
+                    pending_time = self.commit_window - (time.monotonic() - self.first_pending_time)
+                    if pending_time > 0:
+                        # Let other records join the group
+                        self.condition.wait(pending_time)
+
+                    self.file.flush()
+                    target_seq = self.last_seq
+                    start = time.monotonic()
+
+                    self.condition.release()
+                    try:
+                        os.fsync(self.file.fileno())
+                    finally:
+                        self.condition.acquire()
+
+                    batch_size = target_seq - self.synced_seq
+                    self.num_commits += 1
+                    self.num_committed += batch_size
+                    self.max_batch_size = max(self.max_batch_size, batch_size)
+
+                    self.synced_seq = target_seq
+                    self.first_pending_time = start if self.last_seq > target_seq else None
+
+                finally:
+                    self.syncing = False
+                    self.condition.notify_all()
+
+    def log(self, records):
+        """
+            Appends the specified records to the log and waits until all of them are durable (a single commit).
+
+        :param records: (list of dict) The records, without sequence number.
+        :return: None
+        """
+        start = time.monotonic()
+
+        seq = None
+        for record in records:
+            seq = self.append(record)
+
+        if seq is not None:
+            self.commit(seq)
+
+            elapsed = time.monotonic() - start
+            with self.condition:
+                self.num_logs += 1
+                self.total_log_time += elapsed
+                self.max_log_time = max(self.max_log_time, elapsed)
+
+    def stats(self):
+        """
+            Returns the statistics of the log, to tune the commit window.
+
+        :return: (dict) As follows:
+
+                    {"records": <last_seq>, "logs": <num_logs>, "avg_log_latency": <seconds>,
+                     "max_log_latency": <seconds>, "commits": <num_fsyncs>, "avg_batch_size": <records_per_fsync>,
+                     "max_batch_size": <records_per_fsync>}
+        """
+        with self.condition:
+            return {"records": self.last_seq,
+                    "logs": self.num_logs,
+                    "avg_log_latency": self.total_log_time / self.num_logs if self.num_logs else 0.0,
+                    "max_log_latency": self.max_log_time,
+                    "commits": self.num_commits,
+                    "avg_batch_size": self.num_committed / self.num_commits if self.num_commits else 0.0,
+                    "max_batch_size": self.max_batch_size}
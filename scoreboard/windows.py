@@ -0,0 +1,275 @@
+#!/bin/python3
+
+"""
+    Windows module. Contains all information regarding with the time-windowed Scoreboards (e.g., daily, weekly)
+"""
+
+import threading
+import time
+
+import os
+os.path.dirname(os.path.realpath(__file__))
+path = os.path.dirname(os.path.realpath(__file__))
+os.environ['PATH'] += ':'+path
+
+from scoreboard import Scoreboard
+from snapshot import Snapshot
+
+
+class WindowedScoreboard():
+    """
+        Keeps the Scoreboard of the current time window (e.g., the current day) and the one of the last closed window
+        (e.g., yesterday, until its payouts are done), fed by the changes of the all-time Scoreboard (i.e., the score of
+        a client in a window is the one earned within it).
+
+        Windows are consecutive periods of period seconds, starting offset seconds after the epoch (e.g., weeks starting
+        on Monday). The window is checked on each access: once it ends, the Scoreboard of the current window becomes the
+        closed one, and a fresh one takes its place. The rotation swaps references only (O(1)), regardless of the
+        number of clients. The former closed Scoreboard is dismantled in background (see retire), instead of freeing
+        millions of clients at once while serving.
+    """
+    def __init__(self, period, offset=0, clock=time.time):
+        self.period = period
+        self.offset = offset
+        self.clock = clock  # Returns the current time, in seconds since the epoch
+
+        self.window = self.window_of(self.clock())  # Number of the current window
+        self.current = Scoreboard()
+        self.closed = None  # Scoreboard of the last closed window (i.e., window - 1). None if not available yet.
+
+        self.num_rotations = 0
+
+    def window_of(self, timestamp):
+        """
+            Returns the number of the window that includes the specified time.
+
+        :param timestamp: (float) Seconds since the epoch.
+        :return: (int)
+        """
+        return int((timestamp - self.offset) // self.period)
+
+    def bounds(self, window):
+        """
+            Returns the start and the end of the specified window.
+
+        :param window: (int) The number of the window.
+        :return: (tuple) The start (included) and the end (excluded), in seconds since the epoch.
+        """
+        start = window * self.period + self.offset
+
+        return start, start + self.period
+
+    def rotate(self):
+        """
+            Closes the current window if it is over (see class description). Called on each access.
+
+        :return: None
+        """
+        window = self.window_of(self.clock())
+
+        if window != self.window:
+            retired = [self.closed]
+
+            if window == self.window + 1:
+                self.closed = self.current
+            else:
+                # Idle for longer than a window: the last closed window got no client infos
+                retired.append(self.current)
+                self.closed = Scoreboard()
+
+            self.current = Scoreboard()
+            self.window = window
+            self.num_rotations += 1
+
+            for scoreboard in retired:
+                if scoreboard is not None:
+                    retire(scoreboard)
+
+    def get(self, closed=False):
+        """
+            Returns the Scoreboard of the current window, or the one of the last closed window.
+
+        :param closed: (bool) True for the last closed window.
+        :return: (Scoreboard) The Scoreboard. None if there is no closed window yet.
+        """
+        self.rotate()
+
+        return self.closed if closed else self.current
+
+    def at(self, timestamp=None):
+        """
+            Returns the Scoreboard of the window that includes the specified time, if it is the current or the last
+                closed one.
+
+        :param timestamp: (float) Seconds since the epoch. None for the current time.
+        :return: (Scoreboard) The Scoreboard. None if the window is older than the last closed one.
+        """
+        self.rotate()
+        window = self.window_of(timestamp) if timestamp is not None else self.window
+
+        if window >= self.window:
+            result = self.current
+        elif window == self.window - 1:
+            if self.closed is None:
+                self.closed = Scoreboard()
+            result = self.closed
+        else:
+            result = None
+
+        return result
+
+    def update(self, client_info, timestamp=None):
+        """
+            Modifies the client total score in the window of the specified time (see Scoreboard.update).
+
+        :param client_info: (dict) A JSON submitted by the client.
+        :param timestamp: (float) When the client info was accepted (e.g., a replayed one), in seconds since the epoch
+                    (see at). None for the current time.
+        :return: (bool) True if successfully updated; False otherwise (e.g., older than the last closed window).
+        """
+        scoreboard = self.at(timestamp)
+
+        return scoreboard.update(client_info) if scoreboard is not None else False
+
+    def update_many(self, client_info_list, timestamp=None):
+        """
+            Modifies the total score of several clients at once in the window of the specified time (see
+                Scoreboard.update_many).
+
+        :param client_info_list: (list of dict) JSONs submitted by the clients.
+        :param timestamp: (float) When the client infos were accepted, in seconds since the epoch (see at). None for
+                    the current time.
+        :return: (list of int) The total score of the client right after applying each client info (all of them None
+                    if older than the last closed window).
+        """
+        scoreboard = self.at(timestamp)
+
+        return scoreboard.update_many(client_info_list) if scoreboard is not None else [None] * len(client_info_list)
+
+    def write(self, path, seq):
+        """
+            Writes a snapshot (see Snapshot) of the current and the closed windows, as <path>.<window> files, and
+                removes the ones of any other window. Not rotated meanwhile (e.g., called from a forked process).
+
+        :param path: (str) The path prefix of the snapshots of these windows.
+        :param seq: (int) Sequence number of the last write-ahead log record applied to the windows.
+        :return: None
+        """
+        written = {self.window: self.current}
+        if self.closed is not None:
+            written[self.window - 1] = self.closed
+
+        for window, scoreboard in written.items():
+            Snapshot("{}.{}".format(path, window)).write(scoreboard, seq)
+
+        for window, window_path in self.snapshots(path):
+            if window not in written:
+                os.remove(window_path)
+
+    def load(self, path):
+        """
+            Restores the current and the closed windows from their snapshots (see write), if they are still the current
+                or the last closed window. The rest of the snapshots are ignored.
+
+        :param path: (str) The path prefix of the snapshots of these windows.
+        :return: (int) Sequence number of the last write-ahead log record covered by the snapshots. 0 if none.
+        """
+        result = 0
+
+        self.rotate()
+        for window, window_path in self.snapshots(path):
+            scoreboard = Scoreboard()
+            result = max(result, Snapshot(window_path).load(scoreboard))
+
+            if window == self.window:
+                self.current = scoreboard
+            elif window == self.window - 1:
+                self.closed = scoreboard
+
+        return result
+
+    @staticmethod
+    def snapshots(path):
+        """
+            Returns the snapshots of windows with the specified path prefix (see write).
+
+        :param path: (str) The path prefix.
+        :return: (list of tuple) The (<window>, <path>) of each snapshot.
+        """
+        result = []
+
+        directory = os.path.dirname(path) or "."
+        prefix = os.path.basename(path) + "."
+
+        if os.path.isdir(directory):
+            for filename in os.listdir(directory):
+                if filename.startswith(prefix) and filename[len(prefix):].lstrip("-").isdigit():
+                    result.append((int(filename[len(prefix):]), os.path.join(directory, filename)))
+
+        return sorted(result)
+
+    def reset(self):
+        """
+            Resets both the current and the closed windows.
+
+        :return: None
+        """
+        for scoreboard in (self.current, self.closed):
+            if scoreboard is not None:
+                retire(scoreboard)
+        self.current = Scoreboard()
+        self.closed = None
+
+    def info(self):
+        """
+            Returns the bounds and the number of clients of the current and the closed windows.
+
+        :return: (dict) As follows (start and end in seconds since the epoch):
+
+                    {"start": <start>, "end": <end>, "clients": <num_clients>, "rotations": <num_rotations>,
+                     "closed": {"start": <start>, "end": <end>, "clients": <num_clients>}}
+
+                    where closed is None if there is no closed window yet.
+        """
+        self.rotate()
+
+        start, end = self.bounds(self.window)
+        result = {"start": start, "end": end, "clients": len(self.current.clients), "rotations": self.num_rotations,
+                  "closed": None}
+
+        if self.closed is not None:
+            start, end = self.bounds(self.window - 1)
+            result["closed"] = {"start": start, "end": end, "clients": len(self.closed.clients)}
+
+        return result
+
+
+def retire(scoreboard, chunk_size=10000):
+    """
+        Dismantles the specified Scoreboard in background, a chunk of clients at a time. Clients are linked to their
+            neighbours in both directions (see Bucket), so a dropped Scoreboard would be freed by a single garbage
+            collection of all its clients at once. Unlinked chunk by chunk, each client is freed as soon as it is
+            popped, and the serving thread gets the GIL back between chunks.
+
+    :param scoreboard: (Scoreboard) The Scoreboard. Must not be used anymore.
+    :param chunk_size: (int) Number of clients unlinked at once.
+    :return: (threading.Thread) The thread that dismantles it.
+    """
+    def dismantle():
+        clients, sorted_clients = scoreboard.clients, scoreboard.sorted_clients
+
+        while clients:
+            for _ in range(min(chunk_size, len(clients))):
+                _, client = clients.popitem()
+                client.prev = client.next = None
+            time.sleep(0)
+
+        while sorted_clients:
+            for _ in range(min(chunk_size, len(sorted_clients))):
+                sorted_clients.popitem()
+            time.sleep(0)
+
+    result = threading.Thread(target=dismantle, daemon=True)
+    result.start()
+
+    return result